@@ -0,0 +1,336 @@
+"""
+Persistent Response Cache for Deterministic Prompts
+Run: python 02-chat-models/samples/response_cache.py
+
+temperature_lab.py, 03_parameters.py and the chapter 3 template demos send
+the same (model, messages, parameters) requests on every run. At
+temperature 0 the answer is (nearly) the same each time, so we pay for it
+again and again.
+
+ResponseCache is a LangChain BaseCache stored in SQLite:
+- Pass it as ChatOpenAI(cache=...) or enable it everywhere with set_llm_cache()
+- The key is a SHA-256 of the model, its sampling parameters, bound tools,
+  stop sequences and the serialized messages (canonical JSON, API key excluded)
+- Only calls at or below max_temperature are cached (default: temperature 0)
+- Entries expire after ttl_seconds; max_entries evicts least recently used
+- usage_metadata is stored with each entry, so every hit reports the tokens saved
+
+Note: reasoning models such as gpt-5-mini only support their default
+temperature, so ChatOpenAI doesn't send temperature=0 to them. Those calls
+count as the default temperature (1) and are only cached if you opt in with
+max_temperature=1 (LLM_CACHE_MAX_TEMPERATURE=1).
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Sequence
+
+from dotenv import load_dotenv
+from langchain_core.caches import BaseCache
+from langchain_core.messages import messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatGeneration, Generation
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+
+# Load environment variables
+load_dotenv()
+
+# Model settings that don't change the response
+IGNORED_SETTINGS = {
+    "openai_api_key",
+    "openai_organization",
+    "max_retries",
+    "request_timeout",
+    "streaming",
+    "http_client",
+}
+
+DEFAULT_TEMPERATURE = 1.0  # what OpenAI uses when none is sent
+
+# Call parameters are str(sorted(params.items())): "[..., ('temperature', 0.7)]"
+CALL_TEMPERATURE = re.compile(r"\('temperature', ([^)]+)\)")
+
+
+class ResponseCache(BaseCache):
+    def __init__(
+        self,
+        path: str = ".llm_cache.sqlite",
+        max_temperature: float = 0.0,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 10_000,
+    ):
+        """
+        max_temperature: cache calls up to this temperature; raise it to opt
+            in low-but-nonzero temperatures, or set it to -1 to disable caching
+        ttl_seconds: entries older than this are ignored and removed (None = never)
+        max_entries: least recently used entries beyond this are evicted
+        """
+        self.path = path
+        self.max_temperature = max_temperature
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                generations TEXT,
+                input_tokens INTEGER,
+                output_tokens INTEGER,
+                created REAL,
+                last_used REAL,
+                hits INTEGER DEFAULT 0
+            )""")
+        self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def _parse_llm_string(llm_string: str) -> tuple[dict, str]:
+        """Split LangChain's llm_string into model settings and call parameters."""
+        settings_json, _, call_params = llm_string.partition("---")
+        try:
+            settings = json.loads(settings_json).get("kwargs", {})
+        except json.JSONDecodeError:
+            # Models that aren't serializable only have the parameter string
+            return {}, llm_string
+        settings = {k: v for k, v in settings.items() if k not in IGNORED_SETTINGS}
+        return settings, call_params
+
+    def _key(self, prompt: str, llm_string: str) -> tuple[str, dict, str]:
+        settings, call_params = self._parse_llm_string(llm_string)
+        canonical = json.dumps(
+            {
+                "settings": settings,
+                "call_params": call_params,  # bound tools, stop sequences, ...
+                "messages": json.loads(prompt),
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        key = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return key, settings, call_params
+
+    def _cacheable(self, settings: dict, call_params: str) -> bool:
+        # Call parameters are what was actually sent, e.g. after
+        # model.bind(temperature=...), so they win over the model settings
+        temperature = settings.get("temperature")
+        match = CALL_TEMPERATURE.search(call_params)
+        if match:
+            try:
+                temperature = float(match.group(1))
+            except ValueError:  # None: not sent
+                temperature = None
+        if temperature is None:
+            temperature = DEFAULT_TEMPERATURE
+        return temperature <= self.max_temperature
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key, settings, call_params = self._key(prompt, llm_string)
+        if not self._cacheable(settings, call_params):
+            self.skipped += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT generations, input_tokens, output_tokens, created "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and self.ttl_seconds is not None:
+                if now - row[3] > self.ttl_seconds:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self._db.commit()
+            self.hits += 1
+            self.tokens_saved += row[1] + row[2]
+
+        messages = messages_from_dict(json.loads(row[0]))
+        return [ChatGeneration(message=message) for message in messages]
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: Sequence[Generation]
+    ) -> None:
+        key, settings, call_params = self._key(prompt, llm_string)
+        if not self._cacheable(settings, call_params):
+            return
+        messages = [g.message for g in return_val if isinstance(g, ChatGeneration)]
+        if len(messages) != len(return_val):
+            return  # only chat generations are stored
+
+        input_tokens = output_tokens = 0
+        for message in messages:
+            usage = getattr(message, "usage_metadata", None) or {}
+            input_tokens += usage.get("input_tokens", 0)
+            output_tokens += usage.get("output_tokens", 0)
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, generations, input_tokens, output_tokens, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    str(settings.get("model_name", "")),
+                    json.dumps(messages_to_dict(messages)),
+                    input_tokens,
+                    output_tokens,
+                    now,
+                    now,
+                ),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        if self.ttl_seconds is not None:
+            self._db.execute(
+                "DELETE FROM responses WHERE created < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, lifetime_hits, lifetime_saved = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0), "
+                "COALESCE(SUM(hits * (input_tokens + output_tokens)), 0) "
+                "FROM responses"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "tokens_saved": self.tokens_saved,
+            "lifetime_hits": lifetime_hits,
+            "lifetime_tokens_saved": lifetime_saved,
+        }
+
+    def close(self):
+        self._db.close()
+
+
+def run_prompts(cache: ResponseCache, label: str):
+    print(f"\n{label}")
+    print("-" * 80)
+
+    prompt = "Write a catchy tagline for a coffee shop."
+    for temperature in [0, 1]:
+        model = ChatOpenAI(
+            model=os.environ.get("AI_MODEL", "gpt-5-mini"),
+            temperature=temperature,
+            base_url=os.getenv("AI_ENDPOINT"),
+            api_key=os.getenv("AI_API_KEY"),
+            cache=cache,
+        )
+        start = time.perf_counter()
+        response = model.invoke(prompt)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  temperature={temperature}: {elapsed:6.0f} ms  {response.content}")
+
+    # A chapter 3 style template: same template + same variables = same request
+    template = ChatPromptTemplate.from_messages(
+        [
+            (
+                "system",
+                "You are a helpful assistant that translates {input_language} to {output_language}.",
+            ),
+            ("human", "{text}"),
+        ]
+    )
+    model = ChatOpenAI(
+        model=os.environ.get("AI_MODEL", "gpt-5-mini"),
+        temperature=0,
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+        cache=cache,
+    )
+    chain = template | model
+    start = time.perf_counter()
+    response = chain.invoke(
+        {
+            "input_language": "English",
+            "output_language": "French",
+            "text": "I love programming.",
+        }
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"  template (temperature=0): {elapsed:6.0f} ms  {response.content}")
+
+
+def main():
+    print(" Persistent Response Cache\n")
+    print("=" * 80)
+
+    cache = ResponseCache(
+        path=os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite"),
+        max_temperature=float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0")),
+    )
+
+    run_prompts(
+        cache, "Run 1 (a previous run of this script may already have cached these)"
+    )
+    run_prompts(cache, "Run 2 (temperature-0 requests are served from disk)")
+
+    stats = cache.stats()
+    print("\n" + "=" * 80)
+    print(" CACHE REPORT")
+    print("=" * 80)
+    print(
+        f"  Hits: {stats['hits']}   Misses: {stats['misses']}   Not cacheable (temperature): {stats['skipped']}"
+    )
+    print(f"  Tokens saved this run: {stats['tokens_saved']:,}")
+    print(
+        f"  Entries on disk: {stats['entries']}   Tokens saved all time: {stats['lifetime_tokens_saved']:,}"
+    )
+    if stats["skipped"] and not stats["hits"] + stats["misses"]:
+        print(
+            "  (Nothing cached: this model ignores temperature=0 - try LLM_CACHE_MAX_TEMPERATURE=1)"
+        )
+    cache.close()
+
+    print("\n Response Cache Features:")
+    print("   ✓ Survives restarts - stored in a SQLite file")
+    print("   ✓ Canonical key: model + parameters + tools + messages")
+    print("   ✓ Temperature policy: only deterministic calls by default")
+    print("   ✓ TTL expiry and an LRU cap on the number of entries")
+    print("   ✓ Reports the tokens each hit saved")
+    print()
+
+    print(" Tips:")
+    print("   • set_llm_cache(ResponseCache()) caches every model in a script")
+    print("   • Delete the cache file after changing prompts you want re-run")
+    print("   • Don't cache high temperatures - variety is the point there")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Sample: Base64 Embedding Transport
+
+Every embed_documents() response carries one vector per input. As JSON
+floats, a 1536-dimension vector is ~20 KB of text that has to be parsed
+into 1536 Python float objects. Ingestion workers that embed thousands of
+chunks spend a surprising share of their CPU time just doing that.
+
+The embeddings API can return each vector as a base64 string of raw
+little-endian float32 bytes instead. Base64EmbeddingsClient:
+- Requests encoding_format="base64" through the raw-response API, so the
+  SDK does not validate the payload or turn vectors into Python lists
+- Decodes each vector with np.frombuffer straight into a preallocated
+  (n, dim) float32 matrix - no intermediate list of Python floats
+- Returns the matrix from embed_documents_array(), ready for a vector index
+
+The demo starts a local stand-in embeddings server (no API key needed) and
+compares decode time and peak memory of three paths:
+1. JSON floats (encoding_format="float")
+2. The SDK default (base64 decoded to Python lists, then model_dump)
+3. Base64 decoded directly into a NumPy matrix
+
+Run: python 07-documents-embeddings-semantic-search/samples/base64_embeddings.py
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_openai import AzureOpenAIEmbeddings
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+class Base64EmbeddingsClient:
+    """
+    Wraps an (Azure)OpenAIEmbeddings instance and decodes base64 payloads
+    directly into NumPy. Texts are sent as-is, like check_embedding_ctx_length=False,
+    so inputs must already fit the model's context (chunk them first).
+    """
+
+    def __init__(self, embeddings: AzureOpenAIEmbeddings):
+        self.embeddings = embeddings
+
+    def _request(self, batch: list[str]) -> list[dict]:
+        params = {**self.embeddings._invocation_params, "encoding_format": "base64"}
+        raw = self.embeddings.client.with_raw_response.create(input=batch, **params)
+        # Parse the JSON envelope ourselves - the vectors are just short strings
+        data = json.loads(raw.http_response.content)["data"]
+        return sorted(data, key=lambda item: item["index"])
+
+    def embed_documents_array(self, texts: list[str]) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 matrix."""
+        chunk_size = self.embeddings.chunk_size
+        matrix: np.ndarray | None = None
+
+        for start in range(0, len(texts), chunk_size):
+            for item in self._request(texts[start : start + chunk_size]):
+                vector = np.frombuffer(base64.b64decode(item["embedding"]), "<f4")
+                if matrix is None:
+                    matrix = np.empty((len(texts), len(vector)), dtype=np.float32)
+                matrix[start + item["index"]] = vector
+
+        return matrix if matrix is not None else np.empty((0, 0), dtype=np.float32)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """LangChain-compatible interface (converts to lists at the very end)."""
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents_array([text])[0].tolist()
+
+
+# ----------------------------------------------------------------------
+# Local stand-in server
+# ----------------------------------------------------------------------
+
+
+def start_standin_server(dim: int = 1536) -> tuple[ThreadingHTTPServer, str]:
+    """
+    An embeddings endpoint that answers any POST .../embeddings request.
+
+    Response bodies are cached per (batch size, format) so the benchmark
+    measures the client, not the server.
+    """
+    rng = np.random.default_rng(0)
+    pool = rng.standard_normal((2048, dim)).astype(np.float32)
+    cache: dict[tuple[int, str], bytes] = {}
+    lock = threading.Lock()
+
+    def body_for(n: int, encoding: str) -> bytes:
+        with lock:
+            if (n, encoding) not in cache:
+                data = []
+                for i in range(n):
+                    vector = pool[i % len(pool)]
+                    if encoding == "base64":
+                        embedding = base64.b64encode(vector.astype("<f4").tobytes())
+                        embedding = embedding.decode("ascii")
+                    else:
+                        embedding = vector.tolist()
+                    data.append(
+                        {"object": "embedding", "index": i, "embedding": embedding}
+                    )
+                cache[(n, encoding)] = json.dumps(
+                    {
+                        "object": "list",
+                        "data": data,
+                        "model": "stand-in",
+                        "usage": {"prompt_tokens": n, "total_tokens": n},
+                    }
+                ).encode("utf-8")
+            return cache[(n, encoding)]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            inputs = request["input"]
+            n = len(inputs) if isinstance(inputs, list) else 1
+            body = body_for(n, request.get("encoding_format", "float"))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def measure(label: str, fn, texts: list[str]):
+    """Wall time (best of 3) and peak traced memory for one decode path."""
+    fn(texts[:10])  # warm up connections and caches
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(texts)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(texts)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"   {label:<36}{min(timings) * 1000:>10.0f} ms{peak / 1e6:>12.1f} MB")
+
+
+def main():
+    print(" Base64 Embedding Transport\n")
+    print("=" * 80 + "\n")
+
+    server, endpoint = start_standin_server(dim=1536)
+    num_texts = int(os.getenv("NUM_TEXTS", "4000"))
+    texts = [f"chunk number {i}" for i in range(num_texts)]
+
+    def local_embeddings(**kwargs) -> AzureOpenAIEmbeddings:
+        return AzureOpenAIEmbeddings(
+            azure_endpoint=endpoint,
+            api_key="not-needed",
+            model="text-embedding-ada-002",
+            api_version="2024-02-01",
+            check_embedding_ctx_length=False,
+            **kwargs,
+        )
+
+    float_json = local_embeddings(model_kwargs={"encoding_format": "float"})
+    sdk_default = local_embeddings()
+    fast = Base64EmbeddingsClient(local_embeddings())
+
+    print(
+        f" Embedding {num_texts:,} texts x 1536 dims against a local stand-in server\n"
+    )
+    print(f"   {'Path':<36}{'Time':>13}{'Peak memory':>14}")
+    print("   " + "─" * 62)
+
+    # Paths 1 and 2 end with the same np.asarray a vector index would do
+    measure(
+        "JSON floats -> lists -> matrix",
+        lambda t: np.asarray(float_json.embed_documents(t), np.float32),
+        texts,
+    )
+    measure(
+        "SDK base64 -> lists -> matrix",
+        lambda t: np.asarray(sdk_default.embed_documents(t), np.float32),
+        texts,
+    )
+    measure("base64 -> frombuffer -> matrix", fast.embed_documents_array, texts)
+
+    # Same numbers either way
+    reference = np.asarray(float_json.embed_documents(texts[:50]), np.float32)
+    assert np.allclose(reference, fast.embed_documents_array(texts[:50]))
+    server.shutdown()
+
+    if os.getenv("AI_API_KEY"):
+        print("\n Checking against the real embeddings endpoint...")
+        embeddings = AzureOpenAIEmbeddings(
+            azure_endpoint=get_embeddings_endpoint(),
+            api_key=os.getenv("AI_API_KEY"),
+            model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+            api_version="2024-02-01",
+        )
+        sample = ["Machine learning is a subset of artificial intelligence"]
+        expected = np.asarray(embeddings.embed_documents(sample), np.float32)
+        actual = Base64EmbeddingsClient(embeddings).embed_documents_array(sample)
+        print(
+            f"   Max difference vs embed_documents: {np.abs(expected - actual).max():.2e}"
+        )
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • base64 float32 is ~4x smaller on the wire than JSON float text")
+    print("   • Decoding with np.frombuffer skips creating millions of Python floats")
+    print("   • Writing into a preallocated matrix avoids extra copies and memory")
+    print("   • Keep vectors as NumPy all the way into the index for the full benefit")
+
+
+if __name__ == "__main__":
+    main()
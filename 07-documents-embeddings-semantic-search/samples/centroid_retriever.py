@@ -0,0 +1,268 @@
+"""
+Sample: Two-Stage Coarse-to-Fine Retrieval with Document Centroids
+
+After splitting (04_metadata.py) every chunk keeps its `source`. A flat
+vector search ignores that and scores every chunk of every document for
+every query. With long documents that is mostly wasted work: a question
+about vector databases does not need the 200 chunks of the LangChain intro.
+
+CentroidRetriever searches in two stages:
+1. Coarse: score one centroid (mean chunk vector) per source document and
+   keep the top M documents
+2. Fine: score only the chunks of those M documents and return the top k
+
+Chunks are stored grouped by document in one contiguous matrix, so stage 2
+is a handful of slices instead of a filter over every row. M is tunable:
+larger M means higher recall and more work. The demo compares recall@k
+against flat search and reports the fraction of rows actually scored.
+
+Run: python 07-documents-embeddings-semantic-search/samples/centroid_retriever.py
+"""
+
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_openai import AzureOpenAIEmbeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class CentroidRetriever:
+    def __init__(
+        self,
+        embedding: Embeddings | None,
+        vectors: np.ndarray,
+        chunks: list[Document],
+        doc_key: str = "source",
+        m: int = 5,
+    ):
+        """
+        Build the index from chunk vectors. Use from_documents() to embed.
+
+        Chunks are re-ordered so that every document's rows are contiguous;
+        `doc_starts[d]:doc_starts[d + 1]` are the rows of document d.
+        """
+        self.embedding = embedding
+        self.doc_key = doc_key
+        self.m = m
+
+        groups: dict[str, list[int]] = defaultdict(list)
+        for i, chunk in enumerate(chunks):
+            groups[chunk.metadata.get(doc_key, "unknown")].append(i)
+
+        order = np.fromiter(
+            (i for rows in groups.values() for i in rows), dtype=np.int64
+        )
+        self.doc_names = list(groups)
+        self.vectors = normalize(np.asarray(vectors, dtype=np.float32)[order])
+        self.chunks = [chunks[i] for i in order]
+        sizes = np.array([len(rows) for rows in groups.values()])
+        self.doc_starts = np.concatenate([[0], np.cumsum(sizes)])
+
+        # Centroid = normalized mean of a document's normalized chunk vectors
+        sums = np.add.reduceat(self.vectors, self.doc_starts[:-1], axis=0)
+        self.centroids = normalize(sums / sizes[:, None])
+
+    @classmethod
+    def from_documents(
+        cls, chunks: list[Document], embedding: Embeddings, **kwargs
+    ) -> "CentroidRetriever":
+        vectors = embedding.embed_documents([c.page_content for c in chunks])
+        return cls(embedding, np.asarray(vectors, dtype=np.float32), chunks, **kwargs)
+
+    def search_by_vector(
+        self, query: np.ndarray, k: int = 4, m: int | None = None
+    ) -> tuple[list[int], list[float], int]:
+        """Return (row ids, scores, rows scored) for a normalized query vector."""
+        m = m or self.m
+        # Mixed float64 @ float32 products are far slower than float32 @ float32
+        query = np.asarray(query, dtype=np.float32)
+
+        # Stage 1: coarse - pick the M most promising documents
+        top_docs = top_k_indices(self.centroids @ query, m)
+
+        # Stage 2: fine - score only those documents' chunks
+        rows = np.concatenate(
+            [np.arange(self.doc_starts[d], self.doc_starts[d + 1]) for d in top_docs]
+        )
+        scores = self.vectors[rows] @ query
+        best = top_k_indices(scores, k)
+        return rows[best].tolist(), scores[best].tolist(), len(rows)
+
+    def flat_search_by_vector(
+        self, query: np.ndarray, k: int = 4
+    ) -> tuple[list[int], list[float], int]:
+        """Baseline: score every chunk."""
+        query = np.asarray(query, dtype=np.float32)
+        scores = self.vectors @ query
+        best = top_k_indices(scores, k)
+        return best.tolist(), scores[best].tolist(), len(scores)
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, m: int | None = None
+    ) -> list[tuple[Document, float]]:
+        vector = normalize(np.asarray(self.embedding.embed_query(query), np.float32))
+        rows, scores, _ = self.search_by_vector(vector, k, m)
+        return [(self.chunks[r], s) for r, s in zip(rows, scores)]
+
+    def similarity_search(
+        self, query: str, k: int = 4, m: int | None = None
+    ) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, m)]
+
+
+def compare_with_flat(
+    retriever: CentroidRetriever, queries: np.ndarray, k: int, m_values: list[int]
+):
+    """Recall@k against flat search and share of rows scored, for each M."""
+    flat = [set(retriever.flat_search_by_vector(q, k)[0]) for q in queries]
+    total_rows = len(retriever.vectors)
+
+    print(
+        f"{'M':>6}{'Recall@k':>11}{'Rows scored':>14}{'Work saved':>12}{'ms/query':>11}"
+    )
+    print("─" * 54)
+    for m in m_values:
+        hits, scored = 0, 0
+        start = time.perf_counter()
+        for query, expected in zip(queries, flat):
+            rows, _, n = retriever.search_by_vector(query, k, m)
+            hits += len(set(rows) & expected)
+            scored += n
+        elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+        share = scored / (len(queries) * total_rows)
+        print(
+            f"{m:>6}{hits / (len(queries) * k):>11.3f}{share:>13.1%}"
+            f"{1 / share:>11.1f}x{elapsed:>11.3f}"
+        )
+
+    start = time.perf_counter()
+    for query in queries:
+        retriever.flat_search_by_vector(query, k)
+    elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"{'flat':>6}{1.0:>11.3f}{1.0:>13.1%}{1.0:>11.1f}x{elapsed:>11.3f}")
+
+
+def synthetic_corpus(docs: int, chunks_per_doc: int, dim: int, seed: int = 42):
+    """Long documents whose chunks cluster around a per-document topic vector."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((docs, dim)).astype(np.float32)
+    vectors = np.repeat(topics, chunks_per_doc, axis=0) + 2.0 * rng.standard_normal(
+        (docs * chunks_per_doc, dim)
+    ).astype(np.float32)
+    chunks = [
+        Document(page_content=f"chunk {c}", metadata={"source": f"doc-{d}.md"})
+        for d in range(docs)
+        for c in range(chunks_per_doc)
+    ]
+    # Queries are paraphrases of random chunks
+    picks = rng.integers(0, len(vectors), size=200)
+    queries = normalize(
+        normalize(vectors[picks])
+        + 0.5 * rng.standard_normal((200, dim)).astype(np.float32) / np.sqrt(dim)
+    )
+    return vectors, chunks, queries
+
+
+documents = [
+    Document(
+        page_content=(
+            "LangChain is a framework for building AI applications. It provides abstractions "
+            "for working with language models, vector stores, and chains. The framework supports "
+            "multiple LLM providers including OpenAI, Anthropic, and Azure. Prompt templates "
+            "make prompts reusable and testable. Output parsers turn model text into structured data. "
+            "Agents combine models with tools so they can take actions."
+        ),
+        metadata={"source": "langchain-intro.md"},
+    ),
+    Document(
+        page_content=(
+            "RAG (Retrieval Augmented Generation) systems combine document retrieval with "
+            "language model generation. This allows LLMs to access external knowledge and provide "
+            "more accurate, contextual responses without retraining the model. Retrieved passages "
+            "are added to the prompt as context. Citations let users verify the answer."
+        ),
+        metadata={"source": "rag-explained.md"},
+    ),
+    Document(
+        page_content=(
+            "Vector databases store embeddings and enable semantic search. Unlike traditional "
+            "keyword search, semantic search understands meaning and context. Popular vector "
+            "databases include Pinecone, Weaviate, and Chroma. Approximate nearest neighbour "
+            "indexes such as HNSW trade a little recall for much faster queries."
+        ),
+        metadata={"source": "vector-db-guide.md"},
+    ),
+]
+
+
+def main():
+    print(" Two-Stage Centroid Retrieval\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=120, chunk_overlap=0)
+    chunks = splitter.split_documents(documents)
+    print(f" Split {len(documents)} documents into {len(chunks)} chunks\n")
+
+    retriever = CentroidRetriever.from_documents(chunks, embeddings, m=1)
+
+    for query in ["Which vector databases are popular?", "How do citations help RAG?"]:
+        print(f' Query: "{query}" (M=1: only the best document is scanned)\n')
+        for doc, score in retriever.similarity_search_with_score(query, k=2):
+            print(
+                f"   {score:.4f}  [{doc.metadata['source']}] {doc.page_content[:60]}..."
+            )
+        print()
+
+    print("=" * 80 + "\n")
+
+    # At scale: 2,000 long documents x 100 chunks, synthetic vectors (offline)
+    print(" Long-document corpus: 2,000 documents x 100 chunks (synthetic, 256 dims)\n")
+    vectors, synthetic_chunks, queries = synthetic_corpus(2000, 100, 256)
+    big = CentroidRetriever(None, vectors, synthetic_chunks)
+    compare_with_flat(big, queries, k=10, m_values=[5, 20, 50, 200])
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • One centroid per document is a cheap summary for a first pass")
+    print("   • Scoring only the top-M documents' chunks cuts work by 10x or more")
+    print("   • Tune M with the recall table: stop where recall stops improving")
+    print("   • Contiguous per-document rows make stage 2 a few array slices")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Sample: Retrieval Evaluation Harness
+
+Eyeballing the output of similarity_search_with_score works for six
+documents, but it can't tell you whether a new index, quantization or
+chunking setting made retrieval worse. This harness measures it instead.
+
+Given a corpus and labeled (query, relevant ids) pairs, it runs every query
+against one or more vector store configurations and reports:
+- Quality: recall@k, nDCG@k and MRR
+- Speed: p50 / p95 / p99 search latency and queries per second
+
+Each configuration is appended as one JSON line to a results file so runs
+can be compared side by side (e.g. with pandas.read_json(lines=True)).
+
+Query embeddings are computed once up front and reused for every
+configuration, so latency numbers measure the vector store itself and are
+not dominated by network round trips to the embeddings API.
+
+Run: python 07-documents-embeddings-semantic-search/samples/retrieval_eval.py
+"""
+
+import json
+import math
+import os
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import InMemoryVectorStore, VectorStore
+from langchain_openai import AzureOpenAIEmbeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+@dataclass
+class LabeledQuery:
+    query: str
+    relevant_ids: set[str]
+
+
+@dataclass
+class EvalResult:
+    config: str
+    k: int
+    num_queries: int
+    recall_at_k: float
+    ndcg_at_k: float
+    mrr: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    qps: float
+    build_seconds: float
+    timestamp: str
+
+
+# A store factory receives the corpus and the embeddings and returns a
+# ready-to-query vector store. Anything implementing VectorStore works.
+StoreFactory = Callable[[list[Document], Embeddings], VectorStore]
+
+
+def recall_at_k(retrieved: list[str], relevant: set[str], k: int) -> float:
+    if not relevant:
+        return 0.0
+    return len(set(retrieved[:k]) & relevant) / len(relevant)
+
+
+def ndcg_at_k(retrieved: list[str], relevant: set[str], k: int) -> float:
+    dcg = sum(
+        1.0 / math.log2(rank + 2)
+        for rank, doc_id in enumerate(retrieved[:k])
+        if doc_id in relevant
+    )
+    ideal = sum(1.0 / math.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / ideal if ideal else 0.0
+
+
+def reciprocal_rank(retrieved: list[str], relevant: set[str]) -> float:
+    for rank, doc_id in enumerate(retrieved):
+        if doc_id in relevant:
+            return 1.0 / (rank + 1)
+    return 0.0
+
+
+def source_ids(docs: list[Document], id_key: str) -> list[str]:
+    """
+    Map retrieved documents back to corpus ids, keeping the first hit of each.
+
+    Chunked configurations return several chunks of the same document, so
+    relevance is judged on the `id_key` metadata every chunk inherits.
+    """
+    seen: list[str] = []
+    for doc in docs:
+        doc_id = doc.metadata.get(id_key, doc.id)
+        if doc_id not in seen:
+            seen.append(doc_id)
+    return seen
+
+
+def evaluate(
+    config: str,
+    factory: StoreFactory,
+    corpus: list[Document],
+    queries: list[LabeledQuery],
+    embeddings: Embeddings,
+    query_vectors: list[list[float]],
+    k: int = 3,
+    id_key: str = "doc_id",
+    fetch_k: int | None = None,
+) -> EvalResult:
+    """Build one configuration and run every labeled query against it."""
+    build_start = time.perf_counter()
+    store = factory(corpus, embeddings)
+    build_seconds = time.perf_counter() - build_start
+
+    # Chunked stores need to fetch more rows to fill k distinct documents
+    fetch_k = fetch_k or k
+
+    latencies = []
+    recalls, ndcgs, rrs = [], [], []
+
+    run_start = time.perf_counter()
+    for labeled, vector in zip(queries, query_vectors):
+        start = time.perf_counter()
+        results = store.similarity_search_by_vector(vector, k=fetch_k)
+        latencies.append(time.perf_counter() - start)
+
+        retrieved = source_ids(results, id_key)
+        recalls.append(recall_at_k(retrieved, labeled.relevant_ids, k))
+        ndcgs.append(ndcg_at_k(retrieved, labeled.relevant_ids, k))
+        rrs.append(reciprocal_rank(retrieved, labeled.relevant_ids))
+    elapsed = time.perf_counter() - run_start
+
+    latencies_ms = np.array(latencies) * 1000
+    return EvalResult(
+        config=config,
+        k=k,
+        num_queries=len(queries),
+        recall_at_k=float(np.mean(recalls)),
+        ndcg_at_k=float(np.mean(ndcgs)),
+        mrr=float(np.mean(rrs)),
+        latency_p50_ms=float(np.percentile(latencies_ms, 50)),
+        latency_p95_ms=float(np.percentile(latencies_ms, 95)),
+        latency_p99_ms=float(np.percentile(latencies_ms, 99)),
+        qps=len(queries) / elapsed if elapsed else float("inf"),
+        build_seconds=build_seconds,
+        timestamp=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def write_results(results: list[EvalResult], path: str):
+    """Append one JSON object per configuration (JSON Lines)."""
+    with open(path, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(asdict(result)) + "\n")
+
+
+def print_report(results: list[EvalResult]):
+    header = f"{'Config':<22}{'Recall@k':>10}{'nDCG@k':>9}{'MRR':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'QPS':>9}"
+    print(header)
+    print("─" * len(header))
+    for r in results:
+        print(
+            f"{r.config:<22}{r.recall_at_k:>10.3f}{r.ndcg_at_k:>9.3f}{r.mrr:>7.3f}"
+            f"{r.latency_p50_ms:>9.3f}{r.latency_p95_ms:>9.3f}{r.latency_p99_ms:>9.3f}"
+            f"{r.qps:>9.0f}"
+        )
+
+
+# Corpus: each document carries a stable doc_id used by the labels below
+corpus = [
+    Document(
+        page_content="Python is excellent for data science and machine learning applications. Libraries like pandas and scikit-learn make analysis straightforward.",
+        metadata={"doc_id": "python-ds", "category": "programming"},
+    ),
+    Document(
+        page_content="JavaScript powers interactive web applications and modern frontends. Frameworks like React and Vue build on it.",
+        metadata={"doc_id": "js-web", "category": "programming"},
+    ),
+    Document(
+        page_content="Cats are independent pets that sleep up to 16 hours a day and need little supervision.",
+        metadata={"doc_id": "cats", "category": "animals"},
+    ),
+    Document(
+        page_content="Dogs are social animals that require daily walks and playtime with their owners.",
+        metadata={"doc_id": "dogs", "category": "animals"},
+    ),
+    Document(
+        page_content="Machine learning models learn patterns from training data and generalize to unseen examples.",
+        metadata={"doc_id": "ml-basics", "category": "AI"},
+    ),
+    Document(
+        page_content="Deep learning uses neural networks with many layers to learn hierarchical representations.",
+        metadata={"doc_id": "deep-learning", "category": "AI"},
+    ),
+    Document(
+        page_content="A sourdough starter needs regular feeding with flour and water to stay active.",
+        metadata={"doc_id": "sourdough", "category": "cooking"},
+    ),
+]
+
+labeled_queries = [
+    LabeledQuery(
+        "AI and machine learning programming",
+        {"ml-basics", "python-ds", "deep-learning"},
+    ),
+    LabeledQuery("pets that need less attention", {"cats"}),
+    LabeledQuery("web development frameworks", {"js-web"}),
+    LabeledQuery("neural network layers", {"deep-learning"}),
+    LabeledQuery("baking bread at home", {"sourdough"}),
+    LabeledQuery("animals that need exercise", {"dogs"}),
+]
+
+
+def flat_store(docs: list[Document], embeddings: Embeddings) -> VectorStore:
+    return InMemoryVectorStore.from_documents(docs, embeddings)
+
+
+def chunked_store(chunk_size: int) -> StoreFactory:
+    def factory(docs: list[Document], embeddings: Embeddings) -> VectorStore:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=0
+        )
+        return InMemoryVectorStore.from_documents(
+            splitter.split_documents(docs), embeddings
+        )
+
+    return factory
+
+
+def main():
+    print(" Retrieval Evaluation Harness\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    configs: dict[str, StoreFactory] = {
+        "flat": flat_store,
+        "chunked-80": chunked_store(80),
+        "chunked-50": chunked_store(50),
+    }
+
+    print(f" Corpus: {len(corpus)} documents, {len(labeled_queries)} labeled queries")
+    print(f" Configurations: {', '.join(configs)}\n")
+
+    # Embed queries once so every configuration sees identical inputs
+    query_vectors = embeddings.embed_documents([q.query for q in labeled_queries])
+
+    results = [
+        evaluate(
+            name,
+            factory,
+            corpus,
+            labeled_queries,
+            embeddings,
+            query_vectors,
+            k=3,
+            fetch_k=10,
+        )
+        for name, factory in configs.items()
+    ]
+
+    print_report(results)
+
+    output_path = os.getenv("EVAL_OUTPUT", "retrieval_eval_results.jsonl")
+    write_results(results, output_path)
+    print(f"\n Results appended to {output_path}")
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Recall@k: how many relevant documents made it into the top k")
+    print("   • nDCG@k: rewards putting relevant documents near the top")
+    print("   • MRR: how early the first relevant document appears")
+    print("   • Track latency percentiles, not averages - p99 is what users feel")
+    print("   • Re-run after every index, quantization or chunking change")
+
+
+if __name__ == "__main__":
+    main()
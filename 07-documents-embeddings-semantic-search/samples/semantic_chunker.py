@@ -0,0 +1,280 @@
+"""
+Sample: Fast Semantic Chunking
+
+Fixed-size chunking (02_splitting.py) cuts wherever the character count
+runs out, often in the middle of a topic. Semantic chunking cuts where the
+meaning changes instead: embed each sentence, and start a new chunk where
+two neighbouring sentences are unusually dissimilar.
+
+The naive version embeds sentence by sentence and is far too slow for a
+real corpus. This one is built for throughput:
+- Sentences from ALL documents are embedded together in large batches
+- Identical sentences (boilerplate, disclaimers) are embedded only once,
+  and a bounded LRU cache keeps them across calls
+- Neighbour smoothing, adjacent similarities and breakpoints are computed
+  with vectorized NumPy - no Python loop over sentence pairs
+- Chunks still respect a maximum size, so they fit the embedding model;
+  a single sentence longer than that is split by characters first
+
+Run: python 07-documents-embeddings-semantic-search/samples/semantic_chunker.py
+"""
+
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_openai import AzureOpenAIEmbeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+# Split after ., ! or ? followed by whitespace, and on blank lines
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+
+
+class BatchedEmbeddingCache:
+    """Embeds unique texts in large batches and remembers the most recent ones."""
+
+    def __init__(
+        self, embeddings: Embeddings, batch_size: int = 512, max_entries: int = 100_000
+    ):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.api_calls = 0
+        self.texts_embedded = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Return an (n, dim) float32 matrix, calling the API only for new texts."""
+        keys = [self._key(t) for t in texts]
+        # This call's vectors, so none is lost if the cache evicts it meanwhile
+        found: dict[str, np.ndarray] = {}
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                found[key] = self._cache[key]
+            else:
+                missing[key] = text
+        self.cache_hits += len(texts) - len(missing)
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            vectors = self.embeddings.embed_documents([text for _, text in batch])
+            self.api_calls += 1
+            self.texts_embedded += len(batch)
+            for (key, _), vector in zip(batch, vectors):
+                found[key] = self._cache[key] = np.asarray(vector, dtype=np.float32)
+                if len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        return np.stack([found[key] for key in keys])
+
+
+class SemanticChunker:
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        chunk_size: int = 1000,
+        breakpoint_percentile: float = 90.0,
+        window: int = 1,
+        batch_size: int = 512,
+        max_cached: int = 100_000,
+    ):
+        self.cache = BatchedEmbeddingCache(
+            embeddings, batch_size=batch_size, max_entries=max_cached
+        )
+        self.chunk_size = chunk_size
+        # Only for sentences that are longer than a whole chunk
+        self._long_sentence_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=0
+        )
+        self.breakpoint_percentile = breakpoint_percentile
+        self.window = window
+
+    def _smooth(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Average each sentence with `window` neighbours on each side.
+
+        Single sentences are noisy; smoothing makes breakpoints reflect topic
+        shifts. A cumulative sum gives every window mean in one pass.
+        """
+        if self.window == 0:
+            return vectors
+        n = len(vectors)
+        padded = np.vstack(
+            [np.zeros((1, vectors.shape[1]), dtype=vectors.dtype), vectors]
+        )
+        cumsum = np.cumsum(padded, axis=0)
+        idx = np.arange(n)
+        lo = np.clip(idx - self.window, 0, n)
+        hi = np.clip(idx + self.window + 1, 0, n)
+        return (cumsum[hi] - cumsum[lo]) / (hi - lo)[:, None]
+
+    def _breakpoints(self, vectors: np.ndarray) -> np.ndarray:
+        """Boolean mask: True at i means a new chunk starts at sentence i + 1."""
+        if len(vectors) < 2:
+            return np.zeros(0, dtype=bool)
+        smoothed = self._smooth(vectors)
+        smoothed /= np.linalg.norm(smoothed, axis=1, keepdims=True).clip(min=1e-12)
+        # Cosine similarity of every adjacent pair at once
+        distances = 1.0 - np.einsum("ij,ij->i", smoothed[:-1], smoothed[1:])
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+        return distances > threshold
+
+    def _sentences(self, text: str) -> list[str]:
+        sentences = []
+        for sentence in split_sentences(text):
+            if len(sentence) > self.chunk_size:
+                sentences.extend(self._long_sentence_splitter.split_text(sentence))
+            else:
+                sentences.append(sentence)
+        return sentences
+
+    def split_documents(self, documents: list[Document]) -> list[Document]:
+        sentences_per_doc = [self._sentences(doc.page_content) for doc in documents]
+
+        # One batched embedding pass over every sentence of every document
+        all_sentences = [s for sentences in sentences_per_doc for s in sentences]
+        if not all_sentences:
+            return []
+        all_vectors = self.cache.embed(all_sentences)
+
+        chunks: list[Document] = []
+        offset = 0
+        for doc, sentences in zip(documents, sentences_per_doc):
+            vectors = all_vectors[offset : offset + len(sentences)]
+            offset += len(sentences)
+            breaks = self._breakpoints(vectors)
+
+            current: list[str] = []
+            size = 0
+            for i, sentence in enumerate(sentences):
+                too_big = current and size + len(sentence) + 1 > self.chunk_size
+                topic_shift = i > 0 and breaks[i - 1]
+                if current and (too_big or topic_shift):
+                    chunks.append(
+                        Document(
+                            page_content=" ".join(current), metadata=dict(doc.metadata)
+                        )
+                    )
+                    current, size = [], 0
+                current.append(sentence)
+                size += len(sentence) + 1
+            if current:
+                chunks.append(
+                    Document(
+                        page_content=" ".join(current), metadata=dict(doc.metadata)
+                    )
+                )
+
+        return chunks
+
+
+long_text = """
+Artificial Intelligence (AI) is transforming how we interact with technology. From virtual assistants to recommendation systems, AI is becoming an integral part of our daily lives. Companies across every industry are investing in AI capabilities.
+
+Machine learning is a subset of AI that enables systems to learn from experience. It focuses on programs that can access data and use it to learn for themselves. Models improve as they see more examples.
+
+Sourdough bread relies on a starter of wild yeast and lactic acid bacteria. The starter must be fed with flour and water every day. A long, cold fermentation develops the characteristic sour flavor.
+
+Baking at a high temperature creates a crisp crust. Steam in the first minutes of baking lets the loaf expand before the crust sets. Let the bread cool fully before slicing it.
+
+Deep learning uses neural networks with many layers. It powers image recognition, speech recognition and large language models. Training these networks requires large datasets and GPUs.
+"""
+
+
+def main():
+    print(" Semantic Chunker\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    chunker = SemanticChunker(embeddings, chunk_size=400, breakpoint_percentile=75)
+    doc = Document(page_content=long_text, metadata={"source": "ai-and-baking.txt"})
+
+    print(" Semantic chunks (cut where the topic changes):\n")
+    start = time.perf_counter()
+    semantic_chunks = chunker.split_documents([doc])
+    semantic_seconds = time.perf_counter() - start
+
+    for i, chunk in enumerate(semantic_chunks):
+        print(f"Chunk {i + 1} ({len(chunk.page_content)} chars):")
+        print(f"  {chunk.page_content[:100]}...\n")
+
+    print("=" * 80 + "\n")
+    print(" Fixed-size chunks (cut where the character count runs out):\n")
+
+    char_splitter = RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=0)
+    start = time.perf_counter()
+    char_chunks = char_splitter.split_documents([doc])
+    char_seconds = time.perf_counter() - start
+
+    for i, chunk in enumerate(char_chunks):
+        print(f"Chunk {i + 1} ({len(chunk.page_content)} chars):")
+        print(f"  {chunk.page_content[:100]}...\n")
+
+    print("=" * 80 + "\n")
+
+    # Re-chunking a corpus with repeated text hits the cache instead of the API
+    print(" Re-chunking a 50-document corpus that repeats the same paragraphs...\n")
+    corpus = [Document(page_content=long_text, metadata={"id": i}) for i in range(50)]
+    calls_before = chunker.cache.api_calls
+    start = time.perf_counter()
+    chunker.split_documents(corpus)
+    corpus_seconds = time.perf_counter() - start
+
+    print(f"   Semantic chunking, 1 doc:   {semantic_seconds * 1000:.1f} ms")
+    print(f"   Character chunking, 1 doc:  {char_seconds * 1000:.1f} ms")
+    print(f"   Semantic chunking, 50 docs: {corpus_seconds * 1000:.1f} ms")
+    print(
+        f"   Embedding API calls:        {chunker.cache.api_calls} total, {chunker.cache.api_calls - calls_before} for the corpus"
+    )
+    print(f"   Sentences embedded:         {chunker.cache.texts_embedded}")
+    print(f"   Sentence cache hits:        {chunker.cache.cache_hits}")
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Semantic chunks follow topic boundaries instead of character counts")
+    print("   • Batching turns thousands of sentence embeddings into a few API calls")
+    print("   • Caching means repeated text is never embedded twice")
+    print("   • Breakpoints come from one vectorized pass over adjacent similarities")
+
+
+if __name__ == "__main__":
+    main()
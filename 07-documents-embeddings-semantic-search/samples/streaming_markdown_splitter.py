@@ -0,0 +1,264 @@
+"""
+Sample: Streaming Markdown Splitter
+
+smart_chunker.py loads the whole document into a string, runs
+MarkdownHeaderTextSplitter over it, then runs RecursiveCharacterTextSplitter
+over the same text again. That is fine for a README, but not for a
+multi-hundred-MB generated documentation dump.
+
+StreamingMarkdownSplitter does both jobs in a single pass while reading the
+file line by line:
+- Tracks the header stack (#, ##, ###) and attaches it to every chunk as
+  "Header 1" / "Header 2" / "Header 3" metadata, like MarkdownHeaderTextSplitter
+- Applies the size limit inside each section, preferring paragraph breaks,
+  then line breaks, with optional overlap between chunks
+- Ignores "#" lines inside fenced code blocks
+- Yields Document objects as soon as they are complete
+
+Only the current chunk is held in memory, so memory use depends on
+chunk_size, not on the size of the document.
+
+Run: python 07-documents-embeddings-semantic-search/samples/streaming_markdown_splitter.py
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Iterator
+
+from langchain_core.documents import Document
+
+DEFAULT_HEADERS = [
+    ("#", "Header 1"),
+    ("##", "Header 2"),
+    ("###", "Header 3"),
+]
+
+
+class StreamingMarkdownSplitter:
+    def __init__(
+        self,
+        headers_to_split_on: list[tuple[str, str]] = DEFAULT_HEADERS,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 0,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) must be smaller than "
+                f"chunk_size ({chunk_size})"
+            )
+        # Longest marker first so "###" is not matched as "#"
+        self.headers = sorted(headers_to_split_on, key=lambda h: -len(h[0]))
+        self.levels = {marker: len(marker) for marker, _ in headers_to_split_on}
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split_file(self, path: str, encoding: str = "utf-8") -> Iterator[Document]:
+        """Stream chunks from a markdown file without reading it whole."""
+        with open(path, "r", encoding=encoding) as f:
+            yield from self.split_lines(f, source=path)
+
+    def split_lines(self, lines, source: str | None = None) -> Iterator[Document]:
+        """Split any iterable of lines (file object, generator, list)."""
+        header_stack: dict[str, str] = {}
+        header_levels: dict[str, int] = {}
+        buffer: list[str] = []
+        # Source line number of each buffered line (pieces share their line's)
+        numbers: list[int] = []
+        size = 0
+        # Number of leading buffer lines that are overlap from the last chunk
+        carried = 0
+        carried_size = 0
+        in_code_block = False
+        line_number = 0
+
+        def make_document(
+            chunk_lines: list[str], chunk_numbers: list[int]
+        ) -> Document | None:
+            text = "".join(chunk_lines).strip()
+            if not text:
+                return None
+            metadata = dict(header_stack)
+            # The first line that survives strip(), not a leading blank line
+            metadata["start_line"] = next(
+                n for line, n in zip(chunk_lines, chunk_numbers) if line.strip()
+            )
+            if source:
+                metadata["source"] = source
+            return Document(page_content=text, metadata=metadata)
+
+        def emit(split: bool) -> Iterator[Document]:
+            """Emit the buffer (or its head, up to the last paragraph break)."""
+            nonlocal buffer, numbers, size, carried, carried_size
+            cut = len(buffer)
+            if split:
+                for i in range(len(buffer) - 1, carried, -1):
+                    if not buffer[i].strip():
+                        cut = i
+                        break
+            chunk_lines, rest = buffer[:cut], buffer[cut:]
+            chunk_numbers, rest_numbers = numbers[:cut], numbers[cut:]
+
+            doc = make_document(chunk_lines, chunk_numbers)
+            if doc:
+                yield doc
+
+            while rest and not rest[0].strip():
+                rest, rest_numbers = rest[1:], rest_numbers[1:]
+
+            overlap: list[str] = []
+            overlap_size = 0
+            if self.chunk_overlap:
+                for line in reversed(chunk_lines):
+                    if overlap_size + len(line) > self.chunk_overlap:
+                        break
+                    overlap.insert(0, line)
+                    overlap_size += len(line)
+
+            buffer = overlap + rest
+            numbers = chunk_numbers[len(chunk_numbers) - len(overlap) :] + rest_numbers
+            size = sum(len(line) for line in buffer)
+            carried, carried_size = len(overlap), overlap_size
+
+        def reset_section():
+            nonlocal buffer, numbers, size, carried, carried_size
+            buffer, numbers, size, carried, carried_size = [], [], 0, 0, 0
+
+        for raw_line in lines:
+            line_number += 1
+            stripped = raw_line.strip()
+
+            if stripped.startswith(("```", "~~~")):
+                in_code_block = not in_code_block
+
+            header = None if in_code_block else self._match_header(stripped)
+            if header:
+                marker, name, title = header
+                yield from emit(split=False)
+                level = self.levels[marker]
+                for key in [k for k, lvl in header_levels.items() if lvl >= level]:
+                    header_stack.pop(key)
+                    header_levels.pop(key)
+                header_stack[name] = title
+                header_levels[name] = level
+                reset_section()
+                continue
+
+            # Lines longer than a whole chunk are cut into chunk-sized pieces
+            pieces = [
+                raw_line[i : i + self.chunk_size]
+                for i in range(0, max(len(raw_line), 1), self.chunk_size)
+            ]
+            for piece in pieces:
+                while size + len(piece) > self.chunk_size and size > carried_size:
+                    yield from emit(split=True)
+                if size + len(piece) > self.chunk_size:
+                    # Only overlap is left and it does not fit - drop it
+                    buffer, size = buffer[carried:], size - carried_size
+                    numbers = numbers[carried:]
+                    carried, carried_size = 0, 0
+                buffer.append(piece)
+                numbers.append(line_number)
+                size += len(piece)
+
+        yield from emit(split=False)
+
+    def _match_header(self, stripped: str) -> tuple[str, str, str] | None:
+        for marker, name in self.headers:
+            if stripped.startswith(marker + " ") or stripped == marker:
+                return marker, name, stripped[len(marker) :].strip()
+        return None
+
+
+SECTION = """
+## Types of Learning
+
+### Supervised Learning
+
+Supervised learning uses labeled data to train models. Examples include:
+- Classification: Categorizing emails as spam or not spam
+- Regression: Predicting house prices based on features
+
+### Unsupervised Learning
+
+Unsupervised learning finds patterns in unlabeled data. Common techniques:
+- Clustering: Grouping similar customers together
+- Dimensionality reduction: Simplifying complex datasets
+
+```python
+# This is a comment inside a code block, not a header
+model.fit(X_train, y_train)
+```
+
+## Best Practices
+
+Always split your data into training and testing sets. Use cross-validation
+to ensure your model generalizes well to new data.
+"""
+
+
+def write_large_markdown(path: str, sections: int):
+    """Generate a large documentation dump, one chapter at a time."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(sections):
+            f.write(f"# Machine Learning Guide - Chapter {i + 1}\n")
+            f.write(SECTION)
+
+
+def main():
+    print(" Streaming Markdown Splitter\n")
+    print("=" * 80 + "\n")
+
+    splitter = StreamingMarkdownSplitter(chunk_size=200, chunk_overlap=40)
+
+    # 1. Small example - same metadata shape as MarkdownHeaderTextSplitter
+    print(" Chunks from a small document:\n")
+    for i, chunk in enumerate(splitter.split_lines(SECTION.splitlines(keepends=True))):
+        headers = {k: v for k, v in chunk.metadata.items() if k.startswith("Header")}
+        preview = chunk.page_content[:70].replace("\n", " ")
+        print(f"Chunk {i + 1}: {headers}")
+        print(f"  Content: {preview}...\n")
+
+    print("=" * 80 + "\n")
+
+    # 2. Large file - memory stays flat regardless of document size
+    sections = int(os.getenv("SECTIONS", "50000"))
+    path = os.path.join(tempfile.mkdtemp(), "docs_dump.md")
+    write_large_markdown(path, sections)
+    file_mb = os.path.getsize(path) / 1e6
+    print(f" Streaming a generated {file_mb:.1f} MB markdown file...\n")
+
+    start = time.perf_counter()
+    count = 0
+    total_chars = 0
+    for chunk in splitter.split_file(path):
+        count += 1
+        total_chars += len(chunk.page_content)
+    elapsed = time.perf_counter() - start
+
+    # Second pass for memory: tracemalloc slows Python down, so keep it out of the timing
+    tracemalloc.start()
+    for _ in splitter.split_file(path):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    os.remove(path)
+
+    print(f"   Chunks produced:   {count:,}")
+    print(f"   Average chunk:     {total_chars / max(count, 1):.0f} characters")
+    print(f"   Time:              {elapsed:.2f} s ({file_mb / elapsed:.1f} MB/s)")
+    print(f"   Peak memory:       {peak / 1e3:.1f} KB (file is {file_mb:.1f} MB)")
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • One pass does both header tracking and size-limited splitting")
+    print("   • Chunks never cross a header, so every chunk has one header path")
+    print("   • Peak memory depends on chunk_size, not on the document size")
+    print(
+        "   • Works on any iterable of lines, so it can read from pipes or S3 streams too"
+    )
+
+
+if __name__ == "__main__":
+    main()
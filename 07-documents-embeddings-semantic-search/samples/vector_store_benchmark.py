@@ -0,0 +1,395 @@
+"""
+Sample: Vector Store Scaling Benchmark
+
+How big can an InMemoryVectorStore get before it falls over? This benchmark
+answers that with numbers instead of guesses. It runs fully offline: the
+"embeddings" are synthetic, clustered vectors generated from a fixed seed,
+so every run sees exactly the same data.
+
+For each corpus size (10k, 100k, 1M, 10M rows by default) and each
+available backend it measures:
+- Build time
+- Resident memory added by the index (RSS delta)
+- On-disk size of the persisted index
+- Single-query latency (p50 / p95) and batch-query throughput
+- Recall@k against an exact brute-force ground truth
+
+Backends:
+- inmemory: langchain_core's InMemoryVectorStore (the baseline)
+- numpy:    one contiguous float32 matrix with a matrix-product scan
+- faiss:    faiss.IndexHNSWFlat, only if faiss is installed
+
+Sizes that would not fit in memory for a backend are reported as skipped
+with the estimated requirement - that row is where the approach falls over.
+
+Configure with environment variables:
+    BENCH_SIZES=10000,100000   BENCH_DIM=256   BENCH_QUERIES=100
+    BENCH_OUTPUT=vector_store_benchmark.jsonl
+
+Run: python 07-documents-embeddings-semantic-search/samples/vector_store_benchmark.py
+"""
+
+import gc
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import InMemoryVectorStore
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+SEED = 42
+K = 10
+BATCH_SIZE = 64
+
+
+@dataclass
+class BenchmarkResult:
+    backend: str
+    rows: int
+    dim: int
+    status: str
+    build_seconds: float | None = None
+    memory_mb: float | None = None
+    disk_mb: float | None = None
+    single_p50_ms: float | None = None
+    single_p95_ms: float | None = None
+    batch_qps: float | None = None
+    recall_at_k: float | None = None
+    note: str = ""
+
+
+# ----------------------------------------------------------------------
+# Synthetic data
+# ----------------------------------------------------------------------
+
+
+def synthetic_embeddings(rows: int, dim: int, seed: int = SEED) -> np.ndarray:
+    """
+    Clustered, L2-normalized float32 vectors.
+
+    Real embeddings are not uniform noise - documents cluster by topic - so
+    rows are drawn around a few hundred random centers. Generated in blocks
+    to avoid holding a float64 copy of the whole corpus.
+    """
+    rng = np.random.default_rng(seed)
+    n_clusters = max(16, min(1024, rows // 100))
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    data = np.empty((rows, dim), dtype=np.float32)
+
+    block = 100_000
+    for start in range(0, rows, block):
+        end = min(start + block, rows)
+        assign = rng.integers(0, n_clusters, size=end - start)
+        noise = rng.standard_normal((end - start, dim)).astype(np.float32)
+        data[start:end] = centers[assign] + 0.5 * noise
+
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data
+
+
+def synthetic_queries(data: np.ndarray, count: int, seed: int = SEED) -> np.ndarray:
+    """Queries are noisy copies of random corpus rows, like paraphrased questions."""
+    rng = np.random.default_rng(seed + 1)
+    picks = rng.integers(0, len(data), size=count)
+    queries = data[picks] + 0.1 * rng.standard_normal((count, data.shape[1])).astype(
+        np.float32
+    )
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(data: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Brute-force ground truth, computed in blocks to bound memory."""
+    truth = np.empty((len(queries), k), dtype=np.int64)
+    for start in range(0, len(queries), BATCH_SIZE):
+        scores = queries[start : start + BATCH_SIZE] @ data.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        truth[start : start + BATCH_SIZE] = np.take_along_axis(top, order, axis=1)
+    return truth
+
+
+# ----------------------------------------------------------------------
+# Measurement helpers
+# ----------------------------------------------------------------------
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # macOS reports bytes, Linux kilobytes; this fallback is peak, not current
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def available_memory_bytes() -> int:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def recall(found: list[list[int]], truth: np.ndarray, k: int) -> float:
+    hits = sum(len(set(row[:k]) & set(expected)) for row, expected in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+# ----------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """
+    Feeds synthetic vectors through InMemoryVectorStore's normal add and
+    search paths: the "text" of row i is str(i), and embeds to data[i].
+    """
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.data[int(text)].tolist() for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class InMemoryBackend:
+    name = "inmemory"
+    # Python list of floats (~32 bytes/float) plus dict and Document overhead
+    bytes_per_float = 32
+
+    def build(self, data: np.ndarray):
+        embeddings = PrecomputedEmbeddings(data)
+        self.store = InMemoryVectorStore(embeddings)
+        for start in range(0, len(data), 10_000):
+            end = min(start + 10_000, len(data))
+            self.store.add_documents(
+                [Document(page_content=str(i)) for i in range(start, end)],
+                ids=[str(i) for i in range(start, end)],
+            )
+
+    def search(self, query: np.ndarray, k: int) -> list[int]:
+        docs = self.store.similarity_search_by_vector(query.tolist(), k=k)
+        return [int(doc.id) for doc in docs]
+
+    def search_batch(self, queries: np.ndarray, k: int) -> list[list[int]]:
+        # InMemoryVectorStore has no batch API: one full scan per query
+        return [self.search(query, k) for query in queries]
+
+    def save(self, path: Path):
+        self.store.dump(str(path / "store.json"))
+
+
+class NumpyBackend:
+    name = "numpy"
+    bytes_per_float = 4
+
+    def build(self, data: np.ndarray):
+        self.matrix = np.ascontiguousarray(data, dtype=np.float32).copy()
+
+    def search(self, query: np.ndarray, k: int) -> list[int]:
+        scores = self.matrix @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])].tolist()
+
+    def search_batch(self, queries: np.ndarray, k: int) -> list[list[int]]:
+        scores = queries @ self.matrix.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        return np.take_along_axis(top, order, axis=1).tolist()
+
+    def save(self, path: Path):
+        np.save(path / "vectors.npy", self.matrix)
+
+
+class FaissHNSWBackend:
+    name = "faiss-hnsw"
+    # Vectors plus graph links (M=32 neighbours per layer-0 node)
+    bytes_per_float = 4 + 2
+
+    def build(self, data: np.ndarray):
+        self.index = faiss.IndexHNSWFlat(data.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        self.index.hnsw.efSearch = 64
+        self.index.add(data)
+
+    def search(self, query: np.ndarray, k: int) -> list[int]:
+        _, ids = self.index.search(query[None, :], k)
+        return ids[0].tolist()
+
+    def search_batch(self, queries: np.ndarray, k: int) -> list[list[int]]:
+        _, ids = self.index.search(queries, k)
+        return ids.tolist()
+
+    def save(self, path: Path):
+        faiss.write_index(self.index, str(path / "index.faiss"))
+
+
+def available_backends():
+    backends = [InMemoryBackend, NumpyBackend]
+    if faiss is not None:
+        backends.append(FaissHNSWBackend)
+    return backends
+
+
+# ----------------------------------------------------------------------
+# Benchmark driver
+# ----------------------------------------------------------------------
+
+
+def run_one(
+    backend_cls, data: np.ndarray, queries: np.ndarray, truth: np.ndarray
+) -> BenchmarkResult:
+    rows, dim = data.shape
+    needed = rows * dim * backend_cls.bytes_per_float
+    if needed > 0.7 * available_memory_bytes():
+        return BenchmarkResult(
+            backend=backend_cls.name,
+            rows=rows,
+            dim=dim,
+            status="skipped",
+            note=f"needs ~{needed / 1e9:.1f} GB, only {available_memory_bytes() / 1e9:.1f} GB available",
+        )
+
+    backend = backend_cls()
+    gc.collect()
+    rss_before = current_rss_bytes()
+    start = time.perf_counter()
+    backend.build(data)
+    build_seconds = time.perf_counter() - start
+    memory_mb = (current_rss_bytes() - rss_before) / 1e6
+
+    single = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        found.append(backend.search(query, K))
+        single.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for offset in range(0, len(queries), BATCH_SIZE):
+        backend.search_batch(queries[offset : offset + BATCH_SIZE], K)
+    batch_seconds = time.perf_counter() - start
+
+    tmp = Path(tempfile.mkdtemp(prefix=f"bench-{backend_cls.name}-"))
+    try:
+        backend.save(tmp)
+        disk_mb = directory_size(tmp) / 1e6
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    result = BenchmarkResult(
+        backend=backend_cls.name,
+        rows=rows,
+        dim=dim,
+        status="ok",
+        build_seconds=build_seconds,
+        memory_mb=memory_mb,
+        disk_mb=disk_mb,
+        single_p50_ms=float(np.percentile(single, 50)),
+        single_p95_ms=float(np.percentile(single, 95)),
+        batch_qps=len(queries) / batch_seconds if batch_seconds else float("inf"),
+        recall_at_k=recall(found, truth, K),
+    )
+    del backend
+    gc.collect()
+    return result
+
+
+def print_row(r: BenchmarkResult):
+    if r.status != "ok":
+        print(f"{r.backend:<12}{r.rows:>12,}   skipped: {r.note}")
+        return
+    print(
+        f"{r.backend:<12}{r.rows:>12,}{r.build_seconds:>10.2f}{r.memory_mb:>11.1f}"
+        f"{r.disk_mb:>11.1f}{r.single_p50_ms:>10.2f}{r.single_p95_ms:>10.2f}"
+        f"{r.batch_qps:>10.0f}{r.recall_at_k:>9.3f}"
+    )
+
+
+def main():
+    print(" Vector Store Scaling Benchmark\n")
+    print("=" * 80 + "\n")
+
+    sizes = [
+        int(s)
+        for s in os.getenv("BENCH_SIZES", "10000,100000,1000000,10000000").split(",")
+    ]
+    dim = int(os.getenv("BENCH_DIM", "256"))
+    num_queries = int(os.getenv("BENCH_QUERIES", "100"))
+    output_path = os.getenv("BENCH_OUTPUT", "vector_store_benchmark.jsonl")
+
+    backends = available_backends()
+    print(f" Sizes: {', '.join(f'{s:,}' for s in sizes)}  | dim={dim}  | k={K}")
+    print(f" Backends: {', '.join(b.name for b in backends)}  | seed={SEED}\n")
+
+    header = f"{'Backend':<12}{'Rows':>12}{'Build s':>10}{'Mem MB':>11}{'Disk MB':>11}{'p50 ms':>10}{'p95 ms':>10}{'Batch QPS':>10}{'Recall':>9}"
+    print(header)
+    print("─" * len(header))
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        for rows in sizes:
+            # The corpus itself needs rows * dim * 4 bytes before any index
+            if rows * dim * 4 > 0.7 * available_memory_bytes():
+                for backend_cls in backends:
+                    result = BenchmarkResult(
+                        backend=backend_cls.name,
+                        rows=rows,
+                        dim=dim,
+                        status="skipped",
+                        note="synthetic corpus does not fit in memory",
+                    )
+                    print_row(result)
+                    out.write(json.dumps(asdict(result)) + "\n")
+                continue
+
+            data = synthetic_embeddings(rows, dim)
+            queries = synthetic_queries(data, num_queries)
+            truth = exact_top_k(data, queries, K)
+
+            for backend_cls in backends:
+                result = run_one(backend_cls, data, queries, truth)
+                print_row(result)
+                out.write(json.dumps(asdict(result)) + "\n")
+                out.flush()
+
+            del data, queries, truth
+            gc.collect()
+
+    print(f"\n Results appended to {output_path}")
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • InMemoryVectorStore keeps vectors as Python lists - ~8x the raw size")
+    print("   • Its search rebuilds a matrix from those lists on every query")
+    print("   • A contiguous float32 matrix keeps memory at rows x dim x 4 bytes")
+    print(
+        "   • Approximate indexes (HNSW) trade a little recall for much lower latency"
+    )
+    print("   • Re-run after changes to catch latency or recall regressions")
+
+
+if __name__ == "__main__":
+    main()
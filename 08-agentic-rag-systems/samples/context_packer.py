@@ -0,0 +1,285 @@
+"""
+Sample: Token-Budgeted Context Packing
+
+traditional_rag() in 01a_traditional_rag.py and the @tool functions in this
+chapter build their context with "\\n\\n".join(...) over everything retrieved.
+Prompt size - and with it latency and cost - grows with k and chunk length,
+and overlapping chunks (chunk_overlap) repeat the same sentences.
+
+ContextPacker sits between retrieval and the prompt:
+1. Score-adaptive cutoff: keep passages scoring close to the best one
+   instead of a fixed k, so weak matches don't ride along
+2. Deduplication: sentences already included (from overlapping chunks or
+   copied paragraphs) are dropped from later passages
+3. Sentence trimming: each passage keeps only its sentences that best match
+   the query terms, in their original order
+4. Budget packing: passages are added best-first until the token budget is
+   reached, counted with a fast local token estimator (no tokenizer download)
+
+Every call reports how many tokens it saved compared to the plain join.
+
+Run: python 08-agentic-rag-systems/samples/context_packer.py
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+# Word pieces of up to 4 characters, or single punctuation marks - close to
+# BPE token counts for English prose, and a regex scan is very fast
+TOKEN_PIECE = re.compile(r"\w{1,4}|[^\w\s]")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(TOKEN_PIECE.findall(text))
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in SENTENCE_END.split(text) if s.strip()]
+
+
+@dataclass
+class PackResult:
+    context: str
+    documents: list[Document]
+    tokens_before: int
+    tokens_after: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class ContextPacker:
+    def __init__(
+        self,
+        token_budget: int = 300,
+        relative_cutoff: float = 0.9,
+        max_sentences: int = 3,
+        separator: str = "\n\n",
+        format_passage=lambda doc, text: text,
+    ):
+        """
+        relative_cutoff: keep passages whose score is at least this fraction
+            of the best score (cosine scores from similarity_search_with_score);
+            skipped when the best score is not positive
+        max_sentences: sentences kept per passage after trimming
+        format_passage: renders one passage, e.g. to prefix a citation
+        """
+        self.token_budget = token_budget
+        self.relative_cutoff = relative_cutoff
+        self.max_sentences = max_sentences
+        self.separator = separator
+        self.format_passage = format_passage
+
+        self.calls = 0
+        self.total_before = 0
+        self.total_saved = 0
+
+    def pack(self, query: str, results: list[tuple[Document, float]]) -> PackResult:
+        naive = self.separator.join(
+            self.format_passage(doc, doc.page_content) for doc, _ in results
+        )
+        tokens_before = estimate_tokens(naive)
+
+        # 1. Score-adaptive cutoff
+        results = sorted(results, key=lambda r: -r[1])
+        if results and results[0][1] > 0:
+            # A fraction of a negative score would be above it, so only cut
+            # when the best score is positive; the best passage always stays
+            floor = results[0][1] * self.relative_cutoff
+            results = results[:1] + [r for r in results[1:] if r[1] >= floor]
+
+        # Sentence weights: query terms, weighted by rarity among retrieved sentences
+        passages = [(doc, split_sentences(doc.page_content)) for doc, _ in results]
+        document_frequency = Counter(
+            term
+            for _, sentences in passages
+            for sentence in sentences
+            for term in set(WORD.findall(sentence.lower()))
+        )
+        total_sentences = sum(len(sentences) for _, sentences in passages) or 1
+        query_terms = set(WORD.findall(query.lower()))
+
+        def sentence_score(sentence: str) -> float:
+            terms = set(WORD.findall(sentence.lower())) & query_terms
+            return sum(
+                math.log(1 + total_sentences / document_frequency[t]) for t in terms
+            )
+
+        # Normalized sentences packed so far, and the same padded with spaces
+        # so fragments can be matched on whole words
+        included: set[str] = set()
+        included_padded: list[str] = []
+        packed: list[str] = []
+        kept: list[Document] = []
+        used = 0
+        separator_tokens = estimate_tokens(self.separator)
+
+        for doc, sentences in passages:
+            # 2. Deduplicate: overlapping chunks repeat whole sentences, or cut
+            #    them in half - a fragment is a run of whole words inside a
+            #    sentence we already have (too short to tell below 3 words)
+            fresh = []
+            for sentence in sentences:
+                words = WORD.findall(sentence.lower())
+                key = " ".join(words)
+                if not key or key in included:
+                    continue
+                if len(words) >= 3 and any(
+                    f" {key} " in padded for padded in included_padded
+                ):
+                    continue
+                fresh.append(sentence)
+            if not fresh:
+                continue
+
+            # 3. Keep the best sentences; the weakest are dropped first
+            order = sorted(
+                range(len(fresh)), key=lambda i: (-sentence_score(fresh[i]), i)
+            )[: self.max_sentences]
+
+            # 4. Pack to the budget, dropping more weak sentences if needed
+            while order:
+                chosen = [fresh[i] for i in sorted(order)]
+                text = self.format_passage(doc, " ".join(chosen))
+                cost = estimate_tokens(text) + (separator_tokens if packed else 0)
+                if used + cost <= self.token_budget:
+                    break
+                order.pop()
+            if not order:
+                continue
+            packed.append(text)
+            kept.append(doc)
+            used += cost
+            for sentence in chosen:
+                key = " ".join(WORD.findall(sentence.lower()))
+                included.add(key)
+                included_padded.append(f" {key} ")
+
+        context = self.separator.join(packed)
+        result = PackResult(context, kept, tokens_before, estimate_tokens(context))
+        self.calls += 1
+        self.total_before += result.tokens_before
+        self.total_saved += result.tokens_saved
+        return result
+
+
+guide = """
+LangChain is a framework for building applications with large language models. It provides abstractions for models, prompts, vector stores and agents. The Python version came first, and LangChain.js followed for JavaScript and TypeScript.
+
+RAG (Retrieval Augmented Generation) combines document retrieval with LLM generation. Relevant passages are retrieved from a vector store and added to the prompt. This lets models use external knowledge without retraining. Answers become more accurate and up to date. Citations let users verify where an answer came from.
+
+Vector stores like Pinecone, Weaviate and Chroma store embeddings. They perform fast similarity searches to find relevant content. Semantic search understands meaning rather than matching keywords. Approximate nearest neighbour indexes trade a little recall for speed.
+
+Text splitters break large documents into chunks that fit within context windows. Chunk overlap repeats the end of one chunk at the start of the next, so sentences are not cut in half. Too much overlap wastes tokens, because the same sentences are retrieved twice. Smaller chunks give more precise retrieval but less context per chunk.
+
+Prompt size drives latency and cost. Every retrieved chunk adds tokens to the prompt. Sending fewer, more relevant tokens usually gives faster and better answers.
+""".strip()
+
+
+def main():
+    print(" Token-Budgeted Context Packing\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    # Generous overlap on purpose - overlapping chunks are common in practice
+    splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=120)
+    chunks = splitter.split_documents(
+        [Document(page_content=guide, metadata={"source": "langchain-guide.md"})]
+    )
+    for i, chunk in enumerate(chunks):
+        chunk.metadata["chunk"] = i + 1
+    vector_store = InMemoryVectorStore.from_documents(chunks, embeddings)
+    print(f" Indexed {len(chunks)} overlapping chunks\n")
+
+    packer = ContextPacker(
+        token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "150")),
+        format_passage=lambda doc, text: f"[chunk {doc.metadata['chunk']}]: {text}",
+    )
+
+    questions = [
+        "Why does chunk overlap waste tokens?",
+        "How does RAG make answers more accurate?",
+    ]
+
+    for question in questions:
+        print("=" * 80)
+        print(f"\n Question: {question}\n")
+
+        results = vector_store.similarity_search_with_score(question, k=6)
+        packed = packer.pack(question, results)
+
+        print(
+            f"   Retrieved {len(results)} chunks, packed {len(packed.documents)}: "
+            f"{packed.tokens_before} -> {packed.tokens_after} tokens "
+            f"({packed.tokens_saved} saved)"
+        )
+        print("\n Packed context:")
+        print("   " + packed.context.replace("\n\n", "\n   "))
+
+        response = model.invoke(
+            [
+                SystemMessage(
+                    content="Answer the question based on the provided context."
+                ),
+                HumanMessage(
+                    content=f"Context:\n{packed.context}\n\nQuestion: {question}"
+                ),
+            ]
+        )
+        print(f"\n Answer: {response.content}\n")
+
+    print("=" * 80)
+    share = packer.total_saved / max(packer.total_before, 1)
+    print(
+        f"\n Total: {packer.total_saved} of {packer.total_before} context tokens "
+        f"saved over {packer.calls} calls ({share:.0%})"
+    )
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Overlapping chunks repeat sentences - deduplicate before prompting")
+    print("   • A relative score cutoff adapts k to how many passages really match")
+    print("   • Trimming to the best sentences keeps the facts, drops the filler")
+    print("   • A hard token budget makes prompt size and cost predictable")
+
+
+if __name__ == "__main__":
+    main()
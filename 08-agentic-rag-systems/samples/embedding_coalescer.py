@@ -0,0 +1,325 @@
+"""
+Sample: Micro-Batching Coalescer for Query Embeddings
+
+Every retrieval tool in this lab (search_langchain_docs, search_my_notes,
+search_knowledge_base) embeds its query with its own HTTP request. With
+hundreds of concurrent agent sessions that is hundreds of one-item
+requests, each paying a full round trip and counting against rate limits.
+
+EmbeddingCoalescer sits in front of the embeddings client:
+- Queries that arrive close together are held for a few milliseconds (or
+  until a size cap is reached) and sent as ONE embed_documents call
+- Results are fanned back out to each waiting caller
+- Identical queries already in flight share a single result (singleflight)
+- When nothing is in flight, a query is sent immediately, so a single user
+  sees no extra latency - batching only kicks in under load
+
+Run: python 08-agentic-rag-systems/samples/embedding_coalescer.py
+"""
+
+import asyncio
+import os
+import time
+
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+class EmbeddingCoalescer(Embeddings):
+    """Coalesces concurrent aembed_query calls into batched embed_documents calls."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        max_in_flight: int = 4,
+    ):
+        self.embeddings = embeddings
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_in_flight = max_in_flight
+
+        self._pending: dict[str, asyncio.Future] = {}
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._batches_running = 0
+        self._timer: asyncio.TimerHandle | None = None
+        # The loop only keeps weak references to tasks; hold running batches here
+        self._tasks: set[asyncio.Task] = set()
+
+        self.requests = 0
+        self.deduplicated = 0
+        self.batches = 0
+        self.texts_sent = 0
+
+    # Sync path: nothing to coalesce with, pass straight through
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.requests += 1
+
+        # Singleflight: join an identical request that is queued or running
+        existing = self._pending.get(text) or self._in_flight.get(text)
+        if existing is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(existing)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[text] = future
+
+        if len(self._pending) >= self.max_batch_size or self._batches_running == 0:
+            # Full batch, or idle backend: don't make anyone wait
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush
+            )
+
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        if self._batches_running >= self.max_in_flight:
+            # Back off: the batch keeps growing until a slot frees up
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush
+            )
+            return
+
+        batch = dict(list(self._pending.items())[: self.max_batch_size])
+        for text in batch:
+            del self._pending[text]
+        self._in_flight.update(batch)
+        self._batches_running += 1
+        task = asyncio.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        if self._pending and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush
+            )
+
+    async def _run_batch(self, batch: dict[str, asyncio.Future]):
+        texts = list(batch)
+        self.batches += 1
+        self.texts_sent += len(texts)
+        try:
+            vectors = await self.embeddings.aembed_documents(texts)
+            for text, vector in zip(texts, vectors):
+                if not batch[text].done():
+                    batch[text].set_result(vector)
+        except Exception as error:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            for text in texts:
+                self._in_flight.pop(text, None)
+            self._batches_running -= 1
+            # Requests that queued up behind this batch can go now
+            if self._pending:
+                self._flush()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "batches": self.batches,
+            "avg_batch_size": self.texts_sent / self.batches if self.batches else 0.0,
+        }
+
+
+class SimulatedEmbeddings(Embeddings):
+    """
+    Offline stand-in for an embeddings API: fixed round-trip latency per call
+    and a cap on concurrent connections, like a rate-limited endpoint.
+    """
+
+    def __init__(self, latency_ms: float = 40.0, max_connections: int = 8):
+        self.latency = latency_ms / 1000
+        self.max_connections = max_connections
+        self._semaphore: asyncio.Semaphore | None = None
+        self.calls = 0
+
+    def _vector(self, text: str) -> list[float]:
+        return [float(len(text)), float(sum(map(ord, text)) % 97), 1.0]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self.latency)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        async with self._semaphore:
+            self.calls += 1
+            await asyncio.sleep(self.latency)
+            return [self._vector(t) for t in texts]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+async def load_test(sessions: int = 500):
+    """Compare direct aembed_query calls with the coalescer under concurrency."""
+    popular = ["What is Python?", "How does Docker work?", "What is REST?"]
+    queries = [
+        popular[i % 3] if i % 4 == 0 else f"question number {i}"
+        for i in range(sessions)
+    ]
+
+    # Single user: the coalescer should add no latency
+    backend = SimulatedEmbeddings()
+    coalescer = EmbeddingCoalescer(SimulatedEmbeddings())
+    start = time.perf_counter()
+    await backend.aembed_query("single question")
+    direct_single = time.perf_counter() - start
+    start = time.perf_counter()
+    await coalescer.aembed_query("single question")
+    coalesced_single = time.perf_counter() - start
+
+    # Many concurrent sessions
+    backend = SimulatedEmbeddings()
+    start = time.perf_counter()
+    await asyncio.gather(*(backend.aembed_query(q) for q in queries))
+    direct = time.perf_counter() - start
+
+    coalescer = EmbeddingCoalescer(SimulatedEmbeddings())
+    start = time.perf_counter()
+    await asyncio.gather(*(coalescer.aembed_query(q) for q in queries))
+    coalesced = time.perf_counter() - start
+
+    print(f"   {'':<28}{'Direct':>12}{'Coalesced':>12}")
+    print(
+        f"   {'Single query latency':<28}{direct_single * 1000:>10.1f}ms"
+        f"{coalesced_single * 1000:>10.1f}ms"
+    )
+    print(
+        f"   {f'{sessions} concurrent queries':<28}{direct * 1000:>10.0f}ms"
+        f"{coalesced * 1000:>10.0f}ms"
+    )
+    print(
+        f"   {'Throughput (queries/s)':<28}{sessions / direct:>12.0f}"
+        f"{sessions / coalesced:>12.0f}"
+    )
+    print(f"   {'HTTP calls':<28}{backend.calls:>12}{coalescer.embeddings.calls:>12}")
+    print(f"\n   Coalescer stats: {coalescer.stats()}")
+
+
+knowledge_base = [
+    Document(
+        page_content="Python is a versatile, interpreted programming language known for its readability and extensive standard library.",
+        metadata={"title": "Python Basics"},
+    ),
+    Document(
+        page_content="Docker containers package applications with their dependencies, ensuring consistent behavior across environments.",
+        metadata={"title": "Docker Containers"},
+    ),
+    Document(
+        page_content="REST APIs follow principles like statelessness and a uniform interface. HTTP methods map to CRUD operations.",
+        metadata={"title": "REST API Design"},
+    ),
+]
+
+
+async def run_agents():
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    vector_store = InMemoryVectorStore.from_documents(knowledge_base, embeddings)
+    coalescer = EmbeddingCoalescer(embeddings)
+
+    @tool
+    async def search_my_notes(query: str) -> str:
+        """Search my personal knowledge base for information about Python, Docker and REST APIs."""
+        vector = await coalescer.aembed_query(query)
+        results = vector_store.similarity_search_by_vector(vector, k=2)
+        return "\n\n".join(
+            f"[{doc.metadata['title']}]: {doc.page_content}" for doc in results
+        )
+
+    agent = create_agent(
+        model,
+        tools=[search_my_notes],
+        system_prompt="You are a helpful assistant. Always search my notes before answering.",
+    )
+
+    questions = [
+        "What is Python?",
+        "What is Python?",
+        "Why use Docker containers?",
+        "What makes an API RESTful?",
+    ]
+    responses = await asyncio.gather(
+        *(agent.ainvoke({"messages": [HumanMessage(content=q)]}) for q in questions)
+    )
+    for question, response in zip(questions, responses):
+        print(f" Q: {question}")
+        print(f" A: {response['messages'][-1].content[:120]}...\n")
+    print(f" Coalescer stats: {coalescer.stats()}")
+
+
+def main():
+    print(" Embedding Micro-Batching Coalescer\n")
+    print("=" * 80 + "\n")
+
+    print(" Load test with a simulated 40 ms embeddings API (offline):\n")
+    asyncio.run(load_test())
+
+    print("\n" + "=" * 80 + "\n")
+    print(" Four concurrent agent sessions sharing one coalescer:\n")
+    asyncio.run(run_agents())
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Concurrent one-item requests become a few batched calls")
+    print("   • Identical in-flight queries are embedded once (singleflight)")
+    print("   • An idle backend gets requests immediately - no added latency")
+    print("   • Fewer HTTP calls means fewer rate-limit hits under load")
+
+
+if __name__ == "__main__":
+    main()
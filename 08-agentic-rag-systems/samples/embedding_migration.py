@@ -0,0 +1,385 @@
+"""
+Sample: Online Embedding-Model Migration with a Dual Index
+
+Vectors from text-embedding-ada-002 and text-embedding-3-small live in
+different spaces, so changing AI_EMBEDDING_MODEL means re-embedding the
+whole knowledge base. Doing that in place takes retrieval down until the
+last chunk is done.
+
+MigratingVectorStore keeps both indexes side by side instead:
+- Queries keep going to the old index while the new one is incomplete
+- A background thread backfills the new index in batches, rate-limited so
+  the migration does not eat the embedding quota live traffic needs
+- Writes during the migration go to both indexes, so nothing is missed
+- When every document exists in the new index, traffic cuts over in one
+  atomic swap - no query ever sees a half-built index
+- progress() reports phase, documents done, throughput, ETA and the memory
+  held by each index; finalize() drops the old index to give memory back
+
+Without AI_API_KEY the demo uses two offline stand-in embedding models.
+
+Run: python 08-agentic-rag-systems/samples/embedding_migration.py
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+import zlib
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+class RateLimiter:
+    """Allows at most `rate` items per second on average."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_allowed = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, items: int = 1):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_allowed - now
+            self.next_allowed = max(now, self.next_allowed) + items * self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def index_bytes(store: InMemoryVectorStore) -> int:
+    """Approximate memory held by an InMemoryVectorStore (vectors + text)."""
+    size = 0
+    # list() copies the values in one step, so concurrent writes can't break it
+    for record in list(store.store.values()):
+        vector = record["vector"]
+        size += sys.getsizeof(vector) + len(vector) * sys.getsizeof(0.0)
+        size += sys.getsizeof(record["text"]) + sys.getsizeof(record["id"])
+    return size
+
+
+class MigratingVectorStore:
+    def __init__(self, store: InMemoryVectorStore):
+        self.active = store
+        self.shadow: InMemoryVectorStore | None = None
+        self.phase = "serving"
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._total = 0
+        self._done = 0
+        self._started = 0.0
+        # Ids to backfill (snapshot at start) and how far the backfill got
+        self._pending: list[str] = []
+        self._cursor = 0
+        # Ids written during the migration, checked once more at cutover
+        self._written: list[str] = []
+        self._written_checked = 0
+        self.error: Exception | None = None
+
+    # ------------------------------------------------------------------
+    # Reads and writes
+    # ------------------------------------------------------------------
+
+    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
+        # Reading the reference is atomic; the search runs against a complete index
+        return self.active.similarity_search(query, k=k)
+
+    def add_documents(self, documents: list[Document]) -> list[str]:
+        ids = [doc.id or str(uuid.uuid4()) for doc in documents]
+        with self._lock:
+            self.active.add_documents(documents, ids=ids)
+            if self.shadow is not None:
+                # Dual write: the backfill never has to chase new documents
+                self.shadow.add_documents(documents, ids=ids)
+                self._written.extend(ids)
+        return ids
+
+    def delete(self, ids: list[str]):
+        with self._lock:
+            self.active.delete(ids)
+            if self.shadow is not None:
+                self.shadow.delete(ids)
+
+    # ------------------------------------------------------------------
+    # Migration
+    # ------------------------------------------------------------------
+
+    def start_migration(
+        self,
+        new_embedding: Embeddings,
+        batch_size: int = 32,
+        texts_per_second: float = 200.0,
+    ):
+        if self._thread is not None:
+            raise RuntimeError("A migration is already running")
+        with self._lock:
+            self.shadow = InMemoryVectorStore(new_embedding)
+            self.phase = "backfilling"
+            self._pending = list(self.active.store)
+            self._cursor = 0
+            self._written, self._written_checked = [], 0
+            self._total = len(self._pending)
+            self._done = 0
+            self._started = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._backfill,
+            args=(batch_size, RateLimiter(texts_per_second)),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _next_batch(self, batch_size: int) -> list[dict]:
+        """Advance the cursor over the snapshot; call with the lock held."""
+        batch = []
+        while self._cursor < len(self._pending) and len(batch) < batch_size:
+            id_ = self._pending[self._cursor]
+            self._cursor += 1
+            record = self.active.store.get(id_)
+            if record is not None and id_ not in self.shadow.store:
+                batch.append(record)
+        return batch
+
+    def _missing_written(self) -> list[str]:
+        """Ids written since the last check that the new index lacks."""
+        tail = self._written[self._written_checked :]
+        self._written_checked = len(self._written)
+        return [
+            id_
+            for id_ in tail
+            if id_ in self.active.store and id_ not in self.shadow.store
+        ]
+
+    def _backfill(self, batch_size: int, limiter: RateLimiter):
+        try:
+            while not self._stop.is_set():
+                with self._lock:
+                    batch = self._next_batch(batch_size)
+                    if not batch:
+                        missing = self._missing_written()
+                        if missing:
+                            self._pending.extend(missing)
+                            self._total += len(missing)
+                            continue
+                        # Nothing left and writers are blocked: swap atomically
+                        self.active, self.shadow = self.shadow, self.active
+                        self.phase = "cut over"
+                        self._total = self._done
+                        return
+
+                limiter.acquire(len(batch))
+                # Embed outside the lock so queries and writes are never blocked
+                vectors = self.shadow.embedding.embed_documents(
+                    [record["text"] for record in batch]
+                )
+
+                with self._lock:
+                    for record, vector in zip(batch, vectors):
+                        current = self.active.store.get(record["id"])
+                        # Skip rows deleted, rewritten or dual-written meanwhile
+                        if (
+                            current is None
+                            or current["text"] != record["text"]
+                            or record["id"] in self.shadow.store
+                        ):
+                            continue
+                        self.shadow.store[record["id"]] = {**record, "vector": vector}
+                        self._done += 1
+        except Exception as error:
+            self.error = error
+            self.phase = "failed"
+
+    def wait(self, timeout: float | None = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def abort(self):
+        """Stop the backfill and discard the partial new index."""
+        self._stop.set()
+        self.wait()
+        with self._lock:
+            if self.phase == "backfilling":
+                self.shadow, self.phase = None, "serving"
+        self._thread = None
+
+    def finalize(self):
+        """After cutover, release the old index."""
+        self.wait()
+        with self._lock:
+            if self.phase == "cut over":
+                self.shadow, self.phase = None, "serving"
+        self._thread = None
+
+    def progress(self) -> dict:
+        with self._lock:
+            phase, done, total = self.phase, self._done, self._total
+            active, shadow = self.active, self.shadow
+        # Sizing walks every record, so it runs outside the lock
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        rate = done / elapsed if elapsed else 0.0
+        remaining = max(total - done, 0)
+        return {
+            "phase": phase,
+            "done": done,
+            "total": total,
+            "docs_per_s": rate,
+            "eta_s": remaining / rate if rate else None,
+            "active_mb": index_bytes(active) / 1e6,
+            "shadow_mb": index_bytes(shadow) / 1e6 if shadow is not None else 0.0,
+        }
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Offline stand-in for an embedding model: bag-of-words hashed into
+    `dimensions` buckets. A different `salt` gives an incompatible space,
+    just like two real embedding models.
+    """
+
+    def __init__(self, dimensions: int, salt: str, latency_ms: float = 5.0):
+        self.dimensions = dimensions
+        self.salt = salt.encode()
+        self.latency = latency_ms / 1000
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in text.lower().split():
+            bucket = zlib.crc32(self.salt + word.strip(".,?!").encode())
+            vector[bucket % self.dimensions] += 1.0
+        return (vector / (np.linalg.norm(vector) or 1.0)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def build_models() -> tuple[Embeddings, Embeddings, str, str]:
+    if os.getenv("AI_API_KEY"):
+        old_name = os.getenv("OLD_EMBEDDING_MODEL", "text-embedding-ada-002")
+        new_name = os.getenv("AI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+        def azure(model: str) -> Embeddings:
+            return AzureOpenAIEmbeddings(
+                azure_endpoint=get_embeddings_endpoint(),
+                api_key=os.getenv("AI_API_KEY"),
+                model=model,
+                api_version="2024-02-01",
+            )
+
+        return azure(old_name), azure(new_name), old_name, new_name
+
+    return (
+        HashingEmbeddings(256, salt="old"),
+        HashingEmbeddings(384, salt="new"),
+        "offline-old (256 dims)",
+        "offline-new (384 dims)",
+    )
+
+
+TOPICS = [
+    "Python asyncio runs coroutines on an event loop for I/O-bound work",
+    "Docker containers package applications with their dependencies",
+    "REST APIs map HTTP methods to create, read, update and delete",
+    "Vector databases store embeddings for semantic search",
+    "React hooks like useState and useEffect manage component state",
+]
+
+
+def print_progress(store: MigratingVectorStore):
+    p = store.progress()
+    eta = f"{p['eta_s']:.1f}s" if p["eta_s"] is not None else "-"
+    print(
+        f"   {p['phase']:<12}{p['done']:>6}/{p['total']:<6}"
+        f"{p['docs_per_s']:>8.0f}/s  ETA {eta:>6}"
+        f"   serving {p['active_mb']:>5.1f} MB + other {p['shadow_mb']:>5.1f} MB"
+    )
+
+
+def main():
+    print(" Online Embedding-Model Migration\n")
+    print("=" * 80 + "\n")
+
+    old_model, new_model, old_name, new_name = build_models()
+    num_docs = int(os.getenv("NUM_DOCS", "2000"))
+    docs = [
+        Document(
+            page_content=f"{TOPICS[i % len(TOPICS)]} (note {i})",
+            metadata={"topic": i % len(TOPICS)},
+        )
+        for i in range(num_docs)
+    ]
+
+    print(f" Building the current index with {old_name}...")
+    base = InMemoryVectorStore(old_model)
+    base.add_documents(docs)
+    store = MigratingVectorStore(base)
+    print(f"   {len(base.store):,} documents indexed\n")
+
+    print(f" Migrating to {new_name} in the background (rate limit 1,000 texts/s):\n")
+    store.start_migration(new_model, batch_size=50, texts_per_second=1000)
+
+    query = "How do containers bundle dependencies?"
+    served = 0
+    last_report = 0.0
+    while store.phase == "backfilling":
+        # Live traffic keeps flowing during the backfill
+        store.similarity_search(query, k=1)
+        served += 1
+        if served == 10:
+            store.add_documents(
+                [Document(page_content="Podman runs containers without a daemon")]
+            )
+        if time.monotonic() - last_report > 0.5:
+            print_progress(store)
+            last_report = time.monotonic()
+        time.sleep(0.01)
+
+    store.wait()
+    print_progress(store)
+    if store.error:
+        print(f"\n Migration failed, still serving the old index: {store.error}")
+        return
+
+    print(f"\n Served {served} queries during the backfill, none failed")
+    print(f"   Best match now: {store.similarity_search(query, k=1)[0].page_content}")
+    dims = len(next(iter(store.active.store.values()))["vector"])
+    print(f"   Active index dimensions after cutover: {dims}")
+    podman = store.similarity_search("daemonless containers podman", k=1)[0]
+    print(f"   Document added mid-migration is searchable: {podman.page_content!r}")
+
+    store.finalize()
+    print("\n After finalize() the old index is released:")
+    print_progress(store)
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Retrieval never goes down: the old index serves until cutover")
+    print("   • Rate-limited backfill leaves embedding quota for live traffic")
+    print("   • Dual writes plus a final check under a lock make cutover atomic")
+    print("   • Both indexes are resident during migration - budget 2x memory")
+
+
+if __name__ == "__main__":
+    main()
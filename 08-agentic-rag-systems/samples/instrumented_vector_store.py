@@ -0,0 +1,344 @@
+"""
+Sample: Per-Search Instrumentation and Slow-Query Log
+
+When one agent turn is slow, was it embedding the query, scanning the
+store, or building the result documents? The @tool functions in this lab
+call similarity_search blindly, so there is no way to tell.
+
+InstrumentedVectorStore is a drop-in InMemoryVectorStore that, when
+enabled, records a trace for every search with timings for each phase:
+- embed:   turning the query text into a vector (an API round trip)
+- filter:  applying the metadata filter to candidate rows
+- score:   computing cosine similarity against every candidate
+- top_k:   selecting and ordering the best k scores
+- hydrate: building the Document objects returned to the caller
+
+It also records the number of candidates scanned and k. Searches slower
+than a threshold are written as JSON lines to a rotating slow-query log.
+When instrumentation is disabled every call goes straight to the parent
+class, so the only overhead is a single attribute check.
+
+Run: python 08-agentic-rag-systems/samples/instrumented_vector_store.py
+"""
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from logging.handlers import RotatingFileHandler
+from typing import Any
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+PHASES = ("embed", "filter", "score", "top_k", "hydrate")
+
+
+@dataclass
+class SearchTrace:
+    query: str | None
+    k: int
+    candidates: int = 0
+    returned: int = 0
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    total_ms: float = 0.0
+    started_at: float = field(default_factory=time.time)
+
+
+# The trace of the search currently running in this thread / task
+_current_trace: ContextVar[SearchTrace | None] = ContextVar(
+    "_current_trace", default=None
+)
+
+
+def create_slow_query_logger(
+    path: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3
+) -> logging.Logger:
+    """A logger that writes one JSON object per line to a rotating file."""
+    logger = logging.getLogger(f"slow_queries.{path}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+class InstrumentedVectorStore(InMemoryVectorStore):
+    """InMemoryVectorStore with opt-in per-search phase timings."""
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        instrument: bool = False,
+        slow_query_ms: float = 500.0,
+        slow_query_log: str | None = "slow_queries.log",
+        keep_last: int = 1000,
+    ):
+        super().__init__(embedding)
+        self.instrument = instrument
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_log = slow_query_log
+        # Created on the first slow query, so a store that never logs leaves no file
+        self._slow_logger: logging.Logger | None = None
+        self.traces: deque[SearchTrace] = deque(maxlen=keep_last)
+        self.slow_queries = 0
+
+    def _finish(self, trace: SearchTrace):
+        trace.total_ms = sum(trace.timings_ms.values())
+        self.traces.append(trace)
+        if trace.total_ms >= self.slow_query_ms:
+            self.slow_queries += 1
+            if self.slow_query_log:
+                if self._slow_logger is None:
+                    self._slow_logger = create_slow_query_logger(self.slow_query_log)
+                self._slow_logger.info(json.dumps(asdict(trace)))
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        if not self.instrument:
+            return super().similarity_search_with_score(query, k, **kwargs)
+
+        trace = SearchTrace(query=query, k=k)
+        token = _current_trace.set(trace)
+        try:
+            start = time.perf_counter()
+            embedding = self.embedding.embed_query(query)
+            trace.timings_ms["embed"] = (time.perf_counter() - start) * 1000
+            return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+        finally:
+            _current_trace.reset(token)
+            self._finish(trace)
+
+    async def asimilarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        if not self.instrument:
+            return await super().asimilarity_search_with_score(query, k, **kwargs)
+
+        trace = SearchTrace(query=query, k=k)
+        token = _current_trace.set(trace)
+        try:
+            start = time.perf_counter()
+            embedding = await self.embedding.aembed_query(query)
+            trace.timings_ms["embed"] = (time.perf_counter() - start) * 1000
+            return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+        finally:
+            _current_trace.reset(token)
+            self._finish(trace)
+
+    def _similarity_search_with_score_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        filter=None,  # noqa: A002
+    ) -> list[tuple[Document, float, list[float]]]:
+        if not self.instrument:
+            return super()._similarity_search_with_score_by_vector(
+                embedding, k=k, filter=filter
+            )
+
+        # Searches by vector (e.g. MMR) have no embed phase and own their trace
+        trace = _current_trace.get()
+        owns_trace = trace is None
+        if owns_trace:
+            trace = SearchTrace(query=None, k=k)
+
+        clock = time.perf_counter()
+
+        def lap(phase: str):
+            nonlocal clock
+            now = time.perf_counter()
+            trace.timings_ms[phase] = (now - clock) * 1000
+            clock = now
+
+        rows = list(self.store.values())
+        if filter is not None:
+            rows = [
+                row
+                for row in rows
+                if filter(
+                    Document(
+                        id=row["id"], page_content=row["text"], metadata=row["metadata"]
+                    )
+                )
+            ]
+        lap("filter")
+        trace.candidates = len(rows)
+
+        if not rows:
+            if owns_trace:
+                self._finish(trace)
+            return []
+
+        matrix = np.asarray([row["vector"] for row in rows], dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        scores = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+        lap("score")
+
+        k = min(k, len(scores))
+        top_k = np.argpartition(-scores, k - 1)[:k]
+        top_k = top_k[np.argsort(-scores[top_k])]
+        lap("top_k")
+
+        results = [
+            (
+                Document(
+                    id=rows[i]["id"],
+                    page_content=rows[i]["text"],
+                    metadata=rows[i]["metadata"],
+                ),
+                float(scores[i]),
+                rows[i]["vector"],
+            )
+            for i in top_k
+        ]
+        lap("hydrate")
+        trace.returned = len(results)
+
+        if owns_trace:
+            self._finish(trace)
+        return results
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """p50 / p95 per phase over the retained traces."""
+        report = {}
+        for phase in (*PHASES, "total"):
+            values = [
+                t.total_ms if phase == "total" else t.timings_ms[phase]
+                for t in self.traces
+                if phase == "total" or phase in t.timings_ms
+            ]
+            if values:
+                report[phase] = {
+                    "p50_ms": float(np.percentile(values, 50)),
+                    "p95_ms": float(np.percentile(values, 95)),
+                }
+        return report
+
+
+knowledge_base = [
+    Document(
+        page_content="Python's asyncio module enables asynchronous programming with async/await syntax. The event loop manages coroutines, allowing efficient handling of I/O-bound operations without blocking.",
+        metadata={"title": "Python Async", "source": "my-notes"},
+    ),
+    Document(
+        page_content="Docker containers package applications with their dependencies, ensuring consistent behavior across environments. Containers share the host OS kernel, making them lighter than virtual machines.",
+        metadata={"title": "Docker Containers", "source": "my-notes"},
+    ),
+    Document(
+        page_content="Database indexing improves query performance by creating data structures that allow fast lookups. B-tree indexes work well for range queries, while hash indexes excel at equality comparisons.",
+        metadata={"title": "Database Indexing", "source": "my-notes"},
+    ),
+    Document(
+        page_content="REST APIs follow principles like statelessness, client-server architecture, and uniform interface. HTTP methods (GET, POST, PUT, DELETE) map to CRUD operations.",
+        metadata={"title": "REST API Design", "source": "my-notes"},
+    ),
+]
+
+
+def main():
+    print(" Instrumented Vector Store\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    # Low threshold so the demo produces slow-log entries: embedding is an API call
+    vector_store = InstrumentedVectorStore(
+        embeddings, instrument=True, slow_query_ms=100.0
+    )
+    vector_store.add_documents(knowledge_base)
+
+    @tool
+    def search_my_notes(query: str) -> str:
+        """Search my personal knowledge base for information about Python, Docker, databases and REST APIs."""
+        results = vector_store.similarity_search(query, k=2)
+        trace = vector_store.traces[-1]
+        timings = ", ".join(f"{p}={ms:.1f}ms" for p, ms in trace.timings_ms.items())
+        print(f'    search "{query}" → {trace.candidates} candidates, {timings}')
+
+        if not results:
+            return "No relevant information found in the knowledge base."
+
+        return "\n\n".join(
+            f"[{doc.metadata['title']}]: {doc.page_content}" for doc in results
+        )
+
+    agent = create_agent(
+        model,
+        tools=[search_my_notes],
+        system_prompt="You are a helpful assistant with access to my notes. Use the search tool when you need specific technical information from them.",
+    )
+
+    questions = [
+        "How does async work in Python?",
+        "When should I use a B-tree index?",
+        "Which HTTP method should I use to update a resource?",
+    ]
+
+    for question in questions:
+        print("=" * 80)
+        print(f"\n Question: {question}\n")
+        response = agent.invoke({"messages": [HumanMessage(content=question)]})
+        print(" Answer:", response["messages"][-1].content)
+        print()
+
+    print("=" * 80)
+    print("\n Per-phase latency over all searches:")
+    for phase, stats in vector_store.summary().items():
+        print(
+            f"   {phase:<8} p50 {stats['p50_ms']:>8.2f} ms   p95 {stats['p95_ms']:>8.2f} ms"
+        )
+    print(
+        f"\n {vector_store.slow_queries} searches above {vector_store.slow_query_ms:.0f} ms "
+        f"written to slow_queries.log"
+    )
+
+    print("\n Key Insights:")
+    print("   • Embedding the query is usually the slowest phase (network round trip)")
+    print("   • Scoring grows with the number of candidates scanned")
+    print("   • The slow-query log keeps evidence for the turns users complain about")
+    print("   • Disabled instrumentation costs a single attribute check per search")
+
+
+if __name__ == "__main__":
+    main()
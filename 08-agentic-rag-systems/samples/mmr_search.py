@@ -0,0 +1,223 @@
+"""
+Sample: Vectorized Maximal Marginal Relevance (MMR) Search
+
+Knowledge bases are full of near-duplicates: the same paragraph copied
+into two guides, a FAQ answer restated in the docs. A top-k similarity
+search happily returns all copies, and every copy is paid for again in
+prompt tokens without telling the model anything new.
+
+MMR picks results one at a time, balancing relevance to the query against
+similarity to what was already picked:
+
+    score(d) = lambda * sim(query, d) - (1 - lambda) * max sim(d, picked)
+
+This version:
+- Works from the vectors already stored in the vector store - candidates
+  are never re-embedded
+- Runs the greedy loop with incremental NumPy updates: after each pick,
+  one matrix-vector product refreshes every candidate's redundancy score,
+  instead of recomputing all pairwise similarities in Python loops
+
+With less redundancy, k can be lowered without losing information, so each
+retrieval call sends fewer tokens to the model.
+
+Run: python 08-agentic-rag-systems/samples/mmr_search.py
+"""
+
+import os
+from typing import Any
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+def mmr_select(
+    query: np.ndarray, candidates: np.ndarray, k: int = 4, lambda_mult: float = 0.5
+) -> list[int]:
+    """
+    Greedy MMR over a (n, dim) candidate matrix. Returns selected row indices.
+
+    `max_redundancy[i]` holds candidate i's highest similarity to anything
+    picked so far. Each pick updates it with a single matrix-vector product,
+    so the whole selection costs O(k * n * dim) with no Python inner loop.
+    """
+    n = len(candidates)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    unit = candidates / np.where(norms == 0, 1.0, norms)
+    query = query / (np.linalg.norm(query) or 1.0)
+
+    relevance = unit @ query
+    max_redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: list[int] = []
+
+    for _ in range(k):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_redundancy
+        else:
+            # Nothing picked yet: the first result is simply the most relevant
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_redundancy, unit @ unit[best], out=max_redundancy)
+
+    return selected
+
+
+class MMRVectorStore(InMemoryVectorStore):
+    """InMemoryVectorStore whose MMR search uses the vectorized selection."""
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: list[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        *,
+        filter=None,  # noqa: A002
+        **kwargs: Any,
+    ) -> list[Document]:
+        # Candidates come back with their stored vectors - no re-embedding
+        prefetch = self._similarity_search_with_score_by_vector(
+            embedding=embedding, k=fetch_k, filter=filter
+        )
+        if not prefetch:
+            return []
+
+        candidates = np.asarray([vector for _, _, vector in prefetch], np.float32)
+        chosen = mmr_select(
+            np.asarray(embedding, dtype=np.float32), candidates, k, lambda_mult
+        )
+        return [prefetch[i][0] for i in chosen]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+# A knowledge base with deliberate near-duplicates
+knowledge_base = [
+    Document(
+        page_content="Python's asyncio module enables asynchronous programming with async/await syntax. The event loop manages coroutines, allowing efficient handling of I/O-bound operations without blocking.",
+        metadata={"title": "Python Async", "source": "my-notes"},
+    ),
+    Document(
+        page_content="The asyncio module in Python enables asynchronous programming using async/await syntax. An event loop manages coroutines so I/O-bound operations are handled efficiently without blocking.",
+        metadata={"title": "Python Async (copy in team wiki)", "source": "wiki"},
+    ),
+    Document(
+        page_content="Python asyncio: asynchronous programming with async and await. The event loop runs coroutines and handles I/O-bound work without blocking threads.",
+        metadata={"title": "Python Async (FAQ)", "source": "faq"},
+    ),
+    Document(
+        page_content="asyncio.gather runs several coroutines concurrently and returns their results in order. Use asyncio.create_task to schedule a coroutine to run in the background.",
+        metadata={"title": "Running Coroutines Concurrently", "source": "my-notes"},
+    ),
+    Document(
+        page_content="CPU-bound work blocks the event loop. Offload it with loop.run_in_executor or asyncio.to_thread so other coroutines keep running.",
+        metadata={"title": "Blocking Work in Async Code", "source": "my-notes"},
+    ),
+    Document(
+        page_content="Docker containers package applications with their dependencies, ensuring consistent behavior across environments.",
+        metadata={"title": "Docker Containers", "source": "my-notes"},
+    ),
+]
+
+
+def main():
+    print(" Vectorized MMR Search\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    vector_store = MMRVectorStore.from_documents(knowledge_base, embeddings)
+
+    query = "How do I run async code concurrently in Python?"
+    print(f' Query: "{query}"\n')
+
+    similar = vector_store.similarity_search(query, k=4)
+    diverse = vector_store.max_marginal_relevance_search(
+        query, k=3, fetch_k=10, lambda_mult=0.5
+    )
+
+    for label, results in [("Top-4 similarity", similar), ("Top-3 MMR", diverse)]:
+        tokens = sum(estimate_tokens(doc.page_content) for doc in results)
+        print(f" {label} (~{tokens} tokens of context):")
+        for doc in results:
+            print(f"   • {doc.metadata['title']}")
+        print()
+
+    print("=" * 80 + "\n")
+
+    @tool
+    def search_my_notes(query: str) -> str:
+        """Search my personal knowledge base for information about Python and Docker."""
+        # MMR lets us use a smaller k: the results no longer repeat each other
+        results = vector_store.max_marginal_relevance_search(query, k=3, fetch_k=10)
+
+        if not results:
+            return "No relevant information found in the knowledge base."
+
+        return "\n\n".join(
+            f"[{doc.metadata['title']}]: {doc.page_content}" for doc in results
+        )
+
+    agent = create_agent(
+        model,
+        tools=[search_my_notes],
+        system_prompt="You are a helpful assistant with access to my notes. Use the search tool when you need specific technical information from them.",
+    )
+
+    print(f" Question: {query}\n")
+    response = agent.invoke({"messages": [HumanMessage(content=query)]})
+    print(" Answer:", response["messages"][-1].content)
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Similarity search returns every copy of a popular paragraph")
+    print("   • MMR trades a little relevance for coverage of different facts")
+    print("   • Stored vectors are reused, so MMR costs no extra embedding calls")
+    print(
+        "   • One matrix-vector product per pick keeps selection fast at large fetch_k"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,26 @@ Sample: Agentic Multi-Source RAG System
 This demonstrates how an agent intelligently decides which document sources
 (text, markdown, web) to search based on the question context.
 
+All sources are searched through a single tool. The agent passes the source
+types it wants, and PartitionedIndex:
+- Embeds the query once and scores every row in one matrix-vector product
+- Takes the top-k of each requested source partition from those scores
+- Fuses the per-source lists with reciprocal rank fusion
+
+So a question that needs docs AND web pages costs one tool call, not one
+sequential round trip per source.
+
 Run: python 08-agentic-rag-systems/samples/multi_source_rag.py
 """
 
 import os
+from typing import Literal
 
+import numpy as np
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.tools import tool
 from langchain_core.vectorstores import InMemoryVectorStore
@@ -30,6 +42,70 @@ def get_embeddings_endpoint():
     return endpoint
 
 
+class PartitionedIndex:
+    """A vector matrix whose rows are grouped into partitions by a metadata key."""
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        vectors: np.ndarray,
+        docs: list[Document],
+        partition_key: str = "source_type",
+    ):
+        self.embedding = embedding
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.vectors = (vectors / np.where(norms == 0, 1.0, norms)).astype(np.float32)
+        self.docs = docs
+        self.partitions: dict[str, np.ndarray] = {}
+        for name in dict.fromkeys(doc.metadata[partition_key] for doc in docs):
+            self.partitions[name] = np.array(
+                [i for i, doc in enumerate(docs) if doc.metadata[partition_key] == name]
+            )
+
+    @classmethod
+    def from_vector_store(
+        cls, store: InMemoryVectorStore, partition_key: str = "source_type"
+    ) -> "PartitionedIndex":
+        """Reuse the vectors already held by an InMemoryVectorStore."""
+        records = list(store.store.values())
+        vectors = np.asarray([r["vector"] for r in records], dtype=np.float32)
+        docs = [
+            Document(id=r["id"], page_content=r["text"], metadata=r["metadata"])
+            for r in records
+        ]
+        return cls(store.embedding, vectors, docs, partition_key)
+
+    def search(
+        self, query: str, partitions: list[str] | None = None, k: int = 3
+    ) -> tuple[dict[str, list[Document]], list[Document]]:
+        """Return (top-k per partition, fused ranking across partitions)."""
+        wanted = [p for p in (partitions or self.partitions) if p in self.partitions]
+        vector = np.asarray(self.embedding.embed_query(query), dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+
+        # One pass over the index scores every partition at once
+        scores = self.vectors @ vector
+
+        per_source: dict[str, list[int]] = {}
+        for name in wanted:
+            rows = self.partitions[name]
+            part = scores[rows]
+            top = np.argpartition(-part, min(k, len(rows)) - 1)[:k]
+            per_source[name] = rows[top[np.argsort(-part[top])]].tolist()
+
+        # Reciprocal rank fusion: rank within a source matters, not raw score scale
+        fused: dict[int, float] = {}
+        for ranked in per_source.values():
+            for rank, row in enumerate(ranked):
+                fused[row] = fused.get(row, 0.0) + 1.0 / (60 + rank + 1)
+        order = sorted(fused, key=lambda row: (-fused[row], -scores[row]))
+
+        return (
+            {name: [self.docs[r] for r in rows] for name, rows in per_source.items()},
+            [self.docs[r] for r in order],
+        )
+
+
 documents = [
     # Text sources
     Document(
@@ -98,62 +174,38 @@ def main():
     vector_store = InMemoryVectorStore.from_documents(documents, embeddings)
     print(" Knowledge base ready!\n")
 
-    # Create source-specific retrieval tools
-    @tool
-    def search_all_sources(query: str) -> str:
-        """Search across ALL document sources (text files, markdown docs, web pages). Use this when you need comprehensive information from any available source."""
-        results = vector_store.similarity_search(query, k=3)
-        return "\n\n".join(
-            f"[{i + 1}] [{doc.metadata['source_type'].upper()}] {doc.metadata['source']} ({doc.metadata['date']})\n"
-            f"Content: {doc.page_content}"
-            for i, doc in enumerate(results)
-        )
-
-    @tool
-    def search_text_files(query: str) -> str:
-        """Search ONLY text files (.txt). Use this when you specifically need information from plain text sources like articles or notes."""
-        all_results = vector_store.similarity_search(query, k=10)
-        filtered = [doc for doc in all_results if doc.metadata["source_type"] == "text"]
-        return "\n\n".join(
-            f"[{i + 1}] {doc.metadata['source']} ({doc.metadata['date']})\n"
-            f"Content: {doc.page_content}"
-            for i, doc in enumerate(filtered[:3])
-        )
+    index = PartitionedIndex.from_vector_store(vector_store)
 
+    # One tool covers every source: the agent picks source types as an argument
+    # instead of calling a separate tool (and paying a round trip) per source
     @tool
-    def search_markdown_docs(query: str) -> str:
-        """Search ONLY markdown documentation (.md). Use this when you need documentation, guides, or README files."""
-        all_results = vector_store.similarity_search(query, k=10)
-        filtered = [
-            doc for doc in all_results if doc.metadata["source_type"] == "markdown"
-        ]
-        return "\n\n".join(
-            f"[{i + 1}] {doc.metadata['source']} ({doc.metadata['date']})\n"
+    def search_sources(
+        query: str,
+        source_types: list[Literal["text", "markdown", "web"]] | None = None,
+    ) -> str:
+        """Search the knowledge base: text files (articles, notes), markdown documentation (guides, READMEs) and web pages (official docs). Pass the source types worth searching, or omit source_types to search all of them. Returns the best results of each source plus one fused ranking."""
+        per_source, fused = index.search(query, source_types, k=3)
+        print(f"    Searching {', '.join(per_source)} for: \"{query}\"")
+
+        ranking = "\n\n".join(
+            f"[{i + 1}] [{doc.metadata['source_type'].upper()}] {doc.metadata['source']} ({doc.metadata['date']})\n"
             f"Content: {doc.page_content}"
-            for i, doc in enumerate(filtered[:3])
+            for i, doc in enumerate(fused)
         )
-
-    @tool
-    def search_web_pages(query: str) -> str:
-        """Search ONLY web pages. Use this when you need information from online sources or official documentation websites."""
-        all_results = vector_store.similarity_search(query, k=10)
-        filtered = [doc for doc in all_results if doc.metadata["source_type"] == "web"]
-        return "\n\n".join(
-            f"[{i + 1}] {doc.metadata['source']} ({doc.metadata['date']})\n"
-            f"Content: {doc.page_content}"
-            for i, doc in enumerate(filtered[:3])
+        # Per-source lists point into the fused ranking instead of repeating content
+        position = {id(doc): i + 1 for i, doc in enumerate(fused)}
+        best = "\n".join(
+            f"  {source}: "
+            + (", ".join(f"[{position[id(doc)]}]" for doc in docs) or "no results")
+            for source, docs in per_source.items()
         )
+        return f"Fused ranking:\n\n{ranking}\n\nBest per source:\n{best}"
 
-    # Create agent with all source-specific tools
+    # Create agent with the fused multi-source tool
     agent = create_agent(
         model,
-        tools=[
-            search_all_sources,
-            search_text_files,
-            search_markdown_docs,
-            search_web_pages,
-        ],
-        system_prompt="You are a helpful assistant with access to multiple document sources: text files, markdown documentation, and web pages. Choose the appropriate search tool based on the type of information needed. For general knowledge questions, answer directly without searching.",
+        tools=[search_sources],
+        system_prompt="You are a helpful assistant with access to multiple document sources: text files, markdown documentation, and web pages. Use search_sources once with every source type that could help, rather than searching sources one at a time. For general knowledge questions, answer directly without searching.",
     )
 
     print("=" * 80 + "\n")
@@ -192,7 +244,8 @@ def main():
                 None,
             )
             if tool_use and tool_use.tool_calls:
-                print(f" Agent chose: {tool_use.tool_calls[0]['name']}\n")
+                args = tool_use.tool_calls[0]["args"]
+                print(f" Agent searched: {args.get('source_types') or 'all sources'}\n")
 
             print("─" * 80 + "\n")
 
@@ -200,11 +253,10 @@ def main():
         return
 
     # Interactive mode
-    print(" The agent can intelligently choose between:")
-    print("   • search_all_sources - Search all document types")
-    print("   • search_text_files - Search only .txt files")
-    print("   • search_markdown_docs - Search only .md files")
-    print("   • search_web_pages - Search only web sources")
+    print(" The agent searches any combination of sources in one tool call:")
+    print("   • text - .txt articles and notes")
+    print("   • markdown - .md guides and READMEs")
+    print("   • web - online documentation")
     print("\nThe agent will decide which source(s) to search based on your question!\n")
 
     while True:
@@ -240,16 +292,17 @@ def main():
             for msg in tool_messages:
                 if msg.tool_calls:
                     for call in msg.tool_calls:
-                        print(f"   ✓ Used: {call['name']}")
+                        sources = call["args"].get("source_types") or "all sources"
+                        print(f"   ✓ Searched: {sources}")
 
         print("\n" + "─" * 80)
 
     print("\n Complete!")
     print("\n Key Insights:")
     print("   ✓ Agent intelligently chooses which source types to search")
-    print("   ✓ No manual source selection needed - agent decides based on context")
-    print("   ✓ More efficient than always searching all sources")
-    print("   ✓ Demonstrates multi-tool agent decision-making")
+    print("   ✓ One tool call covers several sources - no sequential round trips")
+    print("   ✓ One pass over the index scores every requested source at once")
+    print("   ✓ Fused ranking puts the best results from all sources first")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,401 @@
+"""
+Sample: Multi-Tenant Vector Store with Memory Accounting and LRU Eviction
+
+The knowledge base examples in this lab give every user their own
+InMemoryVectorStore. That works for one user, but hosting thousands of
+personal stores in one process means thousands of Python dicts full of
+float lists that are never released.
+
+This sample keeps every tenant in a single engine:
+- Each tenant gets its own namespace backed by one float32 NumPy matrix
+- Each namespace tracks its memory footprint (vectors + text + metadata)
+- When the resident total exceeds a budget, the least recently used
+  namespaces are written to disk and paged back in on their next access
+- A search only ever touches the matrix of the namespace it targets, so one
+  tenant's query never scans another tenant's rows
+
+Run: python 08-agentic-rag-systems/samples/multi_tenant_store.py
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+class Namespace:
+    """The rows of a single tenant: one vector matrix plus parallel lists."""
+
+    def __init__(self, name: str, dimensions: int):
+        self.name = name
+        self.vectors = np.empty((0, dimensions), dtype=np.float32)
+        self.ids: list[str] = []
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
+        self.resident = True
+        self.nbytes = 0
+
+    def append(self, ids: list[str], vectors: np.ndarray, docs: list[Document]):
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.ids.extend(ids)
+        self.texts.extend(doc.page_content for doc in docs)
+        self.metadatas.extend(doc.metadata for doc in docs)
+        self.nbytes = self.measure()
+
+    def measure(self) -> int:
+        """Approximate resident size in bytes (vectors, texts and metadata)."""
+        size = self.vectors.nbytes
+        size += sum(sys.getsizeof(text) for text in self.texts)
+        size += sum(sys.getsizeof(id_) for id_ in self.ids)
+        size += sum(len(json.dumps(meta, default=str)) for meta in self.metadatas)
+        return size
+
+
+class MultiTenantVectorStore:
+    """
+    A single vector store engine holding many isolated tenant namespaces.
+
+    Namespaces are created on first write. Only `max_resident_bytes` worth of
+    namespaces stay in memory; the rest live in `spill_dir` until needed.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        max_resident_bytes: int = 256 * 1024 * 1024,
+        spill_dir: str | None = None,
+    ):
+        self.embedding = embedding
+        self.max_resident_bytes = max_resident_bytes
+        self.spill_dir = Path(spill_dir or tempfile.mkdtemp(prefix="tenant-spill-"))
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        # Resident namespaces in LRU order (oldest first)
+        self._resident: OrderedDict[str, Namespace] = OrderedDict()
+        self._evicted: dict[str, Namespace] = {}
+        self._dimensions: int | None = None
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.page_ins = 0
+
+    # ------------------------------------------------------------------
+    # Namespace bookkeeping
+    # ------------------------------------------------------------------
+
+    def _spill_path(self, name: str) -> Path:
+        # The digest keeps names that sanitize alike ("acme/a", "acme_a") apart;
+        # the readable prefix is only there for humans browsing the spill dir
+        prefix = re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:32]
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        return self.spill_dir / f"{prefix}-{digest}"
+
+    def _get(self, name: str, create: bool = False) -> Namespace | None:
+        """Return a resident namespace, paging it in or creating it if needed."""
+        if name in self._resident:
+            self._resident.move_to_end(name)
+            return self._resident[name]
+
+        if name in self._evicted:
+            namespace = self._page_in(self._evicted.pop(name))
+        elif create:
+            namespace = Namespace(name, self._dimensions or 0)
+        else:
+            return None
+
+        self._resident[name] = namespace
+        self._enforce_budget(keep=name)
+        return namespace
+
+    def _page_in(self, namespace: Namespace) -> Namespace:
+        path = self._spill_path(namespace.name)
+        namespace.vectors = np.load(path / "vectors.npy")
+        with (path / "rows.json").open("r", encoding="utf-8") as f:
+            rows = json.load(f)
+        namespace.ids = rows["ids"]
+        namespace.texts = rows["texts"]
+        namespace.metadatas = rows["metadatas"]
+        namespace.resident = True
+        self.page_ins += 1
+        return namespace
+
+    def _evict(self, namespace: Namespace):
+        path = self._spill_path(namespace.name)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "vectors.npy", namespace.vectors)
+        with (path / "rows.json").open("w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "ids": namespace.ids,
+                    "texts": namespace.texts,
+                    "metadatas": namespace.metadatas,
+                },
+                f,
+                default=str,
+            )
+        # Drop the in-memory rows; `nbytes` is kept so stats stay meaningful
+        namespace.vectors = np.empty((0, 0), dtype=np.float32)
+        namespace.ids, namespace.texts, namespace.metadatas = [], [], []
+        namespace.resident = False
+        self._evicted[namespace.name] = namespace
+        self.evictions += 1
+
+    def _enforce_budget(self, keep: str):
+        """Evict least recently used namespaces until we fit the budget."""
+        while self.resident_bytes() > self.max_resident_bytes:
+            oldest = next(iter(self._resident))
+            if oldest == keep:
+                # Never evict the namespace the caller is about to use
+                break
+            self._evict(self._resident.pop(oldest))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def add_documents(
+        self, namespace: str, documents: list[Document], ids: list[str] | None = None
+    ) -> list[str]:
+        """Embed and store documents inside one tenant's namespace."""
+        if ids and len(ids) != len(documents):
+            raise ValueError(
+                f"ids must be the same length as documents. "
+                f"Got {len(ids)} ids and {len(documents)} documents."
+            )
+        if not documents:
+            return []
+
+        vectors = np.asarray(
+            self.embedding.embed_documents([doc.page_content for doc in documents]),
+            dtype=np.float32,
+        )
+        # Normalize once at write time so search is a single dot product
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+
+        ids_ = ids or [doc.id or str(uuid.uuid4()) for doc in documents]
+
+        with self._lock:
+            if self._dimensions is None:
+                self._dimensions = vectors.shape[1]
+            target = self._get(namespace, create=True)
+            target.append(ids_, vectors, documents)
+            self._enforce_budget(keep=namespace)
+        return ids_
+
+    def similarity_search_with_score(
+        self, namespace: str, query: str, k: int = 4
+    ) -> list[tuple[Document, float]]:
+        """Search a single namespace. Other tenants' rows are never read."""
+        query_vector = np.asarray(self.embedding.embed_query(query), dtype=np.float32)
+        query_vector /= np.linalg.norm(query_vector) or 1.0
+
+        with self._lock:
+            target = self._get(namespace)
+            if target is None or not target.ids:
+                return []
+
+            scores = target.vectors @ query_vector
+            k = min(k, len(scores))
+            top_k = np.argpartition(-scores, k - 1)[:k]
+            top_k = top_k[np.argsort(-scores[top_k])]
+
+            return [
+                (
+                    Document(
+                        id=target.ids[i],
+                        page_content=target.texts[i],
+                        metadata=target.metadatas[i],
+                    ),
+                    float(scores[i]),
+                )
+                for i in top_k
+            ]
+
+    def similarity_search(
+        self, namespace: str, query: str, k: int = 4
+    ) -> list[Document]:
+        return [
+            doc for doc, _ in self.similarity_search_with_score(namespace, query, k)
+        ]
+
+    def drop_namespace(self, namespace: str):
+        """Remove a tenant and its spill files."""
+        with self._lock:
+            self._resident.pop(namespace, None)
+            self._evicted.pop(namespace, None)
+            path = self._spill_path(namespace)
+            if path.exists():
+                for file in path.iterdir():
+                    file.unlink()
+                path.rmdir()
+
+    def resident_bytes(self) -> int:
+        return sum(ns.nbytes for ns in self._resident.values())
+
+    def stats(self) -> dict:
+        """Per-namespace memory accounting and engine-wide counters."""
+        with self._lock:
+            namespaces = {
+                name: {"rows": len(ns.ids), "bytes": ns.nbytes, "resident": True}
+                for name, ns in self._resident.items()
+            }
+            for name, ns in self._evicted.items():
+                namespaces[name] = {"rows": None, "bytes": ns.nbytes, "resident": False}
+            return {
+                "namespaces": namespaces,
+                "resident_bytes": self.resident_bytes(),
+                "max_resident_bytes": self.max_resident_bytes,
+                "evictions": self.evictions,
+                "page_ins": self.page_ins,
+            }
+
+
+# Each tenant has their own personal notes
+tenant_notes = {
+    "alice": [
+        Document(
+            page_content="Python's asyncio module enables asynchronous programming with async/await syntax. The event loop manages coroutines for I/O-bound work.",
+            metadata={"title": "Python Async", "source": "my-notes"},
+        ),
+        Document(
+            page_content="Docker containers package applications with their dependencies, ensuring consistent behavior across environments.",
+            metadata={"title": "Docker Containers", "source": "my-notes"},
+        ),
+    ],
+    "bob": [
+        Document(
+            page_content="React hooks like useState and useEffect allow functional components to have state and side effects.",
+            metadata={"title": "React Hooks", "source": "my-notes"},
+        ),
+        Document(
+            page_content="REST APIs follow principles like statelessness and a uniform interface. HTTP methods map to CRUD operations.",
+            metadata={"title": "REST API Design", "source": "my-notes"},
+        ),
+    ],
+    "carol": [
+        Document(
+            page_content="Database indexing improves query performance. B-tree indexes work well for range queries, hash indexes for equality.",
+            metadata={"title": "Database Indexing", "source": "my-notes"},
+        ),
+        Document(
+            page_content="Git branching strategies like Git Flow and trunk-based development help teams manage code changes.",
+            metadata={"title": "Git Workflows", "source": "my-notes"},
+        ),
+    ],
+}
+
+
+def print_stats(store: MultiTenantVectorStore):
+    stats = store.stats()
+    for name, info in stats["namespaces"].items():
+        state = "resident" if info["resident"] else "on disk"
+        print(f"   {name:<8} {info['bytes']:>8,} bytes  ({state})")
+    print(
+        f"   Resident: {stats['resident_bytes']:,} / {stats['max_resident_bytes']:,} bytes"
+        f"  | evictions: {stats['evictions']}  | page-ins: {stats['page_ins']}\n"
+    )
+
+
+def main():
+    print(" Multi-Tenant Vector Store\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    # A deliberately tiny budget so eviction is visible with a few documents
+    store = MultiTenantVectorStore(embeddings, max_resident_bytes=30_000)
+
+    for tenant, notes in tenant_notes.items():
+        store.add_documents(tenant, notes)
+        print(f" Loaded {len(notes)} notes for {tenant}")
+    print()
+
+    print(" Memory accounting after loading all tenants:")
+    print_stats(store)
+
+    def build_agent_for(tenant: str):
+        """Each tenant gets a tool bound to their own namespace."""
+
+        @tool
+        def search_my_notes(query: str) -> str:
+            """Search my personal knowledge base. Use this when you need specific technical information from my notes."""
+            print(f'    [{tenant}] searching for: "{query}"')
+            results = store.similarity_search(tenant, query, k=2)
+
+            if not results:
+                return "No relevant information found in the knowledge base."
+
+            return "\n\n".join(
+                f"[{doc.metadata['title']}]: {doc.page_content}" for doc in results
+            )
+
+        return create_agent(
+            model,
+            tools=[search_my_notes],
+            system_prompt="You are a helpful personal assistant with access to the user's notes. Use the search tool when you need information from their notes.",
+        )
+
+    questions = [
+        ("alice", "How does async work in Python?"),
+        ("bob", "What are React hooks?"),
+        # Alice asks about Bob's topic - her namespace does not contain it
+        ("alice", "What are React hooks?"),
+    ]
+
+    for tenant, question in questions:
+        print("=" * 80)
+        print(f"\n [{tenant}] Question: {question}\n")
+
+        agent = build_agent_for(tenant)
+        response = agent.invoke({"messages": [HumanMessage(content=question)]})
+        print(" Answer:", response["messages"][-1].content)
+        print()
+        print_stats(store)
+
+    print("=" * 80)
+    print("\n Key Insights:")
+    print("   • One engine hosts every tenant, each with its own vector matrix")
+    print("   • Memory is accounted per namespace and capped globally")
+    print("   • Idle tenants are evicted to disk and paged back in on demand")
+    print("   • A tenant's search never reads another tenant's rows")
+
+
+if __name__ == "__main__":
+    main()
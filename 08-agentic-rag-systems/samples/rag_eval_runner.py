@@ -0,0 +1,320 @@
+"""
+Sample: Concurrent Evaluation of Traditional vs Agentic RAG
+
+01a_traditional_rag.py and 02_agentic_rag.py make claims about cost and
+latency - "always searching wastes calls", "the agent only searches when
+needed" - but each runs three questions one after another and prints the
+answers. This runner measures the claims instead:
+
+- Both pipelines are Runnables, so a whole question set runs through
+  abatch() with max_concurrency as the limit
+- A callback handler per question counts model calls, tool calls and
+  tokens (from usage_metadata), times every retrieval, and measures
+  end-to-end latency of that question
+- Both pipelines search through the same @tool, so retrieval is measured
+  the same way in each
+- The report aggregates everything with p50/p95/p99 percentiles; set
+  EVAL_OUTPUT to append per-question rows as JSON lines
+
+Run: python 08-agentic-rag-systems/samples/rag_eval_runner.py
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+@dataclass
+class QuestionMetrics:
+    pipeline: str
+    question: str
+    model_calls: int = 0
+    tool_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    retrieval_ms: float = 0.0
+    latency_ms: float = 0.0
+    error: str | None = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+class MetricsCollector(BaseCallbackHandler):
+    """Collects the metrics of one question from LangChain callbacks."""
+
+    def __init__(self, metrics: QuestionMetrics):
+        self.metrics = metrics
+        self._tool_starts: dict = {}
+        self._root_start: float | None = None
+        self._lock = threading.Lock()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kw):
+        if parent_run_id is None:
+            self._root_start = time.perf_counter()
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kw):
+        if parent_run_id is None and self._root_start is not None:
+            self.metrics.latency_ms = (time.perf_counter() - self._root_start) * 1000
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kw):
+        if parent_run_id is None:
+            self.metrics.error = f"{type(error).__name__}: {error}"
+            self.on_chain_end(None, run_id=run_id)
+
+    def on_chat_model_start(self, serialized, messages, **kw):
+        with self._lock:
+            self.metrics.model_calls += 1
+
+    def on_llm_end(self, response, **kw):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(
+                    getattr(generation, "message", None), "usage_metadata", None
+                )
+                if usage:
+                    with self._lock:
+                        self.metrics.input_tokens += usage.get("input_tokens", 0)
+                        self.metrics.output_tokens += usage.get("output_tokens", 0)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kw):
+        with self._lock:
+            self.metrics.tool_calls += 1
+            self._tool_starts[run_id] = time.perf_counter()
+
+    def on_tool_end(self, output, *, run_id, **kw):
+        with self._lock:
+            started = self._tool_starts.pop(run_id, None)
+            if started is not None:
+                self.metrics.retrieval_ms += (time.perf_counter() - started) * 1000
+
+    def on_tool_error(self, error, *, run_id, **kw):
+        self.on_tool_end(None, run_id=run_id)
+
+
+async def run_pipeline(
+    name: str,
+    pipeline: Runnable,
+    questions: list[str],
+    to_input,
+    max_concurrency: int,
+) -> tuple[list[QuestionMetrics], float]:
+    """Run every question through abatch; returns per-question metrics and wall time."""
+    metrics = [QuestionMetrics(name, q) for q in questions]
+    configs = [
+        RunnableConfig(callbacks=[MetricsCollector(m)], max_concurrency=max_concurrency)
+        for m in metrics
+    ]
+    start = time.perf_counter()
+    await pipeline.abatch(
+        [to_input(q) for q in questions], configs, return_exceptions=True
+    )
+    return metrics, time.perf_counter() - start
+
+
+def summarize(metrics: list[QuestionMetrics], wall_seconds: float) -> dict:
+    ok = [m for m in metrics if m.error is None] or metrics
+    latency = [m.latency_ms for m in ok]
+    retrieval = [m.retrieval_ms for m in ok]
+    return {
+        "pipeline": metrics[0].pipeline,
+        "questions": len(metrics),
+        "errors": sum(m.error is not None for m in metrics),
+        "model_calls": sum(m.model_calls for m in ok),
+        "tool_calls": sum(m.tool_calls for m in ok),
+        "tokens": sum(m.total_tokens for m in ok),
+        "retrieval_p50_ms": float(np.percentile(retrieval, 50)),
+        "retrieval_p95_ms": float(np.percentile(retrieval, 95)),
+        "latency_p50_ms": float(np.percentile(latency, 50)),
+        "latency_p95_ms": float(np.percentile(latency, 95)),
+        "latency_p99_ms": float(np.percentile(latency, 99)),
+        "throughput_qps": len(metrics) / wall_seconds,
+    }
+
+
+def print_report(summaries: list[dict], details: list[QuestionMetrics]):
+    print(
+        f"   {'Question':<40}{'Pipeline':<13}{'Model':>6}{'Tools':>6}{'Tokens':>8}{'Retr ms':>9}{'Total ms':>10}"
+    )
+    print("   " + "─" * 92)
+    for m in sorted(details, key=lambda m: (m.question, m.pipeline)):
+        print(
+            f"   {m.question[:38]:<40}{m.pipeline:<13}{m.model_calls:>6}{m.tool_calls:>6}"
+            f"{m.total_tokens:>8}{m.retrieval_ms:>9.0f}{m.latency_ms:>10.0f}"
+            + (f"  ERROR {m.error[:30]}" if m.error else "")
+        )
+
+    print("\n Aggregate:\n")
+    rows = [
+        ("Model calls", "model_calls", "{:.0f}"),
+        ("Tool calls", "tool_calls", "{:.0f}"),
+        ("Tokens", "tokens", "{:,.0f}"),
+        ("Retrieval p50 (ms)", "retrieval_p50_ms", "{:.0f}"),
+        ("Retrieval p95 (ms)", "retrieval_p95_ms", "{:.0f}"),
+        ("Latency p50 (ms)", "latency_p50_ms", "{:.0f}"),
+        ("Latency p95 (ms)", "latency_p95_ms", "{:.0f}"),
+        ("Latency p99 (ms)", "latency_p99_ms", "{:.0f}"),
+        ("Throughput (q/s)", "throughput_qps", "{:.2f}"),
+        ("Errors", "errors", "{:.0f}"),
+    ]
+    print(f"   {'':<22}" + "".join(f"{s['pipeline']:>14}" for s in summaries))
+    for label, key, fmt in rows:
+        print(
+            f"   {label:<22}" + "".join(f"{fmt.format(s[key]):>14}" for s in summaries)
+        )
+
+
+docs = [
+    Document(
+        page_content="LangChain was created in 2022 and quickly became popular for building LLM applications. The Python version was first, followed by LangChain.js for JavaScript/TypeScript.",
+        metadata={"source": "langchain-history", "topic": "introduction"},
+    ),
+    Document(
+        page_content="RAG (Retrieval Augmented Generation) combines document retrieval with LLM generation. It allows models to access external knowledge without retraining, making responses more accurate and up-to-date.",
+        metadata={"source": "rag-explanation", "topic": "concepts"},
+    ),
+    Document(
+        page_content="Vector stores like Pinecone, Weaviate, and Chroma enable semantic search over documents. They store embeddings and perform fast similarity searches to find relevant content.",
+        metadata={"source": "vector-stores", "topic": "infrastructure"},
+    ),
+    Document(
+        page_content="LangChain supports multiple document loaders for PDFs, web pages, databases, and APIs. Text splitters help break large documents into chunks that fit within LLM context windows while preserving semantic meaning.",
+        metadata={"source": "document-processing", "topic": "development"},
+    ),
+]
+
+# A mix of general-knowledge and document-specific questions
+questions = [
+    "What is the capital of France?",
+    "What is 12 times 12?",
+    "Who wrote Hamlet?",
+    "When was LangChain created?",
+    "What is RAG and why is it useful?",
+    "Which vector stores support semantic search?",
+    "How do text splitters help with context windows?",
+    "Can LangChain load PDFs?",
+]
+
+
+def main():
+    print(" Traditional vs Agentic RAG: Concurrent Evaluation\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    vector_store = InMemoryVectorStore.from_documents(docs, embeddings)
+
+    @tool
+    async def search_langchain_docs(query: str) -> str:
+        """Search LangChain documentation for specific information about LangChain, RAG systems, vector stores, and document processing. Use this when you need factual information from the LangChain knowledge base."""
+        results = await vector_store.asimilarity_search(query, k=2)
+        return "\n\n".join(
+            f"[{doc.metadata['source']}]: {doc.page_content}" for doc in results
+        )
+
+    # Traditional RAG: always retrieve (through the same tool), then one model call
+    async def traditional_rag(question: str, config: RunnableConfig) -> str:
+        context = await search_langchain_docs.ainvoke({"query": question}, config)
+        response = await model.ainvoke(
+            [
+                SystemMessage(
+                    content="You are a helpful assistant. Answer the question based on the provided context. If the context is not helpful, answer based on your general knowledge."
+                ),
+                HumanMessage(content=f"Context:\n{context}\n\nQuestion: {question}"),
+            ],
+            config,
+        )
+        return response.content
+
+    traditional = RunnableLambda(traditional_rag, name="traditional_rag")
+
+    agentic = create_agent(
+        model,
+        tools=[search_langchain_docs],
+        system_prompt="You are a helpful assistant with access to LangChain documentation. Use the search tool when you need specific information about LangChain, RAG, or vector stores. For general knowledge questions, answer directly without searching.",
+    )
+
+    concurrency = int(os.getenv("EVAL_CONCURRENCY", "4"))
+    print(
+        f" Running {len(questions)} questions per pipeline, "
+        f"max_concurrency={concurrency}...\n"
+    )
+
+    async def run_all():
+        return await asyncio.gather(
+            run_pipeline(
+                "traditional", traditional, questions, lambda q: q, concurrency
+            ),
+            run_pipeline(
+                "agentic",
+                agentic,
+                questions,
+                lambda q: {"messages": [HumanMessage(content=q)]},
+                concurrency,
+            ),
+        )
+
+    results = asyncio.run(run_all())
+    details = [m for metrics, _ in results for m in metrics]
+    summaries = [summarize(metrics, wall) for metrics, wall in results]
+    print_report(summaries, details)
+
+    output = os.getenv("EVAL_OUTPUT")
+    if output:
+        with open(output, "a", encoding="utf-8") as f:
+            for m in details:
+                f.write(
+                    json.dumps({**asdict(m), "total_tokens": m.total_tokens}) + "\n"
+                )
+        print(f"\n Per-question rows appended to {output}")
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Traditional RAG: one model call per question, but always a retrieval")
+    print(
+        "   • Agentic RAG: skips retrieval for general questions, pays 2 calls when it searches"
+    )
+    print("   • Percentiles show the tail latency a few slow questions cause")
+    print("   • Re-run after every prompt or model change to keep the numbers honest")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Sample: RAG as an HTTP Service (Micro-Batching, SSE Streaming, Backpressure)
+
+The RAG logic in this chapter runs as scripts: one process, one user, one
+question at a time. In production it sits behind an API shared by many
+clients. This service wraps both flavours - traditional_rag (always
+retrieve, one model call) and the agentic flow (the model decides) - in
+an async Starlette app:
+
+- POST /ask {"question": ..., "mode": "traditional" | "agentic"} streams
+  the answer back as server-sent events: sources / tool_call, token..., done
+- Query embeddings from all concurrent requests go through
+  EmbeddingCoalescer (embedding_coalescer.py), so they are sent as batched
+  embed_documents calls instead of one HTTP request per question
+- AdmissionControl caps requests per client (429 Too Many Requests) and
+  the total in flight; a bounded queue absorbs bursts, and when that is
+  full the service sheds load with 503 + Retry-After instead of piling up
+  work it cannot finish
+- GET /stats reports admission and embedding batch counters
+
+Run: python 08-agentic-rag-systems/samples/rag_http_service.py
+
+Then try: curl -N -X POST localhost:8000/ask -H "X-Client-Id: me" \\
+    -d '{"question": "What is RAG?"}'
+Load test (offline): python 08-agentic-rag-systems/samples/rag_service_load_test.py
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+
+import uvicorn
+from dotenv import load_dotenv
+from embedding_coalescer import EmbeddingCoalescer
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+class AdmissionControl:
+    """Per-client concurrency limits plus a bounded queue for the whole service."""
+
+    def __init__(
+        self, max_per_client: int = 4, max_concurrent: int = 32, max_queue: int = 64
+    ):
+        self.max_per_client = max_per_client
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._per_client: defaultdict[str, int] = defaultdict(int)
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._waiting = 0
+
+        self.admitted = 0
+        self.rejected_client = 0
+        self.rejected_busy = 0
+
+    async def acquire(self, client: str) -> str | None:
+        """Wait for a slot; returns a rejection reason instead if there is none."""
+        if self._per_client[client] >= self.max_per_client:
+            self.rejected_client += 1
+            return "client"
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            self.rejected_busy += 1
+            return "busy"
+
+        self._per_client[client] += 1
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            self._release_client(client)
+            raise
+        finally:
+            self._waiting -= 1
+        self.admitted += 1
+        return None
+
+    def release(self, client: str):
+        self._slots.release()
+        self._release_client(client)
+
+    def _release_client(self, client: str):
+        self._per_client[client] -= 1
+        if self._per_client[client] == 0:
+            del self._per_client[client]
+
+    def stats(self) -> dict:
+        return {
+            "admitted": self.admitted,
+            "rejected_client": self.rejected_client,
+            "rejected_busy": self.rejected_busy,
+            "waiting": self._waiting,
+            "clients_active": len(self._per_client),
+        }
+
+
+def format_results(results: list[Document]) -> str:
+    return "\n\n".join(
+        f"[{doc.metadata['source']}]: {doc.page_content}" for doc in results
+    )
+
+
+class RAGService:
+    """The chapter's traditional and agentic RAG, as async event streams."""
+
+    def __init__(
+        self,
+        model,
+        vector_store: InMemoryVectorStore,
+        embedder: EmbeddingCoalescer,
+        k: int = 2,
+    ):
+        self.model = model
+        self.vector_store = vector_store
+        self.embedder = embedder
+        self.k = k
+
+        async def retrieve(query: str) -> list[Document]:
+            # The coalescer batches this with every other request's query
+            vector = await self.embedder.aembed_query(query)
+            return self.vector_store.similarity_search_by_vector(vector, k=self.k)
+
+        self.retrieve = retrieve
+
+        @tool
+        async def search_langchain_docs(query: str) -> str:
+            """Search LangChain documentation for specific information about LangChain, RAG systems, vector stores, and document processing. Use this when you need factual information from the LangChain knowledge base."""
+            return format_results(await retrieve(query))
+
+        self.agent = create_agent(
+            model,
+            tools=[search_langchain_docs],
+            system_prompt="You are a helpful assistant with access to LangChain documentation. Use the search tool when you need specific information about LangChain, RAG, or vector stores. For general knowledge questions, answer directly without searching.",
+        )
+
+    async def answer(self, question: str, mode: str) -> AsyncIterator[tuple[str, dict]]:
+        start = time.perf_counter()
+        events = (
+            self._agentic(question)
+            if mode == "agentic"
+            else self._traditional(question)
+        )
+        first_token_ms = None
+        async for event, data in events:
+            if event == "token" and first_token_ms is None:
+                first_token_ms = (time.perf_counter() - start) * 1000
+            yield event, data
+        total_ms = (time.perf_counter() - start) * 1000
+        yield "done", {"first_token_ms": first_token_ms, "total_ms": total_ms}
+
+    async def _traditional(self, question: str):
+        results = await self.retrieve(question)
+        yield "sources", {"sources": [doc.metadata["source"] for doc in results]}
+        messages = [
+            SystemMessage(
+                content="You are a helpful assistant. Answer the question based on the provided context. If the context is not helpful, answer based on your general knowledge."
+            ),
+            HumanMessage(
+                content=f"Context:\n{format_results(results)}\n\nQuestion: {question}"
+            ),
+        ]
+        async for chunk in self.model.astream(messages):
+            if chunk.content:
+                yield "token", {"text": chunk.content}
+
+    async def _agentic(self, question: str):
+        inputs = {"messages": [HumanMessage(content=question)]}
+        async for mode, data in self.agent.astream(
+            inputs, stream_mode=["messages", "updates"]
+        ):
+            if mode == "messages":
+                chunk, meta = data
+                if (
+                    meta.get("langgraph_node") == "model"
+                    and isinstance(chunk.content, str)
+                    and chunk.content
+                    and not getattr(chunk, "tool_calls", None)
+                ):
+                    yield "token", {"text": chunk.content}
+                continue
+            for update in data.values():
+                for message in (update or {}).get("messages", []):
+                    if isinstance(message, AIMessage):
+                        for call in message.tool_calls:
+                            yield "tool_call", {
+                                "name": call["name"],
+                                "args": call["args"],
+                            }
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class _Slot:
+    """An admitted request's slot; released once, however the stream ends."""
+
+    def __init__(self, admission: AdmissionControl, client: str):
+        self.admission = admission
+        self.client = client
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.admission.release(self.client)
+
+
+def create_app(service: RAGService, admission: AdmissionControl) -> Starlette:
+    async def ask(request: Request):
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "body must be JSON"}, status_code=400)
+        if not isinstance(body, dict):
+            return JSONResponse({"error": "body must be JSON"}, status_code=400)
+        question = str(body.get("question", "")).strip()
+        mode = body.get("mode", "traditional")
+        if not question or mode not in ("traditional", "agentic"):
+            return JSONResponse(
+                {"error": 'expected {"question": str, "mode": "traditional|agentic"}'},
+                status_code=400,
+            )
+
+        # request.client is None behind some ASGI servers and test clients
+        client = request.headers.get("x-client-id") or (
+            request.client.host if request.client else "anonymous"
+        )
+        rejected = await admission.acquire(client)
+        if rejected == "client":
+            return JSONResponse(
+                {"error": "too many concurrent requests for this client"},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        if rejected == "busy":
+            return JSONResponse(
+                {"error": "service busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+
+        slot = _Slot(admission, client)
+
+        async def stream():
+            try:
+                async for event, data in service.answer(question, mode):
+                    yield sse(event, data)
+            except Exception as error:
+                yield sse("error", {"error": f"{type(error).__name__}: {error}"})
+            finally:
+                slot.release()
+
+        # The background task covers clients that disconnect before streaming starts
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+            background=BackgroundTask(slot.release),
+        )
+
+    async def stats(request: Request):
+        return JSONResponse(
+            {"admission": admission.stats(), "embeddings": service.embedder.stats()}
+        )
+
+    return Starlette(
+        routes=[
+            Route("/ask", ask, methods=["POST"]),
+            Route("/stats", stats, methods=["GET"]),
+        ]
+    )
+
+
+docs = [
+    Document(
+        page_content="LangChain was created in 2022 and quickly became popular for building LLM applications. The Python version was first, followed by LangChain.js for JavaScript/TypeScript.",
+        metadata={"source": "langchain-history", "topic": "introduction"},
+    ),
+    Document(
+        page_content="RAG (Retrieval Augmented Generation) combines document retrieval with LLM generation. It allows models to access external knowledge without retraining, making responses more accurate and up-to-date.",
+        metadata={"source": "rag-explanation", "topic": "concepts"},
+    ),
+    Document(
+        page_content="Vector stores like Pinecone, Weaviate, and Chroma enable semantic search over documents. They store embeddings and perform fast similarity searches to find relevant content.",
+        metadata={"source": "vector-stores", "topic": "infrastructure"},
+    ),
+    Document(
+        page_content="LangChain supports multiple document loaders for PDFs, web pages, databases, and APIs. Text splitters help break large documents into chunks that fit within LLM context windows while preserving semantic meaning.",
+        metadata={"source": "document-processing", "topic": "development"},
+    ),
+]
+
+
+def main():
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+        streaming=True,
+    )
+
+    vector_store = InMemoryVectorStore.from_documents(docs, embeddings)
+    service = RAGService(model, vector_store, EmbeddingCoalescer(embeddings))
+    admission = AdmissionControl(
+        max_per_client=int(os.getenv("MAX_PER_CLIENT", "4")),
+        max_concurrent=int(os.getenv("MAX_CONCURRENT", "32")),
+        max_queue=int(os.getenv("MAX_QUEUE", "64")),
+    )
+
+    port = int(os.getenv("PORT", "8000"))
+    print(" RAG HTTP Service")
+    print(f" POST http://localhost:{port}/ask   GET http://localhost:{port}/stats")
+    print("  Press Ctrl+C to stop the server")
+    uvicorn.run(create_app(service, admission), port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Sample: Offline Load Test for the RAG HTTP Service
+
+Starts rag_http_service.py in-process with a fake streaming chat model and
+simulated embeddings (fixed round trip, limited connections - see
+embedding_coalescer.py), then fires concurrent SSE requests at it from
+many clients over real HTTP. No API keys and no network are needed.
+
+Each run is done twice - query embeddings sent one by one, then
+micro-batched - and reports:
+- Throughput, time to first token and total latency (p50/p95)
+- 429s (per-client limit) and 503s (queue full), which clients retry
+- Embedding API calls and the average batch size
+
+Set LOAD_CLIENTS, LOAD_REQUESTS (per client), LOAD_CLIENT_CONCURRENCY
+and LOAD_MODE (traditional or agentic) to change the load.
+
+Run: python 08-agentic-rag-systems/samples/rag_service_load_test.py
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import time
+from typing import Any
+
+import httpx
+import numpy as np
+import uvicorn
+from embedding_coalescer import EmbeddingCoalescer, SimulatedEmbeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.vectorstores import InMemoryVectorStore
+from rag_http_service import AdmissionControl, RAGService, create_app, docs
+
+
+class FakeStreamingModel(BaseChatModel):
+    """
+    Streams a fixed answer after a simulated time-to-first-token. With tools
+    bound, a fresh question gets one tool call first, like a retrieval turn.
+    """
+
+    first_token_ms: float = 120.0
+    token_ms: float = 5.0
+    answer: str = (
+        "RAG retrieves relevant passages and adds them to the prompt "
+        "so the model can answer from them."
+    )
+    tool_name: str | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tool_name": tools[0].name})
+
+    def _reply(self, messages) -> AIMessage:
+        if self.tool_name and isinstance(messages[-1], HumanMessage):
+            call = {
+                "name": self.tool_name,
+                "args": {"query": messages[-1].content},
+                "id": f"call_{random.getrandbits(32):x}",
+            }
+            return AIMessage(content="", tool_calls=[call])
+        return AIMessage(content=self.answer)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep((self.first_token_ms + self.token_ms * 20) / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        chunks = [chunk async for chunk in self._astream(messages, stop, run_manager)]
+        message = chunks[0].message
+        for chunk in chunks[1:]:
+            message = message + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.first_token_ms / 1000)
+        reply = self._reply(messages)
+        if reply.tool_calls:
+            call = reply.tool_calls[0]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": 0,
+                        }
+                    ],
+                )
+            )
+            return
+        for i, word in enumerate(reply.content.split(" ")):
+            if i:
+                await asyncio.sleep(self.token_ms / 1000)
+            token = word if i == 0 else " " + word
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def ask(http: httpx.AsyncClient, url: str, client: str, question: str, mode):
+    """One request, retried on 429/503; returns (first token s, total s, rejections)."""
+    rejections = 0
+    start = time.perf_counter()
+    while True:
+        async with http.stream(
+            "POST",
+            url,
+            json={"question": question, "mode": mode},
+            headers={"X-Client-Id": client},
+        ) as response:
+            if response.status_code in (429, 503):
+                rejections += 1
+                # Honouring Retry-After (1 s) would dominate a short offline run
+                await asyncio.sleep(0.05 + random.random() * 0.05)
+                continue
+            response.raise_for_status()
+            first_token = None
+            async for line in response.aiter_lines():
+                if line == "event: token" and first_token is None:
+                    first_token = time.perf_counter() - start
+                elif line == "event: error":
+                    raise RuntimeError("service returned an error event")
+            return first_token, time.perf_counter() - start, rejections
+
+
+async def run_load(
+    batching: bool,
+    clients: int,
+    requests_per_client: int,
+    client_concurrency: int,
+    mode: str,
+) -> dict[str, Any]:
+    backend = SimulatedEmbeddings(latency_ms=80, max_connections=2)
+    if batching:
+        embedder = EmbeddingCoalescer(backend, max_batch_size=64, max_wait_ms=5)
+    else:
+        # One embedding request per query (still through the coalescer for stats)
+        embedder = EmbeddingCoalescer(backend, max_batch_size=1, max_in_flight=64)
+    vector_store = InMemoryVectorStore.from_documents(docs, backend)
+    backend.calls = 0
+
+    service = RAGService(FakeStreamingModel(), vector_store, embedder)
+    admission = AdmissionControl(max_per_client=4, max_concurrent=32, max_queue=32)
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(service, admission), port=port, log_level="error", lifespan="off"
+        )
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    url = f"http://127.0.0.1:{port}/ask"
+    topics = [
+        "What is RAG?",
+        "When was LangChain created?",
+        "What do vector stores do?",
+    ]
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+    async with httpx.AsyncClient(timeout=60, limits=limits) as http:
+
+        async def one_client(c: int):
+            semaphore = asyncio.Semaphore(client_concurrency)
+
+            async def one_request(r: int):
+                async with semaphore:
+                    question = f"{topics[r % len(topics)]} (client {c}, #{r})"
+                    return await ask(http, url, f"client-{c}", question, mode)
+
+            return await asyncio.gather(
+                *(one_request(r) for r in range(requests_per_client))
+            )
+
+        start = time.perf_counter()
+        per_client = await asyncio.gather(*(one_client(c) for c in range(clients)))
+        wall = time.perf_counter() - start
+
+    server.should_exit = True
+    await server_task
+
+    results = [result for client in per_client for result in client]
+    first_tokens = [r[0] * 1000 for r in results if r[0] is not None]
+    totals = [r[1] * 1000 for r in results]
+    stats = embedder.stats()
+    return {
+        "requests": len(results),
+        "throughput": len(results) / wall,
+        "ttft_p50": float(np.percentile(first_tokens, 50)),
+        "ttft_p95": float(np.percentile(first_tokens, 95)),
+        "total_p50": float(np.percentile(totals, 50)),
+        "total_p95": float(np.percentile(totals, 95)),
+        "rejected_429": admission.rejected_client,
+        "rejected_503": admission.rejected_busy,
+        "embedding_calls": backend.calls,
+        "avg_batch": stats["avg_batch_size"],
+    }
+
+
+def main():
+    clients = int(os.getenv("LOAD_CLIENTS", "20"))
+    requests_per_client = int(os.getenv("LOAD_REQUESTS", "10"))
+    client_concurrency = int(os.getenv("LOAD_CLIENT_CONCURRENCY", "6"))
+    mode = os.getenv("LOAD_MODE", "traditional")
+
+    print(" RAG HTTP Service Load Test (offline)\n")
+    print("=" * 80 + "\n")
+    print(
+        f" {clients} clients x {requests_per_client} requests, up to "
+        f"{client_concurrency} at once per client (limit 4), mode={mode}"
+    )
+    print(
+        " Fake model: 120 ms to first token; "
+        "embeddings: 80 ms round trip, 2 connections\n"
+    )
+
+    runs = {}
+    for label, batching in (("unbatched", False), ("micro-batched", True)):
+        print(f" Running {label}...")
+        runs[label] = asyncio.run(
+            run_load(batching, clients, requests_per_client, client_concurrency, mode)
+        )
+
+    rows = [
+        ("Requests", "requests", "{:.0f}"),
+        ("Throughput (req/s)", "throughput", "{:.1f}"),
+        ("First token p50 (ms)", "ttft_p50", "{:.0f}"),
+        ("First token p95 (ms)", "ttft_p95", "{:.0f}"),
+        ("Total p50 (ms)", "total_p50", "{:.0f}"),
+        ("Total p95 (ms)", "total_p95", "{:.0f}"),
+        ("429 (client limit)", "rejected_429", "{:.0f}"),
+        ("503 (queue full)", "rejected_503", "{:.0f}"),
+        ("Embedding API calls", "embedding_calls", "{:.0f}"),
+        ("Avg batch size", "avg_batch", "{:.1f}"),
+    ]
+    print(f"\n   {'':<24}" + "".join(f"{label:>16}" for label in runs))
+    for label, key, fmt in rows:
+        print(
+            f"   {label:<24}"
+            + "".join(f"{fmt.format(run[key]):>16}" for run in runs.values())
+        )
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Micro-batching turns one embedding call per request into a few")
+    print("   • With a connection-limited embeddings API that also cuts latency")
+    print("   • Per-client limits keep one busy client from starving the others")
+    print("   • A bounded queue sheds load early (503) instead of timing out late")
+
+
+if __name__ == "__main__":
+    main()
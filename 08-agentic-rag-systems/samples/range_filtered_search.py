@@ -0,0 +1,380 @@
+"""
+Sample: Date-Range and Numeric Metadata Indexes
+
+Questions like "what changed since February?" need a time-bounded search.
+With InMemoryVectorStore the only options are a filter function that runs
+on every row, or searching with a large k and dropping results in Python
+(as the source-specific tools in multi_source_rag.py do). Either way the
+whole archive is scanned for a one-week window.
+
+RangeIndexedVectorStore keeps a sorted secondary index for each numeric or
+date metadata field (e.g. `date`, `page`):
+- A range predicate like date >= "2024-02-01" becomes two binary searches
+  that return a contiguous slice of row ids
+- Several predicates are intersected as sorted id arrays
+- Only the surviving rows are scored against the query vector
+
+Query cost is proportional to the size of the window, not the archive.
+
+Run: python 08-agentic-rag-systems/samples/range_filtered_search.py
+"""
+
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from itertools import islice
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+def to_sort_key(value, kind: str) -> float:
+    """Map a metadata value to a number that sorts correctly."""
+    if kind == "date":
+        if isinstance(value, date):
+            return float(value.toordinal())
+        return float(date.fromisoformat(str(value)[:10]).toordinal())
+    return float(value)
+
+
+class SortedFieldIndex:
+    """Row ids sorted by one metadata field, searchable with binary search."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.keys = np.empty(0, dtype=np.float64)
+        self.row_ids = np.empty(0, dtype=np.int64)
+
+    def insert(self, values: list[float | None], first_row: int):
+        """Merge the keys of rows first_row, first_row + 1, ... into the index."""
+        keys = np.array([np.nan if v is None else v for v in values], np.float64)
+        present = np.flatnonzero(~np.isnan(keys))
+        order = present[np.argsort(keys[present], kind="stable")]
+        new_keys = keys[order]
+        # Only the new batch is sorted; equal keys go after the existing rows
+        positions = np.searchsorted(self.keys, new_keys, "right")
+        self.keys = np.insert(self.keys, positions, new_keys)
+        self.row_ids = np.insert(self.row_ids, positions, order + first_row)
+
+    def range(self, low=None, high=None) -> np.ndarray:
+        """Sorted row ids with low <= value <= high (either bound optional)."""
+        start = 0
+        end = len(self.keys)
+        if low is not None:
+            start = np.searchsorted(self.keys, to_sort_key(low, self.kind), "left")
+        if high is not None:
+            end = np.searchsorted(self.keys, to_sort_key(high, self.kind), "right")
+        return np.sort(self.row_ids[start:end])
+
+
+class RangeIndexedVectorStore:
+    def __init__(self, embedding: Embeddings, index_fields: dict[str, str]):
+        """
+        Args:
+            embedding: Embeddings used for documents and queries.
+            index_fields: Metadata fields to index, mapped to "date" or "number".
+        """
+        self.embedding = embedding
+        self.index_fields = index_fields
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.ids: list[str] = []
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
+        self.indexes = {
+            name: SortedFieldIndex(kind) for name, kind in index_fields.items()
+        }
+        self.rows_scored = 0
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: list[Document],
+        embedding: Embeddings,
+        index_fields: dict[str, str],
+    ) -> "RangeIndexedVectorStore":
+        store = cls(embedding, index_fields)
+        store.add_documents(documents)
+        return store
+
+    def add_documents(self, documents: list[Document]) -> list[str]:
+        vectors = np.asarray(
+            self.embedding.embed_documents([d.page_content for d in documents]),
+            dtype=np.float32,
+        )
+        return self.add_vectors(vectors, documents)
+
+    def add_vectors(self, vectors: np.ndarray, documents: list[Document]) -> list[str]:
+        """Add pre-computed vectors (e.g. loaded from disk) with their documents."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+        self.vectors = (
+            vectors if not len(self.ids) else np.vstack([self.vectors, vectors])
+        )
+
+        first_row = len(self.ids)
+        ids = [doc.id or str(uuid.uuid4()) for doc in documents]
+        self.ids.extend(ids)
+        self.texts.extend(doc.page_content for doc in documents)
+        self.metadatas.extend(doc.metadata for doc in documents)
+
+        for name, index in self.indexes.items():
+            index.insert(
+                [
+                    # Rows without a value (missing or None) are left out of the index
+                    (
+                        to_sort_key(doc.metadata[name], index.kind)
+                        if doc.metadata.get(name) is not None
+                        else None
+                    )
+                    for doc in documents
+                ],
+                first_row,
+            )
+        return ids
+
+    def candidate_rows(self, where: dict[str, tuple] | None) -> np.ndarray | None:
+        """Resolve range predicates to sorted row ids (None = no restriction)."""
+        if not where:
+            return None
+        rows = None
+        for name, (low, high) in where.items():
+            if name not in self.indexes:
+                raise ValueError(
+                    f"No range index on '{name}'. Indexed fields: {list(self.indexes)}"
+                )
+            matched = self.indexes[name].range(low, high)
+            rows = matched if rows is None else np.intersect1d(rows, matched, True)
+        return rows
+
+    def similarity_search_by_vector_with_score(
+        self, vector: np.ndarray, k: int = 4, where: dict[str, tuple] | None = None
+    ) -> list[tuple[Document, float]]:
+        rows = self.candidate_rows(where)
+        candidates = self.vectors if rows is None else self.vectors[rows]
+        if not len(candidates):
+            return []
+        self.rows_scored += len(candidates)
+
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = candidates @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            row = int(i if rows is None else rows[i])
+            doc = Document(
+                id=self.ids[row],
+                page_content=self.texts[row],
+                metadata=self.metadatas[row],
+            )
+            results.append((doc, float(scores[i])))
+        return results
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, where: dict[str, tuple] | None = None
+    ) -> list[tuple[Document, float]]:
+        vector = self.embedding.embed_query(query)
+        return self.similarity_search_by_vector_with_score(vector, k, where)
+
+    def similarity_search(
+        self, query: str, k: int = 4, where: dict[str, tuple] | None = None
+    ) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, where)]
+
+
+documents = [
+    Document(
+        page_content="LangChain simplifies building AI applications with modular components",
+        metadata={"source_type": "text", "source": "article.txt", "date": "2024-01-15"},
+    ),
+    Document(
+        page_content="Vector databases store embeddings for semantic search capabilities",
+        metadata={"source_type": "text", "source": "notes.txt", "date": "2024-01-20"},
+    ),
+    Document(
+        page_content="# Getting Started\n\nInstall LangChain using pip install langchain",
+        metadata={
+            "source_type": "markdown",
+            "source": "README.md",
+            "date": "2024-02-01",
+        },
+    ),
+    Document(
+        page_content="## Best Practices\n\nAlways validate user input before processing",
+        metadata={
+            "source_type": "markdown",
+            "source": "GUIDE.md",
+            "date": "2024-02-05",
+        },
+    ),
+    Document(
+        page_content="LangChain provides Python and JavaScript libraries for building LLM applications",
+        metadata={
+            "source_type": "web",
+            "source": "https://python.langchain.com",
+            "date": "2024-02-10",
+        },
+    ),
+    Document(
+        page_content="RAG combines retrieval with generation for accurate AI responses",
+        metadata={
+            "source_type": "web",
+            "source": "https://docs.langchain.com/rag",
+            "date": "2024-02-15",
+        },
+    ),
+    Document(
+        page_content="LangChain agents decide which tools to call based on the question",
+        # Undated: found by plain searches, never by a date-range search
+        metadata={"source_type": "text", "source": "scratch.txt", "date": None},
+    ),
+]
+
+
+def archive_benchmark(years: int = 5, docs_per_day: int = 200, dim: int = 256):
+    """Time a one-week window over a multi-year archive (synthetic vectors)."""
+    rng = np.random.default_rng(42)
+    days = years * 365
+    first_day = date(2020, 1, 1)
+    rows = days * docs_per_day
+
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    docs = [
+        Document(
+            page_content=f"doc {i}",
+            metadata={
+                "date": (first_day + timedelta(days=i // docs_per_day)).isoformat()
+            },
+        )
+        for i in range(rows)
+    ]
+    store = RangeIndexedVectorStore(embedding=None, index_fields={"date": "date"})
+    store.add_vectors(vectors, docs)
+
+    query = rng.standard_normal(dim).astype(np.float32)
+    since = (first_day + timedelta(days=days - 7)).isoformat()
+    cutoff = date.fromisoformat(since).toordinal()
+
+    start = time.perf_counter()
+    for _ in range(20):
+        indexed = store.similarity_search_by_vector_with_score(
+            query, k=5, where={"date": (since, None)}
+        )
+    indexed_ms = (time.perf_counter() - start) * 1000 / 20
+
+    # Baseline: score the whole archive, then post-filter by date in Python
+    start = time.perf_counter()
+    for _ in range(20):
+        scores = store.vectors @ (query / np.linalg.norm(query))
+        order = np.argsort(-scores)
+        post = list(
+            islice(
+                (
+                    i
+                    for i in order
+                    if to_sort_key(store.metadatas[i]["date"], "date") >= cutoff
+                ),
+                5,
+            )
+        )
+    full_ms = (time.perf_counter() - start) * 1000 / 20
+
+    assert [d.page_content for d, _ in indexed] == [f"doc {i}" for i in post]
+    print(f"   Archive: {rows:,} rows over {years} years, window: last 7 days")
+    print(f"   Range index + scan of window: {indexed_ms:8.2f} ms/query")
+    print(f"   Full scan + post-filter:      {full_ms:8.2f} ms/query")
+
+
+def main():
+    print(" Range-Indexed Vector Store\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    vector_store = RangeIndexedVectorStore.from_documents(
+        documents, embeddings, index_fields={"date": "date"}
+    )
+
+    print(' Query: "LangChain" with date >= 2024-02-01\n')
+    for doc in vector_store.similarity_search(
+        "LangChain", k=3, where={"date": ("2024-02-01", None)}
+    ):
+        print(f"   {doc.metadata['date']}  {doc.metadata['source']}")
+    print()
+
+    @tool
+    def search_documents(query: str, since: str = "", until: str = "") -> str:
+        """Search all document sources. Optionally restrict to a date range with since/until as YYYY-MM-DD. Use the date range when the user asks about recent or time-bounded information."""
+        where = {"date": (since or None, until or None)} if since or until else None
+        print(f'    search "{query}" since={since or "-"} until={until or "-"}')
+        try:
+            results = vector_store.similarity_search(query, k=3, where=where)
+        except ValueError as e:
+            return f"Error: {e}. Use dates in YYYY-MM-DD format."
+        if not results:
+            return "No documents found in that date range."
+        return "\n\n".join(
+            f"[{i + 1}] {doc.metadata['source']} ({doc.metadata['date']})\n"
+            f"Content: {doc.page_content}"
+            for i, doc in enumerate(results)
+        )
+
+    agent = create_agent(
+        model,
+        tools=[search_documents],
+        system_prompt="You are a helpful assistant with access to dated documents. Use the search tool, with a date range when the question is time-bounded.",
+    )
+
+    question = "What was published about LangChain since February 5th, 2024?"
+    print("=" * 80)
+    print(f"\n Question: {question}\n")
+    response = agent.invoke({"messages": [HumanMessage(content=question)]})
+    print(" Answer:", response["messages"][-1].content)
+
+    print("\n" + "=" * 80 + "\n")
+    print(" Recency-bounded search over a large archive (offline):\n")
+    archive_benchmark()
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Sorted indexes turn range predicates into two binary searches")
+    print("   • Only rows inside the window are scored against the query")
+    print("   • Multiple ranges (date AND page) intersect as sorted id arrays")
+    print("   • Cost follows the window size, not the archive size")
+
+
+if __name__ == "__main__":
+    main()
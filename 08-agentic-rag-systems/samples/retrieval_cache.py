@@ -0,0 +1,305 @@
+"""
+Sample: Versioned Retrieval Cache at the Tool Layer
+
+Inside one agent loop, and across users, search_my_notes and
+search_python_knowledge_base are called with the same queries again and
+again - often differing only in case, spacing or a trailing "?". Each call
+embeds the query (an HTTP round trip) and scans the whole store.
+
+RetrievalCache memoizes the tool's search (one cache per store, so two
+tools over different stores never share entries):
+- Key = (normalized query, k, filter) - "What is Python?" and
+  "what is python" share one entry
+- Bounded LRU, so memory stays fixed no matter how many queries arrive
+- Every entry belongs to the store's generation number. GenerationalVectorStore
+  bumps the generation on every add or delete, and the cache drops all
+  entries from older generations - no stale results, no manual invalidation
+- Hit rate and hit/miss latency are tracked for monitoring
+
+Run: python 08-agentic-rag-systems/samples/retrieval_cache.py
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+class GenerationalVectorStore(InMemoryVectorStore):
+    """InMemoryVectorStore with a counter that changes on every mutation."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generation = 0
+
+    def add_documents(self, documents: list[Document], ids=None, **kwargs):
+        result = super().add_documents(documents, ids=ids, **kwargs)
+        self.generation += 1
+        return result
+
+    async def aadd_documents(self, documents: list[Document], ids=None, **kwargs):
+        result = await super().aadd_documents(documents, ids=ids, **kwargs)
+        self.generation += 1
+        return result
+
+    def delete(self, ids=None, **kwargs):
+        super().delete(ids, **kwargs)
+        self.generation += 1
+
+    async def adelete(self, ids=None, **kwargs):
+        await super().adelete(ids, **kwargs)
+        self.generation += 1
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", query.casefold()).strip().rstrip("?!.").strip()
+
+
+class RetrievalCache:
+    def __init__(self, store: GenerationalVectorStore, maxsize: int = 1024):
+        self.store = store
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[Document, ...]] = OrderedDict()
+        self._generation: int | None = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: dict[str, Any] | None = None,  # noqa: A002
+    ) -> list[Document]:
+        """store.similarity_search with metadata-equality filter, memoized."""
+        start = time.perf_counter()
+        store = self.store
+        filter_key = json.dumps(filter, sort_keys=True, default=str) if filter else ""
+        normalized = normalize_query(query)
+        key = (normalized, k, filter_key)
+
+        with self._lock:
+            if store.generation != self._generation:
+                # The store changed: everything cached so far may be stale
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._generation = store.generation
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.hit_seconds += time.perf_counter() - start
+                return list(cached)
+            generation = self._generation
+
+        predicate = None
+        if filter:
+            predicate = lambda doc: all(  # noqa: E731
+                doc.metadata.get(name) == value for name, value in filter.items()
+            )
+        # Search with the key's query, so every query sharing the key gets one result
+        results = store.similarity_search(normalized, k=k, filter=predicate)
+
+        with self._lock:
+            # Don't cache a result computed against a store that changed meanwhile
+            if store.generation == generation == self._generation:
+                self._entries[key] = tuple(results)
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            self.misses += 1
+            self.miss_seconds += time.perf_counter() - start
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations,
+                "avg_hit_us": (
+                    self.hit_seconds / self.hits * 1e6 if self.hits else 0.0
+                ),
+                "avg_miss_ms": (
+                    self.miss_seconds / self.misses * 1000 if self.misses else 0.0
+                ),
+            }
+
+
+class SlowFakeEmbedding(DeterministicFakeEmbedding):
+    """Offline embeddings with a simulated network round trip per query."""
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(0.03)
+        return super().embed_query(text)
+
+
+knowledge_base = [
+    Document(
+        page_content="Python is a high-level, interpreted programming language known for its readability and simplicity. It was created by Guido van Rossum and first released in 1991.",
+        metadata={"title": "Python Overview", "section": "Introduction"},
+    ),
+    Document(
+        page_content="Python's main benefits include easy-to-read syntax, extensive standard library, cross-platform compatibility, and strong community support.",
+        metadata={"title": "Python Benefits", "section": "Advantages"},
+    ),
+    Document(
+        page_content="Python decorators are a powerful feature that allows you to modify or enhance functions and classes. Common decorators include @property, @staticmethod, and @classmethod.",
+        metadata={"title": "Python Decorators", "section": "Advanced Features"},
+    ),
+    Document(
+        page_content="Python's list comprehensions provide a concise way to create lists based on existing sequences. They're often faster than traditional for loops.",
+        metadata={"title": "List Comprehensions", "section": "Core Features"},
+    ),
+]
+
+
+def offline_demo():
+    store = GenerationalVectorStore(SlowFakeEmbedding(size=256))
+    store.add_documents(knowledge_base)
+    cache = RetrievalCache(store, maxsize=256)
+
+    # What many agent loops actually send: the same few queries, lightly varied
+    queries = [
+        "What is Python?",
+        "what is python",
+        "Python decorators",
+        "python  decorators?",
+        "What is Python?",
+        "list comprehensions",
+        "Python decorators",
+    ] * 20
+
+    for query in queries:
+        cache.similarity_search(query, k=2)
+    stats = cache.stats()
+    print(f"   {len(queries)} tool calls, {stats['misses']} reached the vector store")
+    print(f"   Hit rate: {stats['hit_rate']:.0%}")
+    print(f"   Average hit:  {stats['avg_hit_us']:.1f} µs")
+    print(f"   Average miss: {stats['avg_miss_ms']:.1f} ms")
+
+    store.add_documents(
+        [
+            Document(
+                page_content="Python 3.12 improved error messages and f-string parsing.",
+                metadata={"title": "Python 3.12", "section": "Releases"},
+            )
+        ]
+    )
+    cache.similarity_search("What is Python?", k=2)
+    print(
+        f"\n   After add_documents: generation {store.generation}, "
+        f"{cache.stats()['invalidations']} invalidation(s), cache rebuilt from scratch"
+    )
+
+
+def main():
+    print(" Versioned Retrieval Cache\n")
+    print("=" * 80 + "\n")
+
+    print(" Offline: repeated tool calls with a 30 ms embedding round trip\n")
+    offline_demo()
+
+    print("\n" + "=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    vector_store = GenerationalVectorStore(embeddings)
+    vector_store.add_documents(knowledge_base)
+    cache = RetrievalCache(vector_store, maxsize=1024)
+
+    @tool
+    def search_python_knowledge_base(query: str) -> str:
+        """Search the Python knowledge base for information about Python features, benefits, decorators, and list comprehensions. Use this when you need specific information about Python from the documentation."""
+        before = cache.hits
+        results = cache.similarity_search(query, k=2)
+        print(
+            f'    Agent searching for: "{query}"'
+            f" ({'cache hit' if cache.hits > before else 'vector store'})"
+        )
+
+        if not results:
+            return "No relevant Python documentation found."
+
+        return "\n\n".join(
+            f"[{doc.metadata['title']}]: {doc.page_content}" for doc in results
+        )
+
+    agent = create_agent(
+        model,
+        tools=[search_python_knowledge_base],
+        system_prompt="You are a helpful Python expert assistant with access to Python documentation. Always use the search tool for questions about Python.",
+    )
+
+    # Different users asking overlapping questions
+    questions = [
+        "What is Python?",
+        "what is python?",
+        "What are Python decorators?",
+        "Tell me about Python decorators",
+    ]
+
+    for question in questions:
+        print(f" Question: {question}")
+        response = agent.invoke({"messages": [HumanMessage(content=question)]})
+        print(f" Answer: {response['messages'][-1].content[:120]}...\n")
+
+    stats = cache.stats()
+    print(
+        f" Tool-layer cache: {stats['hits']} hits / {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate)"
+    )
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • A cache hit skips the embedding round trip and the store scan")
+    print("   • Normalizing the query turns trivial variations into hits")
+    print("   • Keying on the store generation makes invalidation automatic")
+    print("   • The LRU bound keeps memory fixed under unbounded query traffic")
+
+
+if __name__ == "__main__":
+    main()
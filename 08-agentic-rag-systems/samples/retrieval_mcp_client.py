@@ -0,0 +1,120 @@
+"""
+Sample: Agentic RAG over the Retrieval MCP Server
+
+02_agentic_rag.py embeds its documents before it can answer anything.
+Here the agent owns no index at all: its search tools come from
+retrieval_mcp_server.py through MultiServerMCPClient, so agent startup is
+just "list the server's tools".
+
+- Set RETRIEVAL_MCP_URL (e.g. http://localhost:3001/mcp) to share one
+  running server between many agents over streamable HTTP
+- Without it the server is started as a stdio subprocess; it loads the
+  persisted index (building it only on the very first run)
+- The client holds one session open for the whole run. client.get_tools()
+  alone opens a new session per tool call, which over stdio means a new
+  server process each time
+- Several agents then query the same server concurrently
+
+Run: python 08-agentic-rag-systems/samples/retrieval_mcp_client.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from langchain_openai import ChatOpenAI
+
+load_dotenv()
+
+SCRIPT_DIR = Path(__file__).parent
+
+
+def server_config() -> dict:
+    url = os.getenv("RETRIEVAL_MCP_URL")
+    if url:
+        return {"transport": "streamable_http", "url": url}
+    return {
+        "transport": "stdio",
+        "command": sys.executable,
+        "args": [str(SCRIPT_DIR / "retrieval_mcp_server.py"), "stdio"],
+        # The subprocess needs the same AI_* settings to embed queries
+        "env": dict(os.environ),
+    }
+
+
+async def main():
+    print(" Agentic RAG over a Retrieval MCP Server\n")
+    print("=" * 80 + "\n")
+
+    client = MultiServerMCPClient({"retrieval": server_config()})
+
+    # 1. Startup: no documents to embed, only the tool list to fetch
+    start = time.perf_counter()
+    async with client.session("retrieval") as session:
+        tools = await load_mcp_tools(session)
+        print(f" Connected in {(time.perf_counter() - start) * 1000:.0f} ms")
+        for tool in tools:
+            summary = " ".join(tool.description.split())[:60]
+            print(f"   • {tool.name}: {summary}...")
+        print()
+
+        model = ChatOpenAI(
+            model=os.getenv("AI_MODEL"),
+            base_url=os.getenv("AI_ENDPOINT"),
+            api_key=os.getenv("AI_API_KEY"),
+        )
+
+        agent = create_agent(
+            model,
+            tools,
+            system_prompt="You are a helpful assistant with access to LangChain documentation through search tools. Use them when you need specific information about LangChain, RAG, or vector stores; use search_batch to look up several things at once. For general knowledge questions, answer directly without searching.",
+        )
+
+        questions = [
+            "What is the capital of France?",
+            "When was LangChain created?",
+            "What is RAG and why is it useful?",
+            "Compare vector stores and text splitters: what does each do?",
+        ]
+
+        # 2. Several agents (one per question) share the server concurrently
+        async def ask(question: str) -> tuple[str, str, float]:
+            start = time.perf_counter()
+            response = await agent.ainvoke({"messages": [("human", question)]})
+            used = [
+                call["name"]
+                for message in response["messages"]
+                for call in getattr(message, "tool_calls", None) or []
+            ]
+            elapsed = time.perf_counter() - start
+            return response["messages"][-1].content, ", ".join(used) or "none", elapsed
+
+        start = time.perf_counter()
+        answers = await asyncio.gather(*(ask(q) for q in questions))
+        total = time.perf_counter() - start
+
+        for question, (answer, used, elapsed) in zip(questions, answers):
+            print("=" * 80)
+            print(f"\n Question: {question}")
+            print(f"   Tools: {used} | {elapsed:.1f}s")
+            print(f" Answer: {answer[:200]}\n")
+
+        print("=" * 80)
+        print(f"\n {len(questions)} concurrent agents answered in {total:.1f}s")
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • The index is built once and loaded from disk, not rebuilt per agent")
+    print("   • Agents start by listing tools - no embedding calls at startup")
+    print("   • One HTTP server can serve many agents and processes at once")
+    print("   • search_batch embeds several queries in a single request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
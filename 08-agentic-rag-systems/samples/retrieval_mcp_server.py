@@ -0,0 +1,211 @@
+"""
+Sample: Retrieval MCP Server (Load the Index Once, Serve Many Agents)
+
+Every script in this chapter embeds its documents into a fresh
+InMemoryVectorStore at startup - one embedding call per document, every
+time, for every agent process. This server turns retrieval into a
+long-lived service instead:
+
+- The index is built once and persisted with InMemoryVectorStore.dump();
+  later starts just load() the file (no document embedding at all). A
+  sidecar file records the embedding model and a hash of the documents,
+  and the index is rebuilt when either changes
+- Three MCP tools: search, search_batch (all queries embedded in one call)
+  and filtered_search (metadata equality filter)
+- Tools are async, so concurrent clients don't wait on each other while
+  their queries are being embedded
+- Serves streamable HTTP (default) or stdio; agents connect through
+  MultiServerMCPClient - see retrieval_mcp_client.py
+
+Run: python 08-agentic-rag-systems/samples/retrieval_mcp_server.py [stdio]
+
+Then connect to it at: http://localhost:3001/mcp
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings
+from mcp.server.fastmcp import FastMCP
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+INDEX_PATH = Path(os.getenv("RAG_INDEX_PATH", Path(__file__).parent / "rag_index.json"))
+MAX_K = 10
+
+docs = [
+    Document(
+        page_content="LangChain was created in 2022 and quickly became popular for building LLM applications. The Python version was first, followed by LangChain.js for JavaScript/TypeScript.",
+        metadata={"source": "langchain-history", "topic": "introduction"},
+    ),
+    Document(
+        page_content="RAG (Retrieval Augmented Generation) combines document retrieval with LLM generation. It allows models to access external knowledge without retraining, making responses more accurate and up-to-date.",
+        metadata={"source": "rag-explanation", "topic": "concepts"},
+    ),
+    Document(
+        page_content="Vector stores like Pinecone, Weaviate, and Chroma enable semantic search over documents. They store embeddings and perform fast similarity searches to find relevant content.",
+        metadata={"source": "vector-stores", "topic": "infrastructure"},
+    ),
+    Document(
+        page_content="LangChain supports multiple document loaders for PDFs, web pages, databases, and APIs. Text splitters help break large documents into chunks that fit within LLM context windows while preserving semantic meaning.",
+        metadata={"source": "document-processing", "topic": "development"},
+    ),
+]
+
+
+def log(message: str):
+    # stdout belongs to the MCP protocol when running over stdio
+    print(message, file=sys.stderr)
+
+
+def index_meta(model_name: str) -> dict:
+    """What the persisted index was built from: model and document contents."""
+    contents = json.dumps(
+        [[doc.page_content, doc.metadata] for doc in docs], sort_keys=True
+    )
+    return {
+        "embedding_model": model_name,
+        "docs_sha256": hashlib.sha256(contents.encode("utf-8")).hexdigest(),
+    }
+
+
+def load_index(
+    embeddings, model_name: str, path: Path = INDEX_PATH
+) -> InMemoryVectorStore:
+    """Load the persisted index; rebuild it if it is missing or out of date."""
+    start = time.perf_counter()
+    meta_path = path.with_suffix(".meta.json")
+    meta = index_meta(model_name)
+    saved_meta = None
+    if path.exists() and meta_path.exists():
+        saved_meta = json.loads(meta_path.read_text(encoding="utf-8"))
+
+    if saved_meta == meta:
+        store = InMemoryVectorStore.load(str(path), embeddings)
+        log(f" Loaded {len(store.store)} documents from {path}")
+    else:
+        if saved_meta is not None:
+            log(" Embedding model or documents changed, rebuilding the index")
+        store = InMemoryVectorStore.from_documents(docs, embeddings)
+        store.dump(str(path))
+        meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        log(f" Built and saved {len(store.store)} documents to {path}")
+    log(f"   ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    return store
+
+
+def format_results(results: list[Document]) -> str:
+    if not results:
+        return "No relevant documents found."
+    return "\n\n".join(
+        f"[{doc.metadata['source']}]: {doc.page_content}" for doc in results
+    )
+
+
+# Create MCP server with retrieval tools
+mcp = FastMCP("rag-retrieval", port=int(os.getenv("PORT", "3001")))
+vector_store: InMemoryVectorStore | None = None  # set once in __main__
+
+
+@mcp.tool()
+async def search(query: str, k: int = 2) -> str:
+    """
+    Search the LangChain knowledge base (LangChain, RAG systems, vector stores,
+    document processing) for passages relevant to a query.
+
+    Args:
+        query: What to search for
+        k: Number of passages to return (1-10)
+
+    Returns:
+        The matching passages, each prefixed with its [source].
+    """
+    results = await vector_store.asimilarity_search(query, k=min(max(k, 1), MAX_K))
+    return format_results(results)
+
+
+@mcp.tool()
+async def search_batch(queries: list[str], k: int = 2) -> str:
+    """
+    Search the knowledge base for several queries at once. Faster than
+    calling search repeatedly: all queries are embedded in a single request.
+
+    Args:
+        queries: The queries to search for
+        k: Number of passages to return per query (1-10)
+
+    Returns:
+        One block of passages per query, headed by the query.
+    """
+    if not queries:
+        return "No queries given."
+    vectors = await vector_store.embedding.aembed_documents(queries)
+    k = min(max(k, 1), MAX_K)
+    blocks = []
+    for query, vector in zip(queries, vectors):
+        results = vector_store.similarity_search_by_vector(vector, k=k)
+        blocks.append(f"## {query}\n{format_results(results)}")
+    return "\n\n".join(blocks)
+
+
+@mcp.tool()
+async def filtered_search(query: str, metadata: dict[str, str], k: int = 2) -> str:
+    """
+    Search only documents whose metadata matches every given field, e.g.
+    {"topic": "concepts"} or {"source": "vector-stores"}.
+
+    Args:
+        query: What to search for
+        metadata: Field/value pairs a document must match exactly
+        k: Number of passages to return (1-10)
+
+    Returns:
+        The matching passages, each prefixed with its [source].
+    """
+    results = await vector_store.asimilarity_search(
+        query,
+        k=min(max(k, 1), MAX_K),
+        filter=lambda doc: all(
+            field in doc.metadata and str(doc.metadata[field]) == value
+            for field, value in metadata.items()
+        ),
+    )
+    return format_results(results)
+
+
+if __name__ == "__main__":
+    transport = "stdio" if "stdio" in sys.argv[1:] else "streamable-http"
+
+    embedding_model = os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002")
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=embedding_model,
+        api_version="2024-02-01",
+    )
+    vector_store = load_index(embeddings, embedding_model)
+
+    log(f" MCP Retrieval Server ({transport})")
+    if transport == "streamable-http":
+        log(f" MCP endpoint: http://localhost:{mcp.settings.port}/mcp")
+        log("  Press Ctrl+C to stop the server")
+
+    mcp.run(transport=transport)
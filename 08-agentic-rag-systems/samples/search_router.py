@@ -0,0 +1,324 @@
+"""
+Sample: Local Search-or-Answer Router
+
+01a_traditional_rag.py searches for every question, even "What is the
+capital of France?". 02_agentic_rag.py fixes that, but the agent spends a
+whole model call deciding whether to call the search tool - and when it
+does search, a second call to write the answer.
+
+The agent's decisions are predictable, so we can learn them locally:
+- Every agent run is logged as (question, did it search?)
+- A logistic-regression classifier over question embeddings is trained on
+  that log with plain NumPy - a few milliseconds, no extra dependencies
+- At query time the question is embedded once. A confident "search" routes
+  straight to retrieval + one model call (the same embedding is reused for
+  the vector search); a confident "no search" answers with one model call
+- Only questions the router is unsure about fall back to the full agent
+
+Run: python 08-agentic-rag-systems/samples/search_router.py
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+def agent_searched(messages: list) -> bool:
+    """Did this agent run call a tool? (The label we learn from.)"""
+    return any(isinstance(m, AIMessage) and m.tool_calls for m in messages)
+
+
+def log_decision(path: str, question: str, searched: bool):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"question": question, "searched": searched}) + "\n")
+
+
+def load_decisions(path: str) -> list[tuple[str, bool]]:
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [(row["question"], row["searched"]) for row in rows]
+
+
+@dataclass
+class RouteDecision:
+    route: str  # "retrieve", "direct" or "agent"
+    probability: float  # estimated probability that the agent would search
+
+
+class SearchRouter:
+    """Logistic regression over question embeddings, trained with NumPy."""
+
+    def __init__(self, embedding: Embeddings, low: float = 0.2, high: float = 0.8):
+        self.embedding = embedding
+        self.low = low
+        self.high = high
+        self.weights: np.ndarray | None = None
+        self.bias = 0.0
+        self.mean: np.ndarray | None = None
+        self.scale = 1.0
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.asarray(self.embedding.embed_documents(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def fit(
+        self,
+        vectors: np.ndarray,
+        labels: np.ndarray,
+        epochs: int = 500,
+        learning_rate: float = 2.0,
+        l2: float = 1e-3,
+    ) -> "SearchRouter":
+        """Full-batch gradient descent on the log loss."""
+        labels = labels.astype(np.float32)
+        # All embeddings share a large common component; centering removes it so
+        # the small differences between "search" and "no search" questions dominate
+        self.mean = vectors.mean(axis=0)
+        self.scale = float(np.linalg.norm(vectors - self.mean, axis=1).mean()) or 1.0
+        vectors = self._features(vectors)
+        self.weights = np.zeros(vectors.shape[1], dtype=np.float32)
+        # Start from the base rate so an untrained direction means "unsure"
+        rate = float(np.clip(labels.mean(), 1e-3, 1 - 1e-3))
+        self.bias = float(np.log(rate / (1 - rate)))
+
+        for _ in range(epochs):
+            error = self._sigmoid(vectors @ self.weights + self.bias) - labels
+            self.weights -= learning_rate * (
+                vectors.T @ error / len(labels) + l2 * self.weights
+            )
+            self.bias -= learning_rate * float(error.mean())
+        return self
+
+    def _features(self, vectors: np.ndarray) -> np.ndarray:
+        return (vectors - self.mean) / self.scale
+
+    @staticmethod
+    def _sigmoid(x: np.ndarray) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-x))
+
+    def predict_proba(self, vectors: np.ndarray) -> np.ndarray:
+        return self._sigmoid(self._features(vectors) @ self.weights + self.bias)
+
+    def route(self, vector: np.ndarray) -> RouteDecision:
+        p = float(self.predict_proba(vector[None, :])[0])
+        if p >= self.high:
+            return RouteDecision("retrieve", p)
+        if p <= self.low:
+            return RouteDecision("direct", p)
+        return RouteDecision("agent", p)
+
+
+def evaluate(router: SearchRouter, vectors: np.ndarray, labels: np.ndarray):
+    """Accuracy on confident predictions and how often we fall back."""
+    decisions = [router.route(v) for v in vectors]
+    confident = [
+        (d.route == "retrieve") == bool(label)
+        for d, label in zip(decisions, labels)
+        if d.route != "agent"
+    ]
+    fallback = sum(d.route == "agent" for d in decisions) / len(decisions)
+    accuracy = sum(confident) / len(confident) if confident else 0.0
+    return accuracy, fallback
+
+
+# A decision log, as collected with log_decision() from earlier agent runs
+logged_decisions = [
+    ("What is the capital of France?", False),
+    ("What is 2 + 2?", False),
+    ("Who wrote Romeo and Juliet?", False),
+    ("How many days are in a leap year?", False),
+    ("What is the boiling point of water?", False),
+    ("Translate 'hello' into Spanish", False),
+    ("What is the largest planet in the solar system?", False),
+    ("Tell me a joke", False),
+    ("What year did World War II end?", False),
+    ("What's the square root of 144?", False),
+    ("Who painted the Mona Lisa?", False),
+    ("What color is the sky?", False),
+    ("When was LangChain created?", True),
+    ("What is RAG and why is it useful?", True),
+    ("Which vector stores does LangChain support?", True),
+    ("How do text splitters work in LangChain?", True),
+    ("What document loaders are available?", True),
+    ("Was the Python version of LangChain released first?", True),
+    ("How does retrieval augmented generation avoid retraining?", True),
+    ("What do vector stores like Chroma do?", True),
+    ("How should I chunk documents for an LLM context window?", True),
+    ("Can LangChain load PDFs and web pages?", True),
+    ("What does semantic search over embeddings mean?", True),
+    ("Why does RAG make answers more up to date?", True),
+]
+
+
+docs = [
+    Document(
+        page_content="LangChain was created in 2022 and quickly became popular for building LLM applications. The Python version was first, followed by LangChain.js for JavaScript/TypeScript.",
+        metadata={"source": "langchain-history", "topic": "introduction"},
+    ),
+    Document(
+        page_content="RAG (Retrieval Augmented Generation) combines document retrieval with LLM generation. It allows models to access external knowledge without retraining, making responses more accurate and up-to-date.",
+        metadata={"source": "rag-explanation", "topic": "concepts"},
+    ),
+    Document(
+        page_content="Vector stores like Pinecone, Weaviate, and Chroma enable semantic search over documents. They store embeddings and perform fast similarity searches to find relevant content.",
+        metadata={"source": "vector-stores", "topic": "infrastructure"},
+    ),
+    Document(
+        page_content="LangChain supports multiple document loaders for PDFs, web pages, databases, and APIs. Text splitters help break large documents into chunks that fit within LLM context windows while preserving semantic meaning.",
+        metadata={"source": "document-processing", "topic": "development"},
+    ),
+]
+
+
+def main():
+    print(" Local Search-or-Answer Router\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    vector_store = InMemoryVectorStore.from_documents(docs, embeddings)
+
+    @tool
+    def search_langchain_docs(query: str) -> str:
+        """Search LangChain documentation for specific information about LangChain, RAG systems, vector stores, and document processing. Use this when you need factual information from the LangChain knowledge base."""
+        results = vector_store.similarity_search(query, k=2)
+        return "\n\n".join(
+            f"[{doc.metadata['source']}]: {doc.page_content}" for doc in results
+        )
+
+    agent = create_agent(
+        model,
+        tools=[search_langchain_docs],
+        system_prompt="You are a helpful assistant with access to LangChain documentation. Use the search tool when you need specific information about LangChain, RAG, or vector stores. For general knowledge questions, answer directly without searching.",
+    )
+
+    # 1. Train on the decision log (hold out every 4th example for evaluation)
+    decision_log = os.getenv("ROUTER_LOG")
+    # The log only exists after the first logged run; start from the sample log
+    if decision_log and os.path.exists(decision_log):
+        decisions = load_decisions(decision_log)
+    else:
+        decisions = logged_decisions
+    router = SearchRouter(embeddings)
+    vectors = router.embed([question for question, _ in decisions])
+    labels = np.array([searched for _, searched in decisions])
+    test = np.arange(len(decisions)) % 4 == 0
+
+    start = time.perf_counter()
+    router.fit(vectors[~test], labels[~test])
+    train_ms = (time.perf_counter() - start) * 1000
+    accuracy, fallback = evaluate(router, vectors[test], labels[test])
+    print(f" Trained on {int((~test).sum())} logged decisions in {train_ms:.1f} ms")
+    print(
+        f"   Held-out: {accuracy:.0%} agreement with the agent, "
+        f"{fallback:.0%} sent to the agent fallback\n"
+    )
+    router.fit(vectors, labels)
+
+    # 2. Route new questions
+    def answer(question: str) -> tuple[str, RouteDecision, int]:
+        """Returns (answer, decision, model calls used)."""
+        vector = router.embed([question])[0]
+        decision = router.route(vector)
+
+        if decision.route == "retrieve":
+            # Reuse the routing embedding for the search - no second embed call
+            results = vector_store.similarity_search_by_vector(vector.tolist(), k=2)
+            context = "\n\n".join(doc.page_content for doc in results)
+            response = model.invoke(
+                [
+                    SystemMessage(
+                        content="You are a helpful assistant. Answer the question using the provided context."
+                    ),
+                    HumanMessage(
+                        content=f"Context:\n{context}\n\nQuestion: {question}"
+                    ),
+                ]
+            )
+            return response.content, decision, 1
+
+        if decision.route == "direct":
+            response = model.invoke([HumanMessage(content=question)])
+            return response.content, decision, 1
+
+        # Unsure: let the agent decide, and log the outcome for the next training run
+        result = agent.invoke({"messages": [HumanMessage(content=question)]})
+        messages = result["messages"]
+        if decision_log:
+            log_decision(decision_log, question, agent_searched(messages))
+        calls = sum(isinstance(m, AIMessage) for m in messages)
+        return messages[-1].content, decision, calls
+
+    questions = [
+        "What is the capital of Italy?",
+        "When did LangChain first come out?",
+        "What are vector stores used for?",
+        "How tall is Mount Everest?",
+        "Does LangChain support loading databases?",
+    ]
+
+    total_calls = 0
+    for question in questions:
+        print("=" * 80)
+        print(f"\n Question: {question}")
+        start = time.perf_counter()
+        text, decision, calls = answer(question)
+        elapsed = time.perf_counter() - start
+        total_calls += calls
+        print(
+            f"   Route: {decision.route} (p(search)={decision.probability:.2f}), "
+            f"{calls} model call(s), {elapsed:.1f}s"
+        )
+        print(f" Answer: {text[:150]}\n")
+
+    print("=" * 80)
+    print(
+        f"\n {total_calls} model calls for {len(questions)} questions "
+        f"(the agent needs 1 per direct answer and 2 per search)"
+    )
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • The agent's search decision is learnable from its own logs")
+    print("   • A local classifier decides in microseconds instead of a model call")
+    print("   • The routing embedding doubles as the retrieval query vector")
+    print("   • Low-confidence questions still get the agent - and become new labels")
+
+
+if __name__ == "__main__":
+    main()
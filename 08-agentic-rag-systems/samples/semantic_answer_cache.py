@@ -0,0 +1,330 @@
+"""
+Sample: Semantic Answer Cache in Front of an Agentic RAG Agent
+
+FAQ-style traffic asks the same few questions over and over, in slightly
+different words. Every time, the agent of 02_agentic_rag.py pays for a model
+call to decide to search, a retrieval, and a second model call to answer.
+
+SemanticAnswerCache sits in front of agent.invoke:
+- Embeds the incoming question (one cheap embedding call)
+- Compares it with every cached question in a single matrix-vector product
+- Above the similarity threshold, returns the stored answer and citations
+  without calling the model at all
+- Tags every entry with the knowledge base version; when documents are
+  added or removed the version changes and older answers stop matching
+- Bounded size with least-recently-used eviction
+
+Tune the threshold on your own traffic: too low and "What is Python?" can
+answer "What is Java?"; too high and paraphrases miss.
+
+Run: python 08-agentic-rag-systems/samples/semantic_answer_cache.py
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+class VersionedKnowledgeBase:
+    """A vector store whose version number changes on every mutation."""
+
+    def __init__(self, embedding: Embeddings, documents: list[Document]):
+        self.vector_store = InMemoryVectorStore.from_documents(documents, embedding)
+        self.version = 1
+
+    def add_documents(self, documents: list[Document]) -> list[str]:
+        ids = self.vector_store.add_documents(documents)
+        self.version += 1
+        return ids
+
+    def delete(self, ids: list[str]):
+        self.vector_store.delete(ids)
+        self.version += 1
+
+
+@dataclass
+class CacheEntry:
+    question: str
+    answer: str
+    citations: list[str]
+    kb_version: int
+    model_calls: int
+    last_used: float = field(default_factory=time.monotonic)
+    hits: int = 0
+
+
+class SemanticAnswerCache:
+    def __init__(
+        self,
+        embedding: Embeddings,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+    ):
+        self.embedding = embedding
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.entries: list[CacheEntry] = []
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        # Newest knowledge base version seen; older answers are never stored
+        self.kb_version = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.model_calls_saved = 0
+
+    def embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embedding.embed_query(question), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def lookup(
+        self, vector: np.ndarray, kb_version: int
+    ) -> tuple[CacheEntry, float] | None:
+        with self._lock:
+            self.kb_version = max(self.kb_version, kb_version)
+            if not self.entries:
+                self.misses += 1
+                return None
+            scores = self.vectors @ vector
+            # Answers built on an older knowledge base can never match
+            stale = np.fromiter(
+                (e.kb_version != kb_version for e in self.entries), dtype=bool
+            )
+            scores[stale] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            entry = self.entries[best]
+            entry.hits += 1
+            entry.last_used = time.monotonic()
+            self.hits += 1
+            self.model_calls_saved += entry.model_calls
+            return entry, float(scores[best])
+
+    def store(self, vector: np.ndarray, entry: CacheEntry):
+        with self._lock:
+            if entry.kb_version < self.kb_version:
+                # Answered from an older knowledge base while it was updated
+                return
+            self.kb_version = entry.kb_version
+            self._drop_stale()
+            if len(self.entries) >= self.max_entries:
+                oldest = min(
+                    range(len(self.entries)), key=lambda i: self.entries[i].last_used
+                )
+                self._remove([oldest])
+            if self.vectors.size == 0:
+                self.vectors = vector[None, :].copy()
+            else:
+                self.vectors = np.vstack([self.vectors, vector])
+            self.entries.append(entry)
+
+    def _drop_stale(self):
+        stale = [
+            i for i, e in enumerate(self.entries) if e.kb_version < self.kb_version
+        ]
+        if stale:
+            self._remove(stale)
+
+    def _remove(self, rows: list[int]):
+        keep = np.setdiff1d(np.arange(len(self.entries)), rows)
+        self.vectors = self.vectors[keep]
+        self.entries = [self.entries[i] for i in keep]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "model_calls_saved": self.model_calls_saved,
+            }
+
+
+CITATION = re.compile(r"^\[(.+?)\]:", re.MULTILINE)
+
+
+class CachedAgent:
+    """Answers from the semantic cache when possible, otherwise runs the agent."""
+
+    def __init__(self, agent, cache: SemanticAnswerCache, kb: VersionedKnowledgeBase):
+        self.agent = agent
+        self.cache = cache
+        self.kb = kb
+
+    def invoke(self, question: str) -> dict:
+        vector = self.cache.embed(question)
+        kb_version = self.kb.version
+
+        found = self.cache.lookup(vector, kb_version)
+        if found is not None:
+            entry, similarity = found
+            return {
+                "answer": entry.answer,
+                "citations": entry.citations,
+                "cached": True,
+                "similarity": similarity,
+                "matched": entry.question,
+            }
+
+        response = self.agent.invoke({"messages": [HumanMessage(content=question)]})
+        messages = response["messages"]
+        citations = sorted(
+            {
+                title
+                for m in messages
+                if isinstance(m, ToolMessage)
+                for title in CITATION.findall(str(m.content))
+            }
+        )
+        answer = messages[-1].content
+        model_calls = sum(isinstance(m, AIMessage) for m in messages)
+
+        self.cache.store(
+            vector,
+            CacheEntry(question, answer, citations, kb_version, model_calls),
+        )
+        return {"answer": answer, "citations": citations, "cached": False}
+
+
+knowledge_base = [
+    Document(
+        page_content="Python is a versatile, interpreted programming language known for its readability and extensive standard library. It's popular for data science, web development, and automation.",
+        metadata={"title": "Python Basics", "source": "my-notes"},
+    ),
+    Document(
+        page_content="Docker containers package applications with their dependencies, ensuring consistent behavior across environments. Containers are lightweight, portable, and share the host OS kernel, making them more efficient than virtual machines.",
+        metadata={"title": "Docker Containers", "source": "my-notes"},
+    ),
+    Document(
+        page_content="REST APIs follow principles like statelessness, client-server architecture, and uniform interface. HTTP methods (GET, POST, PUT, DELETE) map to CRUD operations. Status codes indicate request outcomes.",
+        metadata={"title": "REST API Design", "source": "my-notes"},
+    ),
+]
+
+
+def main():
+    print(" Semantic Answer Cache\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    kb = VersionedKnowledgeBase(embeddings, knowledge_base)
+
+    @tool
+    def search_my_notes(query: str) -> str:
+        """Search my personal knowledge base for information about Python, Docker, and REST APIs. Use this when you need specific technical information from my notes."""
+        print(f'    Agent searching for: "{query}"')
+        results = kb.vector_store.similarity_search(query, k=2)
+
+        if not results:
+            return "No relevant information found in the knowledge base."
+
+        return "\n\n".join(
+            f"[{doc.metadata['title']}]: {doc.page_content}" for doc in results
+        )
+
+    agent = create_agent(
+        model,
+        tools=[search_my_notes],
+        system_prompt="You are a helpful personal assistant with access to my knowledge base. Use the search tool when you need specific technical information from my notes.",
+    )
+
+    threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    cached_agent = CachedAgent(agent, SemanticAnswerCache(embeddings, threshold), kb)
+
+    # FAQ-like traffic: a few questions, asked many ways
+    traffic = [
+        "What are the benefits of Docker containers?",
+        "Why should I use Docker containers?",
+        "What are the benefits of Docker containers?",
+        "What is Python?",
+        "what is python",
+        "Can you explain what Python is?",
+        "What are the benefits of docker containers",
+    ]
+
+    def ask(question: str):
+        start = time.perf_counter()
+        result = cached_agent.invoke(question)
+        elapsed = (time.perf_counter() - start) * 1000
+        source = (
+            f"cache hit ({result['similarity']:.3f} vs \"{result['matched']}\")"
+            if result["cached"]
+            else "agent"
+        )
+        print(f" Q: {question}")
+        print(f"    {source}, {elapsed:.0f} ms, citations: {result['citations']}")
+        print(f"    A: {result['answer'][:100]}...\n")
+
+    for question in traffic:
+        ask(question)
+
+    print("=" * 80 + "\n")
+    print(" Adding a document changes the knowledge base version...\n")
+    kb.add_documents(
+        [
+            Document(
+                page_content="Docker Compose runs multi-container applications from a single YAML file, so a web app and its database start together.",
+                metadata={"title": "Docker Compose", "source": "my-notes"},
+            )
+        ]
+    )
+    ask("Why should I use Docker containers?")
+
+    stats = cached_agent.cache.stats()
+    print("=" * 80)
+    print(f"\n Cache: {stats['hits']} hits / {stats['misses']} misses")
+    print(f"   Hit rate: {stats['hit_rate']:.0%}")
+    print(f"   Model calls saved: {stats['model_calls_saved']}")
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • A cache hit costs one embedding call instead of two model calls")
+    print("   • Matching on meaning catches paraphrases an exact-text cache misses")
+    print("   • Versioning entries keeps answers consistent with the knowledge base")
+    print(
+        "   • The threshold is a precision/recall trade-off - tune it on real traffic"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Sample: Speculative Retrieval in Parallel with the First Model Call
+
+In 02_agentic_rag.py a retrieval turn is strictly sequential: the first
+model call decides to search, only then does the tool embed the query and
+scan the store, and only then can the second model call write the answer.
+Retrieval latency adds straight onto the turn.
+
+SpeculativeRetrievalMiddleware overlaps the two:
+- When the first model call of a turn starts, the user's question is
+  searched in a background thread while the model is still deciding
+- If the model then calls the search tool with a query similar to the
+  question (most word stems of the query appear in the question), the
+  prefetched result is served immediately - the tool never runs
+- A dissimilar query runs the tool normally and the prefetch is thrown away;
+  turns that never search just discard it when the turn ends
+- Hits, misses, unused prefetches and the retrieval time hidden are tracked
+
+Run: python 08-agentic-rag-systems/samples/speculative_retrieval.py
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain.agents.middleware import AgentMiddleware, ModelRequest
+from langchain.agents.middleware.types import ModelResponse, ToolCallRequest
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+WORD = re.compile(r"\w+")
+STOP_WORDS = {"the", "and", "for", "are", "was", "what", "how", "does", "why", "who"}
+
+
+def stems(text: str) -> set[str]:
+    """Crude word stems: 'created' and 'creation' both become 'creat'."""
+    return {
+        word[:5]
+        for word in WORD.findall(text.lower())
+        if len(word) > 2 and word not in STOP_WORDS
+    }
+
+
+def query_overlap(query: str, question: str) -> float:
+    """Share of the tool query's stems that appear in the question."""
+    query_stems = stems(query)
+    if not query_stems:
+        return 0.0
+    return len(query_stems & stems(question)) / len(query_stems)
+
+
+class _Prefetch:
+    def __init__(self, question: str, future: Future):
+        self.question = question
+        self.future = future
+        self.used = False
+
+
+class SpeculativeRetrievalMiddleware(AgentMiddleware):
+    """Prefetch the question's search results while the model decides."""
+
+    def __init__(
+        self,
+        search: Callable[[str], str],
+        tool_name: str,
+        min_overlap: float = 0.5,
+        max_workers: int = 4,
+        max_turns: int = 256,
+    ):
+        """
+        search: the function behind the search tool (query -> tool output)
+        tool_name: calls to this tool may be served from the prefetch
+        min_overlap: how much of the tool query must match the question
+        max_turns: prefetches kept at once; the oldest are dropped beyond this
+        """
+        super().__init__()
+        self.search = search
+        self.tool_name = tool_name
+        self.min_overlap = min_overlap
+        self.max_turns = max_turns
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._prefetches: dict[str, _Prefetch] = {}
+        self._lock = threading.Lock()
+
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+        self.unused = 0
+        self.hidden_seconds = 0.0
+
+    # A turn is identified by the HumanMessage that started it
+    @staticmethod
+    def _turn(messages: list) -> tuple[str | None, HumanMessage | None, bool]:
+        """(turn id, question, is this the turn's first model call?)"""
+        for index in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[index], HumanMessage):
+                message = messages[index]
+                return message.id, message, index == len(messages) - 1
+        return None, None, False
+
+    def _timed_search(self, query: str) -> tuple[str, float]:
+        start = time.perf_counter()
+        return self.search(query), time.perf_counter() - start
+
+    def _start_prefetch(self, messages: list):
+        turn, question, first_call = self._turn(messages)
+        if not first_call or turn is None:
+            return
+        with self._lock:
+            if turn in self._prefetches:
+                return
+            # Turns that died without reaching after_agent must not pile up
+            while len(self._prefetches) >= self.max_turns:
+                stale = self._prefetches.pop(next(iter(self._prefetches)))
+                stale.future.cancel()
+            future = self._executor.submit(self._timed_search, question.text)
+            self._prefetches[turn] = _Prefetch(question.text, future)
+            self.prefetched += 1
+
+    def _discard(self, messages: list):
+        """Drop the turn's prefetch after the model call failed."""
+        turn, _, _ = self._turn(messages)
+        with self._lock:
+            prefetch = self._prefetches.pop(turn, None)
+        if prefetch is not None:
+            prefetch.future.cancel()
+
+    def _claim(self, request: ToolCallRequest) -> _Prefetch | None:
+        """The turn's prefetch if this tool call can be served from it."""
+        if request.tool_call["name"] != self.tool_name:
+            return None
+        turn, _, _ = self._turn(request.state["messages"])
+        query = str(request.tool_call["args"].get("query", ""))
+        with self._lock:
+            prefetch = self._prefetches.get(turn)
+            if prefetch is None or prefetch.used:
+                return None
+            if query_overlap(query, prefetch.question) < self.min_overlap:
+                # The turn did search, so this prefetch is a miss, not unused
+                self._prefetches.pop(turn)
+                prefetch.future.cancel()
+                self.misses += 1
+                return None
+            prefetch.used = True
+            self.hits += 1
+            return prefetch
+
+    def _serve(self, request: ToolCallRequest, content: str, search_seconds, waited):
+        with self._lock:
+            self.hidden_seconds += max(search_seconds - waited, 0.0)
+        return ToolMessage(
+            content=content,
+            name=request.tool_call["name"],
+            tool_call_id=request.tool_call["id"],
+        )
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        self._start_prefetch(request.state["messages"])
+        try:
+            return handler(request)
+        except BaseException:
+            # after_agent never runs when the agent raises
+            self._discard(request.state["messages"])
+            raise
+
+    async def awrap_model_call(self, request: ModelRequest, handler) -> ModelResponse:
+        self._start_prefetch(request.state["messages"])
+        try:
+            return await handler(request)
+        except BaseException:
+            self._discard(request.state["messages"])
+            raise
+
+    def wrap_tool_call(self, request: ToolCallRequest, handler) -> ToolMessage:
+        prefetch = self._claim(request)
+        if prefetch is None:
+            return handler(request)
+        start = time.perf_counter()
+        try:
+            content, search_seconds = prefetch.future.result()
+        except Exception:
+            return handler(request)  # a failed prefetch falls back to the tool
+        return self._serve(
+            request, content, search_seconds, time.perf_counter() - start
+        )
+
+    async def awrap_tool_call(self, request: ToolCallRequest, handler) -> ToolMessage:
+        prefetch = self._claim(request)
+        if prefetch is None:
+            return await handler(request)
+        start = time.perf_counter()
+        try:
+            content, search_seconds = await asyncio.wrap_future(prefetch.future)
+        except Exception:
+            return await handler(request)
+        return self._serve(
+            request, content, search_seconds, time.perf_counter() - start
+        )
+
+    def after_agent(self, state, runtime):
+        turn, _, _ = self._turn(state["messages"])
+        with self._lock:
+            prefetch = self._prefetches.pop(turn, None)
+            if prefetch is not None and not prefetch.used:
+                prefetch.future.cancel()  # no-op if it is already running
+                self.unused += 1
+        return None
+
+    async def aafter_agent(self, state, runtime):
+        return self.after_agent(state, runtime)
+
+    def stats(self) -> dict:
+        return {
+            "prefetched": self.prefetched,
+            "hits": self.hits,
+            "misses": self.misses,
+            "unused": self.unused,
+            "hidden_ms": self.hidden_seconds * 1000,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+docs = [
+    Document(
+        page_content="LangChain was created in 2022 and quickly became popular for building LLM applications. The Python version was first, followed by LangChain.js for JavaScript/TypeScript.",
+        metadata={"source": "langchain-history", "topic": "introduction"},
+    ),
+    Document(
+        page_content="RAG (Retrieval Augmented Generation) combines document retrieval with LLM generation. It allows models to access external knowledge without retraining, making responses more accurate and up-to-date.",
+        metadata={"source": "rag-explanation", "topic": "concepts"},
+    ),
+    Document(
+        page_content="Vector stores like Pinecone, Weaviate, and Chroma enable semantic search over documents. They store embeddings and perform fast similarity searches to find relevant content.",
+        metadata={"source": "vector-stores", "topic": "infrastructure"},
+    ),
+    Document(
+        page_content="LangChain supports multiple document loaders for PDFs, web pages, databases, and APIs. Text splitters help break large documents into chunks that fit within LLM context windows while preserving semantic meaning.",
+        metadata={"source": "document-processing", "topic": "development"},
+    ),
+]
+
+
+def main():
+    print(" Speculative Retrieval\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+    )
+
+    vector_store = InMemoryVectorStore.from_documents(docs, embeddings)
+
+    # The tool and the prefetch share one search function, so they return the same text
+    def search_docs(query: str) -> str:
+        results = vector_store.similarity_search(query, k=2)
+        return "\n\n".join(
+            f"[{doc.metadata['source']}]: {doc.page_content}" for doc in results
+        )
+
+    @tool
+    def search_langchain_docs(query: str) -> str:
+        """Search LangChain documentation for specific information about LangChain, RAG systems, vector stores, and document processing. Use this when you need factual information from the LangChain knowledge base."""
+        print(f'    Tool is searching for: "{query}"')
+        return search_docs(query)
+
+    speculative = SpeculativeRetrievalMiddleware(
+        search_docs,
+        tool_name="search_langchain_docs",
+        min_overlap=float(os.getenv("SPECULATIVE_MIN_OVERLAP", "0.5")),
+    )
+
+    system_prompt = "You are a helpful assistant with access to LangChain documentation. Use the search tool when you need specific information about LangChain, RAG, or vector stores. For general knowledge questions, answer directly without searching."
+    plain_agent = create_agent(
+        model, tools=[search_langchain_docs], system_prompt=system_prompt
+    )
+    speculative_agent = create_agent(
+        model,
+        tools=[search_langchain_docs],
+        system_prompt=system_prompt,
+        middleware=[speculative],
+    )
+
+    questions = [
+        "What is the capital of France?",
+        "When was LangChain created?",
+        "What is RAG and why is it useful?",
+        "Which vector stores enable semantic search?",
+    ]
+
+    for question in questions:
+        print("=" * 80)
+        print(f"\n Question: {question}\n")
+        timings = []
+        for agent in (plain_agent, speculative_agent):
+            before = speculative.hits
+            start = time.perf_counter()
+            response = agent.invoke({"messages": [HumanMessage(content=question)]})
+            timings.append(time.perf_counter() - start)
+            if speculative.hits > before:
+                print("    (served from the speculative prefetch)")
+        print(f"\n Answer: {response['messages'][-1].content[:150]}")
+        print(f"   Plain: {timings[0]:.2f}s   Speculative: {timings[1]:.2f}s\n")
+
+    stats = speculative.stats()
+    print("=" * 80)
+    print(
+        f"\n Prefetches: {stats['prefetched']} | served: {stats['hits']} | "
+        f"discarded (different query): {stats['misses']} | "
+        f"unused (no search): {stats['unused']}"
+    )
+    print(f" Retrieval time hidden behind the model call: {stats['hidden_ms']:.0f} ms")
+    speculative.close()
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Retrieval can run while the model is still deciding to search")
+    print("   • Agents usually search with a rephrasing of the user's question")
+    print("   • A local word-overlap check decides if the prefetch still applies")
+    print("   • Turns that never search only pay for one cheap background search")
+
+
+if __name__ == "__main__":
+    main()
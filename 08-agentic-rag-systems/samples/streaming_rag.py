@@ -0,0 +1,292 @@
+"""
+Sample: Streaming Agentic RAG with Latency Instrumentation
+
+Every agent in this chapter calls agent.invoke() and prints the final
+message, so the user stares at a blank screen through the decision call,
+the retrieval and the whole answer. The same agent can stream instead:
+
+- agent.stream(..., stream_mode=["messages", "updates"]) yields answer
+  tokens as the model produces them ("messages") and each completed step -
+  tool calls and tool results - as it finishes ("updates")
+- stream_turn() / astream_turn() turn that into simple events: tool_call,
+  citation, token and done
+- Each turn records time-to-first-token (what the user perceives),
+  retrieval time and total time; set STREAM_METRICS to a file path to
+  append them as JSON lines for production dashboards
+
+Run: python 08-agentic-rag-systems/samples/streaming_rag.py
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from dotenv import load_dotenv
+from langchain.agents import create_agent
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
+
+load_dotenv()
+
+
+def get_embeddings_endpoint():
+    """Get the Azure OpenAI endpoint, removing /openai/v1 suffix if present."""
+    endpoint = os.getenv("AI_ENDPOINT", "")
+    if endpoint.endswith("/openai/v1"):
+        endpoint = endpoint.replace("/openai/v1", "")
+    elif endpoint.endswith("/openai/v1/"):
+        endpoint = endpoint.replace("/openai/v1/", "")
+    return endpoint
+
+
+CITATION = re.compile(r"^\[(.+?)\]:", re.MULTILINE)
+
+
+@dataclass
+class StreamEvent:
+    kind: str  # "tool_call", "citation", "token" or "done"
+    data: Any
+
+
+@dataclass
+class TurnMetrics:
+    question: str
+    ttft_ms: float | None = None
+    retrieval_ms: float = 0.0
+    total_ms: float = 0.0
+    tool_calls: list[str] = field(default_factory=list)
+    citations: list[str] = field(default_factory=list)
+    answer: str = ""
+
+
+class _TurnTracker(BaseCallbackHandler):
+    """
+    Turns raw (mode, data) stream items into events while timing the turn.
+
+    Retrieval time comes from tool callbacks, which fire exactly when a tool
+    starts and ends; overlapping tool calls are counted once (wall time).
+    """
+
+    def __init__(self, question: str):
+        self.metrics = TurnMetrics(question)
+        self.start = time.perf_counter()
+        self._tools_running = 0
+        self._tool_started = 0.0
+        self._lock = threading.Lock()  # parallel tool calls run in threads
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        with self._lock:
+            if self._tools_running == 0:
+                self._tool_started = time.perf_counter()
+            self._tools_running += 1
+
+    def on_tool_end(self, output, **kwargs):
+        with self._lock:
+            self._tools_running -= 1
+            if self._tools_running == 0:
+                elapsed = time.perf_counter() - self._tool_started
+                self.metrics.retrieval_ms += elapsed * 1000
+
+    def on_tool_error(self, error, **kwargs):
+        self.on_tool_end(None)
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def handle(self, mode: str, data) -> Iterator[StreamEvent]:
+        if mode == "messages":
+            chunk, meta = data
+            # Answer tokens come from the model node; tool output is handled below
+            if meta.get("langgraph_node") == "model" and isinstance(chunk.content, str):
+                if chunk.content and not getattr(chunk, "tool_calls", None):
+                    if self.metrics.ttft_ms is None:
+                        self.metrics.ttft_ms = self._elapsed_ms()
+                    self.metrics.answer += chunk.content
+                    yield StreamEvent("token", chunk.content)
+            return
+
+        for update in data.values():
+            for message in (update or {}).get("messages", []):
+                if isinstance(message, AIMessage) and message.tool_calls:
+                    for call in message.tool_calls:
+                        self.metrics.tool_calls.append(call["name"])
+                        yield StreamEvent("tool_call", call)
+                elif isinstance(message, ToolMessage):
+                    for citation in CITATION.findall(str(message.content)):
+                        if citation not in self.metrics.citations:
+                            self.metrics.citations.append(citation)
+                            yield StreamEvent("citation", citation)
+
+    def finish(self) -> StreamEvent:
+        self.metrics.total_ms = self._elapsed_ms()
+        path = os.getenv("STREAM_METRICS")
+        if path:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(self.metrics)) + "\n")
+        return StreamEvent("done", self.metrics)
+
+
+STREAM_MODES = ["messages", "updates"]
+
+
+def stream_turn(agent, question: str, history: list | None = None):
+    """Stream one turn of a create_agent() agent as StreamEvents."""
+    tracker = _TurnTracker(question)
+    inputs = {"messages": [*(history or []), HumanMessage(content=question)]}
+    config = {"callbacks": [tracker]}
+    for mode, data in agent.stream(inputs, config, stream_mode=STREAM_MODES):
+        yield from tracker.handle(mode, data)
+    yield tracker.finish()
+
+
+async def astream_turn(
+    agent, question: str, history: list | None = None
+) -> AsyncIterator[StreamEvent]:
+    """Async version of stream_turn() for servers handling many users."""
+    tracker = _TurnTracker(question)
+    inputs = {"messages": [*(history or []), HumanMessage(content=question)]}
+    config = {"callbacks": [tracker]}
+    async for mode, data in agent.astream(inputs, config, stream_mode=STREAM_MODES):
+        for event in tracker.handle(mode, data):
+            yield event
+    yield tracker.finish()
+
+
+def print_events(events) -> TurnMetrics:
+    """Render a turn in the terminal; returns its metrics."""
+    for event in events:
+        if event.kind == "tool_call":
+            print(f'   [searching: "{event.data["args"].get("query", "")}"]')
+        elif event.kind == "citation":
+            print(f"   [source: {event.data}]")
+        elif event.kind == "token":
+            sys.stdout.write(event.data)
+            sys.stdout.flush()
+        elif event.kind == "done":
+            return event.data
+
+
+def percentile(values: list[float], p: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def format_ms(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:.0f} ms"
+
+
+docs = [
+    Document(
+        page_content="LangChain was created in 2022 and quickly became popular for building LLM applications. The Python version was first, followed by LangChain.js for JavaScript/TypeScript.",
+        metadata={"source": "langchain-history", "topic": "introduction"},
+    ),
+    Document(
+        page_content="RAG (Retrieval Augmented Generation) combines document retrieval with LLM generation. It allows models to access external knowledge without retraining, making responses more accurate and up-to-date.",
+        metadata={"source": "rag-explanation", "topic": "concepts"},
+    ),
+    Document(
+        page_content="Vector stores like Pinecone, Weaviate, and Chroma enable semantic search over documents. They store embeddings and perform fast similarity searches to find relevant content.",
+        metadata={"source": "vector-stores", "topic": "infrastructure"},
+    ),
+]
+
+
+def main():
+    print(" Streaming Agentic RAG\n")
+    print("=" * 80 + "\n")
+
+    embeddings = AzureOpenAIEmbeddings(
+        azure_endpoint=get_embeddings_endpoint(),
+        api_key=os.getenv("AI_API_KEY"),
+        model=os.getenv("AI_EMBEDDING_MODEL", "text-embedding-ada-002"),
+        api_version="2024-02-01",
+    )
+
+    model = ChatOpenAI(
+        model=os.getenv("AI_MODEL"),
+        base_url=os.getenv("AI_ENDPOINT"),
+        api_key=os.getenv("AI_API_KEY"),
+        streaming=True,
+    )
+
+    vector_store = InMemoryVectorStore.from_documents(docs, embeddings)
+
+    @tool
+    def search_langchain_docs(query: str) -> str:
+        """Search LangChain documentation for specific information about LangChain, RAG systems, and vector stores. Use this when you need factual information from the LangChain knowledge base."""
+        results = vector_store.similarity_search(query, k=2)
+        return "\n\n".join(
+            f"[{doc.metadata['source']}]: {doc.page_content}" for doc in results
+        )
+
+    agent = create_agent(
+        model,
+        tools=[search_langchain_docs],
+        system_prompt="You are a helpful assistant with access to LangChain documentation. Use the search tool when you need specific information about LangChain, RAG, or vector stores. For general knowledge questions, answer directly without searching.",
+    )
+
+    questions = [
+        "What is the capital of France?",
+        "When was LangChain created?",
+        "What is RAG and why is it useful?",
+    ]
+
+    turns: list[TurnMetrics] = []
+    for question in questions:
+        print(f" Question: {question}\n")
+        metrics = print_events(stream_turn(agent, question))
+        turns.append(metrics)
+        print(
+            f"\n\n   first token {format_ms(metrics.ttft_ms)} | retrieval {metrics.retrieval_ms:.0f} ms"
+            f" | total {metrics.total_ms:.0f} ms\n"
+        )
+        print("=" * 80 + "\n")
+
+    # The async interface serves several users at once from one event loop
+    async def concurrent_users():
+        async def one(question: str) -> TurnMetrics:
+            async for event in astream_turn(agent, question):
+                if event.kind == "done":
+                    return event.data
+
+        return await asyncio.gather(*(one(q) for q in questions))
+
+    print(" Same questions, three concurrent users via astream:\n")
+    for metrics in asyncio.run(concurrent_users()):
+        turns.append(metrics)
+        print(
+            f"   {metrics.question:<36} first token {format_ms(metrics.ttft_ms):>9}"
+            f"   total {format_ms(metrics.total_ms):>9}"
+        )
+
+    ttfts = [t.ttft_ms for t in turns if t.ttft_ms is not None]
+    totals = [t.total_ms for t in turns]
+    ttft_p50 = format_ms(percentile(ttfts, 50))
+    total_p50 = format_ms(percentile(totals, 50))
+    print(
+        f"\n Over {len(turns)} turns: first token p50 {ttft_p50}, total p50 {total_p50}"
+    )
+
+    print("\n" + "=" * 80)
+    print("\n Key Insights:")
+    print("   • Streaming shows progress (searching, sources) before the answer")
+    print("   • Time-to-first-token is the latency users actually feel")
+    print("   • Retrieval time is measured separately from model time")
+    print("   • astream serves many users concurrently from one event loop")
+
+
+if __name__ == "__main__":
+    main()
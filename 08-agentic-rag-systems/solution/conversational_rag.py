@@ -6,11 +6,14 @@ Run: python 08-agentic-rag-systems/solution/conversational_rag.py
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.documents import Document
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.tools import tool
 from langchain_core.vectorstores import InMemoryVectorStore
 from langchain_openai import AzureOpenAIEmbeddings, ChatOpenAI
@@ -28,6 +31,118 @@ def get_embeddings_endpoint():
     return endpoint
 
 
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+class RollingHistory:
+    """
+    Conversation history that stays a fixed size.
+
+    The last `keep_turns` exchanges are sent verbatim. Older exchanges are
+    folded into a running summary by a background thread after the reply has
+    been shown, so summarizing never delays an answer. Until a fold finishes,
+    its turns are still sent verbatim - nothing is ever dropped.
+    """
+
+    def __init__(self, model: BaseChatModel, keep_turns: int = 3):
+        self.model = model
+        self.keep_turns = keep_turns
+        self.summary = ""
+        self.recent: list[tuple[HumanMessage, AIMessage]] = []
+        self.folding: list[tuple[HumanMessage, AIMessage]] = []
+        self._tokens: dict[int, int] = {}  # per-message counts, computed once
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _count(self, message: BaseMessage) -> int:
+        if id(message) not in self._tokens:
+            self._tokens[id(message)] = estimate_tokens(message.content)
+        return self._tokens[id(message)]
+
+    def messages(self, question: HumanMessage) -> list[BaseMessage]:
+        """Messages to send for the next question."""
+        with self._lock:
+            history: list[BaseMessage] = []
+            if self.summary:
+                history.append(
+                    SystemMessage(
+                        content=f"Summary of the earlier conversation: {self.summary}"
+                    )
+                )
+            for user, ai in self.folding + self.recent:
+                history.extend([user, ai])
+        return history + [question]
+
+    def add_turn(self, user: HumanMessage, ai: AIMessage):
+        with self._lock:
+            self._count(user)
+            self._count(ai)
+            self.recent.append((user, ai))
+            overflow = len(self.recent) - self.keep_turns
+            if overflow <= 0:
+                return
+            self.folding.extend(self.recent[:overflow])
+            self.recent = self.recent[overflow:]
+        # Off the critical path: runs while the user reads and types
+        self._executor.submit(self._fold)
+
+    def _fold(self):
+        with self._lock:
+            turns = list(self.folding)
+            summary = self.summary
+        if not turns:
+            return
+
+        transcript = "\n".join(
+            f"User: {user.content}\nAssistant: {ai.content}" for user, ai in turns
+        )
+        try:
+            response = self.model.invoke(
+                [
+                    SystemMessage(
+                        content="Update the running summary of a conversation. Keep facts, names, decisions and open questions the assistant may need later. Reply with the updated summary only, at most 120 words."
+                    ),
+                    HumanMessage(
+                        content=f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"
+                    ),
+                ]
+            )
+        except Exception as e:
+            # Keep the turns verbatim and retry on the next fold
+            print(f"\n(Summary update failed: {e})")
+            return
+
+        with self._lock:
+            self.summary = str(response.content).strip()
+            self.folding = self.folding[len(turns) :]
+            for user, ai in turns:
+                self._tokens.pop(id(user), None)
+                self._tokens.pop(id(ai), None)
+
+    def token_count(self) -> int:
+        """Tokens of history sent with the next question (incrementally tracked)."""
+        with self._lock:
+            summary_tokens = estimate_tokens(self.summary) if self.summary else 0
+            return summary_tokens + sum(self._tokens.values())
+
+    def wait(self):
+        """Block until pending summaries are written (used before exiting)."""
+        self._executor.submit(lambda: None).result()
+
+    def reset(self):
+        self.wait()
+        with self._lock:
+            self.summary = ""
+            self.recent.clear()
+            self.folding.clear()
+            self._tokens.clear()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
 # Knowledge base about Python
 knowledge_base = [
     Document(
@@ -97,8 +212,11 @@ def main():
         system_prompt="You are a helpful Python expert assistant with access to Python documentation. Use the search tool when you need specific information about Python features, syntax, or best practices. For general questions, answer directly. Remember the conversation history to provide contextual responses.",
     )
 
-    # 5. Initialize conversation history
-    conversation_history: list[HumanMessage | AIMessage] = []
+    # 5. Initialize conversation history: the last few turns verbatim, older
+    # turns folded into a summary so each turn costs the same number of tokens
+    history = RollingHistory(
+        model, keep_turns=int(os.getenv("HISTORY_KEEP_TURNS", "3"))
+    )
 
     # Check if running in CI mode for automated testing
     is_ci = os.getenv("CI") == "true"
@@ -126,32 +244,31 @@ def main():
             break
 
         if user_input.lower() == "reset":
-            conversation_history.clear()
+            history.reset()
             print("\n Conversation reset. Starting fresh!\n")
             continue
 
         if not user_input:
             continue
 
-        # Add user message to history
         user_message = HumanMessage(content=user_input)
-        conversation_history.append(user_message)
 
         try:
-            # Invoke agent with full conversation history
+            # Invoke agent with the summary + recent turns + the new question
             response = agent.invoke(
                 {
-                    "messages": list(conversation_history),
+                    "messages": history.messages(user_message),
                 }
             )
 
             # Get agent's response
             agent_message = response["messages"][-1]
 
-            # Add agent's response to history
-            conversation_history.append(AIMessage(content=agent_message.content))
-
             print(f"\nAgent: {agent_message.content}\n")
+
+            # Record the turn after replying; any summarizing happens in the background
+            history.add_turn(user_message, AIMessage(content=agent_message.content))
+            print(f"(History for next turn: ~{history.token_count()} tokens)\n")
             print("=" * 80 + "\n")
 
             # In CI mode, exit after answering one question
@@ -163,6 +280,8 @@ def main():
         except Exception as e:
             print(f"Error: {e}")
 
+    history.close()
+
 
 if __name__ == "__main__":
     main()